@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+检查向量索引分级重建的脚本
+不依赖Ollama服务：用小维度的确定性向量代替embedding，在临时目录中依次执行
+Flat -> HNSW32,SQ8 -> OPQ+IVF-HNSW+PQ 重建，检查向量ID到分块ID的映射、距离度量和原始向量文件
+"""
+
+import hashlib
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import faiss
+
+import knowledge_mcp as km
+
+# 小规模配置：维度和分级阈值按比例缩小，索引结构与正式配置一致
+DIM = 64
+TIERS = [
+    (0, "Flat"),
+    (300, "HNSW32,SQ8"),
+    (1500, "OPQ8_32,IVF16_HNSW32,PQ8"),
+]
+MIN_RECALL = 0.9  # 用文档自身文本检索，前5条中应包含该文档
+
+class OfflineVectorSearchEngine(km.VectorSearchEngine):
+    """用文本摘要生成确定性向量，代替Ollama embedding"""
+
+    def _init_ollama(self):
+        pass
+
+    def _get_embedding(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+def _doc_text(i: int):
+    """第i个测试文档的(doc_id, 标题, 内容)，内容较短，每个文档只有一个分块"""
+    return f"doc_{i:05d}", f"测试文档{i}", f"第{i}号设备巡检记录"
+
+def add_documents(engine, db_manager, start: int, end: int):
+    """写入文档元数据并加入向量索引"""
+    for i in range(start, end):
+        doc_id, title, content = _doc_text(i)
+        with db_manager.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO documents
+                (doc_id, original_filename, title, category, subcategory, file_path,
+                 upload_time, page_count, file_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (doc_id, f"{doc_id}.txt", title, "电力系统运维", "", "", "", 1, len(content)))
+            conn.commit()
+        engine.add_document(doc_id, title, content)
+
+def expected_vectors(engine) -> np.ndarray:
+    """按chunk_ids顺序生成每个向量ID应有的原始向量"""
+    vectors = []
+    for chunk_id in engine.chunk_ids:
+        i = int(chunk_id.split("_")[1])
+        _, title, content = _doc_text(i)
+        embedding = engine._get_embedding(f"{title}\n{content}")
+        vectors.append(embedding / np.linalg.norm(embedding))
+    return np.asarray(vectors, dtype=np.float32)
+
+def check(condition: bool, message: str):
+    print(f"{'✅' if condition else '❌'} {message}")
+    if not condition:
+        sys.exit(1)
+
+def check_mapping(engine, label: str):
+    """用文档自身文本检索，检查向量ID仍指向正确的分块"""
+    sample = range(0, engine.faiss_index.ntotal, max(engine.faiss_index.ntotal // 200, 1))
+    hits = 0
+    for i in sample:
+        doc_id, title, content = _doc_text(int(engine.chunk_ids[i].split("_")[1]))
+        results = engine.search(f"{title}\n{content}", top_k=5)
+        hits += any(result["doc_id"] == doc_id for result in results)
+    recall = hits / len(sample)
+    check(recall >= MIN_RECALL, f"{label}: 自检索召回率 {recall:.2%}")
+
+def check_embeddings_file(engine, label: str):
+    """原始向量文件与chunk_ids逐行对应"""
+    stored = np.fromfile(str(engine.embeddings_file), dtype=np.float32).reshape(-1, DIM)
+    check(
+        stored.shape[0] == engine.faiss_index.ntotal and np.allclose(stored, expected_vectors(engine), atol=1e-6),
+        f"{label}: 原始向量文件与向量ID映射一致"
+    )
+
+def simulate_rebuild_script(engine):
+    """模拟旧版重建脚本：按相反顺序重写IndexFlatIP索引和映射，保留过期的原始向量文件和元数据"""
+    vectors = expected_vectors(engine)[::-1].copy()
+    index = faiss.IndexFlatIP(DIM)
+    index.add(vectors)
+    faiss.write_index(index, str(engine.index_file))
+    with open(engine.mapping_file, 'w', encoding='utf-8') as f:
+        json.dump(engine.chunk_ids[::-1], f, ensure_ascii=False)
+
+def main():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        km.VECTORS_DIR = temp_dir / "vectors"
+        km.VECTORS_DIR.mkdir()
+        km.OLLAMA_CONFIG["embedding_dim"] = DIM
+        km.INDEX_CONFIG["tiers"] = TIERS
+        db_manager = km.DatabaseManager(str(temp_dir / "metadata.db"))
+
+        # 1. Flat索引，逐个文档追加原始向量
+        engine = OfflineVectorSearchEngine(db_manager)
+        add_documents(engine, db_manager, 0, TIERS[1][0])
+        check(engine.index_factory == "Flat", f"Flat: 导入{engine.faiss_index.ntotal}个向量后仍为Flat，等待显式重建")
+        check_embeddings_file(engine, "Flat")
+
+        # 2. 外部脚本重写索引后，过期的原始向量文件不能再用于训练
+        simulate_rebuild_script(engine)
+        engine = OfflineVectorSearchEngine(db_manager)
+        check(not engine._has_original_embeddings(), "重建脚本改写索引后，原始向量文件不再被信任")
+
+        # 3. Flat -> HNSW32,SQ8（原始向量从Flat索引重写）
+        result = engine.rebuild_index()
+        check(result.get("factory") == TIERS[1][1], f"Flat -> {TIERS[1][1]}: {result}")
+        check(engine.faiss_index.metric_type == faiss.METRIC_INNER_PRODUCT, "重建后沿用原索引的内积度量")
+        check_embeddings_file(engine, TIERS[1][1])
+        check_mapping(engine, TIERS[1][1])
+
+        # 4. 重新加载后元数据与索引一致，继续追加原始向量
+        engine = OfflineVectorSearchEngine(db_manager)
+        check(engine.index_factory == TIERS[1][1] and engine._has_original_embeddings(), "重新加载后索引类型和原始向量文件有效")
+        add_documents(engine, db_manager, TIERS[1][0], TIERS[2][0])
+        check_embeddings_file(engine, f"{TIERS[1][1]} 追加")
+
+        # 5. HNSW32,SQ8 -> OPQ+IVF-HNSW+PQ（从原始向量文件训练）
+        result = engine.rebuild_index()
+        check(result.get("factory") == TIERS[2][1], f"{TIERS[1][1]} -> {TIERS[2][1]}: {result}")
+        check(engine.faiss_index.metric_type == faiss.METRIC_INNER_PRODUCT, "重建后沿用原索引的内积度量")
+        quantizer = faiss.downcast_index(faiss.extract_index_ivf(engine.faiss_index).quantizer)
+        check(quantizer.hnsw.efSearch == km.INDEX_CONFIG["ef_search"], "IVF的HNSW粗量化器已设置efSearch")
+        check_mapping(engine, TIERS[2][1])
+
+        engine = OfflineVectorSearchEngine(db_manager)
+        check_mapping(engine, f"{TIERS[2][1]} 重新加载")
+
+    print("\n🎉 索引分级重建检查通过")
+
+if __name__ == "__main__":
+    main()
@@ -140,6 +140,11 @@ def force_rebuild_vectors():
             json.dump(chunk_ids, f, ensure_ascii=False, indent=2)
         print(f"映射已保存到: {MAPPING_FILE}")
         
+        # 删除旧索引对应的原始向量文件和索引元数据，避免分级重建时使用过期向量
+        for stale_file in (VECTORS_DIR / "embeddings.f32", VECTORS_DIR / "index_meta.json"):
+            if stale_file.exists():
+                stale_file.unlink()
+        
         print(f"\n✅ 向量索引重建完成")
         print(f"- 索引包含 {len(embeddings)} 个向量")
         print(f"- 向量维度: {OLLAMA_CONFIG['embedding_dim']}")
@@ -21,6 +21,7 @@ import logging
 import hashlib
 import base64
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -64,6 +65,22 @@ OLLAMA_CONFIG = {
     "timeout": 30
 }
 
+# 向量索引分级配置：向量数达到阈值后可通过 manage_documents(action="rebuild_index") 用faiss.index_factory重建为对应索引
+# 小规模知识库保持精确的Flat索引；中等规模采用HNSW图+SQ8标量量化；
+# 大规模时采用OPQ降维+IVF(HNSW粗量化)+PQ编码
+# IVF4096需要约39*4096个训练向量，因此阈值设为160000
+INDEX_CONFIG = {
+    "tiers": [
+        (0, "Flat"),
+        (10000, "HNSW32,SQ8"),        # 标量量化为int8，向量内存与带宽降为FP32的1/4
+        (160000, "OPQ64_256,IVF4096_HNSW32,PQ64"),
+    ],
+    "max_train_vectors": 200000,  # 训练样本上限
+    "nprobe": 32,                 # IVF检索的倒排列表数，权衡召回率与延迟
+    "ef_search": 64,              # HNSW检索宽度
+    "query_cache_size": 1024      # 查询向量LRU缓存条数，重复查询跳过Ollama向量化
+}
+
 # 文档分块配置
 CHUNK_CONFIG = {
     "min_size": 500,
@@ -156,6 +173,10 @@ class DatabaseManager:
 # 向量检索引擎
 # ================================
 
+def _chunk_mapping_hash(chunk_ids: List[str]) -> str:
+    """计算向量ID到分块ID映射的摘要"""
+    return hashlib.blake2b("\n".join(chunk_ids).encode("utf-8"), digest_size=16).hexdigest()
+
 class VectorSearchEngine:
     """基于FAISS的向量检索引擎"""
     
@@ -165,6 +186,12 @@ class VectorSearchEngine:
         self.chunk_ids = []
         self.index_file = VECTORS_DIR / "faiss.index"
         self.mapping_file = VECTORS_DIR / "chunk_mapping.json"
+        self.meta_file = VECTORS_DIR / "index_meta.json"
+        # 原始（归一化后的）float32向量，按向量ID顺序追加保存，供压缩索引重建时训练使用
+        self.embeddings_file = VECTORS_DIR / "embeddings.f32"
+        self._embeddings_synced = False
+        self.index_factory = "Flat"
+        self._query_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
         
         # 初始化Ollama连接
         self._init_ollama()
@@ -379,6 +406,149 @@ class VectorSearchEngine:
             # 创建新索引 - 使用L2距离索引与重建脚本保持一致
             self.faiss_index = faiss.IndexFlatL2(OLLAMA_CONFIG['embedding_dim'])
             self.chunk_ids = []
+        
+        # 读取索引类型；向量数达到分级阈值时仅提示，重建需显式执行
+        index_meta = self._load_index_meta()
+        self.index_factory = "Flat" if isinstance(self.faiss_index, faiss.IndexFlat) else index_meta.get("factory", "Flat")
+        # 元数据记录的向量数和映射摘要与当前索引一致时，原始向量文件才是本索引写入的
+        # （重建脚本会直接改写索引文件，此时原始向量文件已过期）
+        if self.faiss_index.ntotal == 0:
+            # 空索引从空的原始向量文件开始追加
+            if self.embeddings_file.exists():
+                self.embeddings_file.unlink()
+            self._embeddings_synced = True
+        else:
+            self._embeddings_synced = (
+                index_meta.get("ntotal") == self.faiss_index.ntotal
+                and index_meta.get("mapping_hash") == _chunk_mapping_hash(self.chunk_ids)
+            )
+        self._apply_search_params()
+        self._check_index_tier()
+    
+    def _load_index_meta(self) -> Dict[str, Any]:
+        """读取索引元数据（旧版本没有元数据文件，均为Flat索引）"""
+        if not self.meta_file.exists():
+            return {}
+        try:
+            with open(self.meta_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"读取索引元数据失败: {e}")
+            return {}
+    
+    def _target_index_factory(self) -> str:
+        """根据当前向量数确定应使用的索引类型"""
+        factory = "Flat"
+        for min_vectors, tier_factory in INDEX_CONFIG["tiers"]:
+            if self.faiss_index.ntotal >= min_vectors:
+                factory = tier_factory
+        return factory
+    
+    def _apply_search_params(self):
+        """设置压缩索引的检索参数"""
+        params = faiss.ParameterSpace()
+        if "IVF" in self.index_factory:
+            params.set_index_parameter(self.faiss_index, "nprobe", INDEX_CONFIG["nprobe"])
+            if "_HNSW" in self.index_factory:
+                # IVF的粗量化器为HNSW时，同时设置粗量化器的检索宽度
+                params.set_index_parameter(self.faiss_index, "quantizer_efSearch", INDEX_CONFIG["ef_search"])
+        elif "HNSW" in self.index_factory:
+            params.set_index_parameter(self.faiss_index, "efSearch", INDEX_CONFIG["ef_search"])
+    
+    def _check_index_tier(self) -> str:
+        """检查当前向量数对应的索引类型，与现有索引不一致时记录提示
+        
+        Returns:
+            str: 应使用的索引factory描述
+        """
+        target_factory = self._target_index_factory()
+        if target_factory != self.index_factory:
+            logger.info(
+                f"向量数{self.faiss_index.ntotal}达到分级阈值，建议执行 manage_documents(action=\"rebuild_index\") "
+                f"将索引由 {self.index_factory} 重建为 {target_factory}"
+            )
+        return target_factory
+    
+    def _append_original_embeddings(self, embeddings: List[np.ndarray]):
+        """追加保存原始向量（与索引中的向量ID顺序一致）"""
+        if not embeddings:
+            return
+        with open(self.embeddings_file, 'ab') as f:
+            np.asarray(embeddings, dtype=np.float32).tofile(f)
+    
+    def _load_original_vectors(self) -> Optional[np.ndarray]:
+        """获取索引中全部向量的原始值
+        
+        Flat索引可无损还原；压缩索引只能从原始向量文件读取（reconstruct_n得到的是量化后的近似值，不能用于训练）。
+        
+        Returns:
+            Optional[np.ndarray]: 形如(ntotal, dim)的向量矩阵，原始向量不可用时返回None
+        """
+        ntotal = self.faiss_index.ntotal
+        if isinstance(self.faiss_index, faiss.IndexFlat):
+            vectors = self.faiss_index.reconstruct_n(0, ntotal)
+            # Flat索引即原始向量，总是据此重写原始向量文件，之后由压缩索引继续升级时仍可使用原始向量训练
+            with open(self.embeddings_file, 'wb') as f:
+                vectors.tofile(f)
+            self._embeddings_synced = True
+            return vectors
+        
+        if self._has_original_embeddings():
+            return np.fromfile(str(self.embeddings_file), dtype=np.float32).reshape(ntotal, -1)
+        return None
+    
+    def _has_original_embeddings(self, expected_rows: int = None) -> bool:
+        """原始向量文件是否与索引同步（默认要求行数等于当前索引向量数，文件不存在视为0行）"""
+        if not self._embeddings_synced:
+            return False
+        if expected_rows is None:
+            expected_rows = self.faiss_index.ntotal
+        file_size = self.embeddings_file.stat().st_size if self.embeddings_file.exists() else 0
+        row_bytes = self.faiss_index.d * np.dtype(np.float32).itemsize
+        return file_size == expected_rows * row_bytes
+    
+    def rebuild_index(self) -> Dict[str, Any]:
+        """按当前向量数将索引重建为对应分级的索引类型
+        
+        使用原始向量训练并按原顺序重新加入新索引，保留原索引的距离度量，chunk_ids映射保持不变。
+        重建需要读取全部向量并训练量化器，耗时较长，因此只在显式调用时执行。
+        
+        Returns:
+            Dict[str, Any]: 重建结果
+        """
+        target_factory = self._target_index_factory()
+        if target_factory == self.index_factory:
+            return {"rebuilt": False, "factory": self.index_factory, "message": "索引类型已与向量规模匹配，无需重建"}
+        
+        vectors = self._load_original_vectors()
+        if vectors is None:
+            return {
+                "rebuilt": False,
+                "factory": self.index_factory,
+                "message": "缺少原始向量文件，无法基于压缩索引重新训练，请使用重建脚本从文档重新生成向量"
+            }
+        
+        ntotal = self.faiss_index.ntotal
+        logger.info(f"开始重建索引({ntotal}个向量): {self.index_factory} -> {target_factory}")
+        
+        new_index = faiss.index_factory(self.faiss_index.d, target_factory, self.faiss_index.metric_type)
+        
+        if not new_index.is_trained:
+            train_vectors = vectors
+            if ntotal > INDEX_CONFIG["max_train_vectors"]:
+                sample = np.random.default_rng(0).choice(ntotal, INDEX_CONFIG["max_train_vectors"], replace=False)
+                train_vectors = vectors[sample]
+            new_index.train(train_vectors)
+        
+        new_index.add(vectors)
+        previous_factory = self.index_factory
+        self.faiss_index = new_index
+        self.index_factory = target_factory
+        self._apply_search_params()
+        self._save_index()
+        
+        logger.info(f"索引重建完成，包含{new_index.ntotal}个向量")
+        return {"rebuilt": True, "previous_factory": previous_factory, "factory": target_factory, "total_vectors": new_index.ntotal}
     
     def add_document(self, doc_id: str, title: str, content: str) -> int:
         """添加文档到索引"""
@@ -386,6 +556,7 @@ class VectorSearchEngine:
             # 智能分块
             chunks = self._chunk_text(content)
             added_chunks = 0
+            added_embeddings = []
             
             with self.db_manager.get_connection() as conn:
                 for i, chunk in enumerate(chunks):
@@ -398,6 +569,7 @@ class VectorSearchEngine:
                     
                     # 添加到FAISS索引
                     self.faiss_index.add(embedding.reshape(1, -1))
+                    added_embeddings.append(embedding)
                     
                     # 创建分块ID
                     chunk_id = f"{doc_id}_chunk_{i}"
@@ -414,9 +586,18 @@ class VectorSearchEngine:
                 
                 conn.commit()
             
+            # 原始向量文件与索引保持同步时才继续追加，否则留待重建时从Flat索引补齐
+            if self._has_original_embeddings(self.faiss_index.ntotal - len(added_embeddings)):
+                self._append_original_embeddings(added_embeddings)
+            else:
+                self._embeddings_synced = False
+            
             # 保存索引到文件
             self._save_index()
             
+            # 向量数达到阈值时提示重建（重建耗时较长，不在导入请求中执行）
+            self._check_index_tier()
+            
             logger.info(f"文档{doc_id}添加到索引，共{added_chunks}个分块")
             return added_chunks
             
@@ -424,6 +605,91 @@ class VectorSearchEngine:
             logger.error(f"添加文档到索引失败: {e}")
             raise
     
+    def _embed_query(self, query: str) -> np.ndarray:
+        """获取归一化的查询向量（LRU缓存）"""
+        cached = self._query_embedding_cache.get(query)
+        if cached is not None:
+            self._query_embedding_cache.move_to_end(query)
+            return cached
+        
+        query_embedding = self._get_embedding(query)
+        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        
+        self._query_embedding_cache[query] = query_embedding
+        if len(self._query_embedding_cache) > INDEX_CONFIG["query_cache_size"]:
+            self._query_embedding_cache.popitem(last=False)
+        return query_embedding
+    
+    def _collect_results(self, conn, scores, indices, top_k: int, category: str) -> List[Dict]:
+        """将一行FAISS检索结果转换为文档结果列表（去重、分类过滤）"""
+        results = []
+        seen_docs = set()
+        
+        for score, idx in zip(scores, indices):
+            if idx < 0 or idx >= len(self.chunk_ids):
+                continue
+            chunk_id = self.chunk_ids[idx]
+            
+            # 获取文档信息
+            cursor = conn.execute("""
+                SELECT d.doc_id, d.original_filename, d.title, d.category, d.subcategory,
+                       c.content, c.chunk_index
+                FROM documents d
+                JOIN document_chunks c ON d.doc_id = c.doc_id
+                WHERE c.chunk_id = ? AND d.status = 'active'
+            """, (chunk_id,))
+            
+            row = cursor.fetchone()
+            if row:
+                doc_id = row['doc_id']
+                
+                # 避免重复文档
+                if doc_id in seen_docs:
+                    continue
+                
+                # 分类过滤
+                if category and row['category'] != category:
+                    continue
+                
+                # 处理content_preview
+                content = row['content']
+                try:
+                    # 确保content是字符串类型
+                    if content:
+                        if isinstance(content, bytes):
+                            content = content.decode('utf-8', errors='replace')
+                        elif not isinstance(content, str):
+                            content = str(content)
+                        
+                        # 直接截取内容，不进行额外的编码操作
+                        content_preview = content[:200] + "..." if len(content) > 200 else content
+                        
+                        # 确保预览内容是有效的UTF-8字符串
+                        content_preview = content_preview.encode('utf-8', errors='replace').decode('utf-8')
+                    else:
+                        content_preview = "内容预览暂不可用"
+                except Exception as e:
+                    logger.warning(f"处理content_preview时出错: {e}")
+                    content_preview = "内容预览暂不可用"
+                
+                result = {
+                    "doc_id": row['doc_id'],
+                    "title": row['title'],
+                    "filename": row['original_filename'],
+                    "category": row['category'],
+                    "subcategory": row['subcategory'],
+                    "content_preview": content_preview,
+                    "similarity_score": float(score),
+                    "chunk_index": row['chunk_index']
+                }
+                results.append(result)
+                seen_docs.add(doc_id)
+                
+                if len(results) >= top_k:
+                    break
+        
+        return results
+    
     def search(self, query: str, top_k: int = 5, category: str = "") -> List[Dict]:
         """搜索相关文档"""
         try:
@@ -431,8 +697,7 @@ class VectorSearchEngine:
                 return []
             
             # 获取查询向量
-            query_embedding = self._get_embedding(query)
-            query_embedding = query_embedding / np.linalg.norm(query_embedding)
+            query_embedding = self._embed_query(query)
             
             # FAISS搜索
             scores, indices = self.faiss_index.search(
@@ -441,78 +706,50 @@ class VectorSearchEngine:
             )
             
             # 获取详细信息
-            results = []
-            seen_docs = set()
-            
             with self.db_manager.get_connection() as conn:
-                for score, idx in zip(scores[0], indices[0]):
-                    if idx < len(self.chunk_ids):
-                        chunk_id = self.chunk_ids[idx]
-                        
-                        # 获取文档信息
-                        cursor = conn.execute("""
-                            SELECT d.doc_id, d.original_filename, d.title, d.category, d.subcategory,
-                                   c.content, c.chunk_index
-                            FROM documents d
-                            JOIN document_chunks c ON d.doc_id = c.doc_id
-                            WHERE c.chunk_id = ? AND d.status = 'active'
-                        """, (chunk_id,))
-                        
-                        row = cursor.fetchone()
-                        if row:
-                            doc_id = row['doc_id']
-                            
-                            # 避免重复文档
-                            if doc_id in seen_docs:
-                                continue
-                            
-                            # 分类过滤
-                            if category and row['category'] != category:
-                                continue
-                            
-                            # 处理content_preview
-                            content = row['content']
-                            try:
-                                # 确保content是字符串类型
-                                if content:
-                                    if isinstance(content, bytes):
-                                        content = content.decode('utf-8', errors='replace')
-                                    elif not isinstance(content, str):
-                                        content = str(content)
-                                    
-                                    # 直接截取内容，不进行额外的编码操作
-                                    content_preview = content[:200] + "..." if len(content) > 200 else content
-                                    
-                                    # 确保预览内容是有效的UTF-8字符串
-                                    content_preview = content_preview.encode('utf-8', errors='replace').decode('utf-8')
-                                else:
-                                    content_preview = "内容预览暂不可用"
-                            except Exception as e:
-                                logger.warning(f"处理content_preview时出错: {e}")
-                                content_preview = "内容预览暂不可用"
-                            
-                            result = {
-                                "doc_id": row['doc_id'],
-                                "title": row['title'],
-                                "filename": row['original_filename'],
-                                "category": row['category'],
-                                "subcategory": row['subcategory'],
-                                "content_preview": content_preview,
-                                "similarity_score": float(score),
-                                "chunk_index": row['chunk_index']
-                            }
-                            results.append(result)
-                            seen_docs.add(doc_id)
-                            
-                            if len(results) >= top_k:
-                                break
-            
-            return results
+                return self._collect_results(conn, scores[0], indices[0], top_k, category)
             
         except Exception as e:
             logger.error(f"搜索失败: {e}")
             return []
     
+    def search_batch(self, queries: List[Dict[str, Any]], top_k: int = 5) -> List[List[Dict]]:
+        """批量搜索相关文档
+        
+        所有查询向量堆叠为(nq, d)矩阵后只调用一次FAISS search，
+        并共用一个数据库连接获取文档详情。
+        
+        Args:
+            queries: 查询列表，每项包含query，可选category和top_k
+            top_k: 未单独指定top_k的查询使用的默认返回数量
+            
+        Returns:
+            List[List[Dict]]: 与queries一一对应的结果列表
+        """
+        try:
+            if not queries or not self.faiss_index or len(self.chunk_ids) == 0:
+                return [[] for _ in queries]
+            
+            # 获取全部查询向量
+            query_matrix = np.stack([self._embed_query(item["query"]) for item in queries]).astype(np.float32)
+            per_query_k = [item.get("top_k", top_k) for item in queries]
+            
+            # FAISS批量搜索 - 按最大top_k搜索，再逐行截断
+            scores, indices = self.faiss_index.search(
+                query_matrix,
+                min(max(per_query_k) * 2, len(self.chunk_ids))  # 搜索更多结果以便过滤
+            )
+            
+            with self.db_manager.get_connection() as conn:
+                return [
+                    self._collect_results(conn, scores[row], indices[row], per_query_k[row], item.get("category", ""))
+                    for row, item in enumerate(queries)
+                ]
+            
+        except Exception as e:
+            logger.error(f"批量搜索失败: {e}")
+            return [[] for _ in queries]
+    
     def _save_index(self):
         """保存索引到文件"""
         try:
@@ -553,6 +790,14 @@ class VectorSearchEngine:
             with open(self.mapping_file, 'w', encoding='utf-8') as f:
                 json.dump(self.chunk_ids, f, ensure_ascii=False, indent=2)
             
+            # 保存索引类型元数据，向量数和映射摘要用于加载时判断原始向量文件是否仍对应本索引
+            with open(self.meta_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "factory": self.index_factory,
+                    "ntotal": self.faiss_index.ntotal,
+                    "mapping_hash": _chunk_mapping_hash(self.chunk_ids)
+                }, f, ensure_ascii=False)
+            
             # 验证映射文件是否创建成功
             if self.mapping_file.exists():
                 logger.info(f"分块映射已保存，共 {len(self.chunk_ids)} 个分块")
@@ -691,6 +936,54 @@ def auto_import_documents():
 # MCP工具函数
 # ================================
 
+def _store_document(doc_id: str, filename: str, title: str, category: str, subcategory: str,
+                    target_file_path: Path, page_count: int, file_size: int,
+                    text_content: str) -> Dict[str, Any]:
+    """保存文档元数据并添加到向量索引，返回导入结果"""
+    # 保存文档元数据
+    with db_manager.get_connection() as conn:
+        conn.execute("""
+            INSERT INTO documents 
+            (doc_id, original_filename, title, category, subcategory, file_path, 
+             upload_time, page_count, file_size)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            doc_id, filename, title, category, subcategory or "",
+            str(target_file_path), datetime.now().isoformat(),
+            page_count, file_size
+        ))
+        conn.commit()
+    
+    # 添加到向量索引
+    logger.info(f"开始添加文档到向量索引: {title}")
+    logger.info(f"文本内容长度: {len(text_content)} 字符")
+    try:
+        chunk_count = vector_engine.add_document(doc_id, title, text_content)
+        logger.info(f"向量索引添加成功，创建了 {chunk_count} 个分块")
+    except Exception as e:
+        logger.error(f"向量索引添加失败: {e}")
+        import traceback
+        logger.error(f"详细错误信息: {traceback.format_exc()}")
+        # 即使向量索引失败，也返回成功，但标记chunk_count为0
+        chunk_count = 0
+    
+    result = {
+        "success": True,
+        "doc_id": doc_id,
+        "filename": filename,
+        "title": title,
+        "category": category,
+        "subcategory": subcategory,
+        "page_count": page_count,
+        "file_size_mb": round(file_size / 1024 / 1024, 2),
+        "chunks_created": chunk_count,
+        "upload_time": datetime.now().isoformat(),
+        "message": f"文档已成功导入到{COMPANY_NAME}运维知识库"
+    }
+    
+    logger.info(f"文档导入成功: {title} ({category})")
+    return result
+
 @mcp.tool()
 def import_file_to_knowledge(
     file_path: str,
@@ -832,54 +1125,102 @@ def import_file_to_knowledge(
                     "error": "PDF文件无法提取文本内容，可能是扫描版PDF或文件损坏。建议使用OCR工具处理扫描版PDF。"
                 }, ensure_ascii=False)
         
-        # 保存文档元数据
-        with db_manager.get_connection() as conn:
-            conn.execute("""
-                INSERT INTO documents 
-                (doc_id, original_filename, title, category, subcategory, file_path, 
-                 upload_time, page_count, file_size)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                doc_id, filename, title, category, subcategory or "",
-                str(target_file_path), datetime.now().isoformat(),
-                page_count, file_size
-            ))
-            conn.commit()
+        result = _store_document(
+            doc_id, filename, title, category, subcategory,
+            target_file_path, page_count, file_size, text_content
+        )
+        return json.dumps(result, ensure_ascii=False, indent=2)
         
-        # 添加到向量索引
-        logger.info(f"开始添加文档到向量索引: {title}")
-        logger.info(f"文本内容长度: {len(text_content)} 字符")
-        try:
-            chunk_count = vector_engine.add_document(doc_id, title, text_content)
-            logger.info(f"向量索引添加成功，创建了 {chunk_count} 个分块")
-        except Exception as e:
-            logger.error(f"向量索引添加失败: {e}")
-            import traceback
-            logger.error(f"详细错误信息: {traceback.format_exc()}")
-            # 即使向量索引失败，也返回成功，但标记chunk_count为0
-            chunk_count = 0
-        
-        result = {
-            "success": True,
-            "doc_id": doc_id,
-            "filename": filename,
-            "title": title,
-            "category": category,
-            "subcategory": subcategory,
-            "page_count": page_count,
-            "file_size_mb": round(file_size / 1024 / 1024, 2),
-            "chunks_created": chunk_count,
-            "upload_time": datetime.now().isoformat(),
-            "message": f"文档已成功导入到{COMPANY_NAME}运维知识库"
-        }
+    except Exception as e:
+        logger.error(f"文档导入失败: {e}")
+        return json.dumps({"error": f"导入失败: {str(e)}"}, ensure_ascii=False)
+
+@mcp.tool()
+def import_text_to_knowledge(
+    content: str,
+    title: str,
+    category: str,
+    subcategory: str = ""
+) -> str:
+    """
+    直接导入文本内容到运维知识库
+    
+    无需调用方先写入临时文件：文本直接保存到知识库文档目录并建立索引
+    
+    Args:
+        content (str): 文档文本内容
+        title (str): 文档标题
+        category (str): 文档分类（电力系统运维/水利系统运维/通信网络运维/安防系统运维/运维标准规范）
+        subcategory (str): 子分类（可选）
         
-        logger.info(f"文档导入成功: {title} ({category})")
+    Returns:
+        str: 导入结果
+    """
+    try:
+        # 初始化服务
+        init_service()
+        
+        # 参数验证
+        if not all([title, category]):
+            return json.dumps({"error": "必填参数不能为空"}, ensure_ascii=False)
+        
+        if not content or not content.strip():
+            return json.dumps({"error": "文档内容为空"}, ensure_ascii=False)
+        
+        if category not in KNOWLEDGE_CATEGORIES:
+            return json.dumps({
+                "error": f"无效的分类，支持的分类: {list(KNOWLEDGE_CATEGORIES.keys())}"
+            }, ensure_ascii=False)
+        
+        # 生成文档ID并保存文本
+        doc_id = str(uuid.uuid4())
+        target_file_path = DOCUMENTS_DIR / f"{doc_id}.txt"
+        encoded = content.encode('utf-8')
+        target_file_path.write_bytes(encoded)
+        
+        result = _store_document(
+            doc_id, f"{title}.txt", title, category, subcategory,
+            target_file_path, 1, len(encoded), content  # 文本视为1页
+        )
         return json.dumps(result, ensure_ascii=False, indent=2)
         
     except Exception as e:
-        logger.error(f"文档导入失败: {e}")
+        logger.error(f"文本导入失败: {e}")
         return json.dumps({"error": f"导入失败: {str(e)}"}, ensure_ascii=False)
 
+def _is_positive_int(value: Any) -> bool:
+    """检查返回数量参数是否为正整数（bool虽是int子类，也视为无效）"""
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def _format_search_response(query: str, category: str, results: List[Dict]) -> Dict[str, Any]:
+    """格式化单个查询的检索结果"""
+    response = {
+        "query": query,
+        "category_filter": category or "全部分类",
+        "total_found": len(results),
+        "search_time": datetime.now().isoformat(),
+        "knowledge_source": f"{COMPANY_NAME}运维知识库",
+        "results": []
+    }
+    
+    for i, result in enumerate(results, 1):
+        formatted_result = {
+            "rank": i,
+            "title": result['title'],
+            "filename": result['filename'],
+            "category": result['category'],
+            "subcategory": result['subcategory'],
+            "similarity_score": round(result['similarity_score'], 4),
+            "content_preview": result['content_preview'],
+            "doc_id": result['doc_id']
+        }
+        response["results"].append(formatted_result)
+    
+    if not results:
+        response["message"] = "未找到相关文档，建议：\n1. 尝试更换关键词\n2. 减少搜索条件\n3. 检查分类筛选"
+    
+    return response
+
 @mcp.tool()
 def search_knowledge(
     query: str,
@@ -915,32 +1256,7 @@ def search_knowledge(
         
         # 执行搜索
         results = vector_engine.search(query, top_k, category)
-        
-        # 格式化结果
-        response = {
-            "query": query,
-            "category_filter": category or "全部分类",
-            "total_found": len(results),
-            "search_time": datetime.now().isoformat(),
-            "knowledge_source": f"{COMPANY_NAME}运维知识库",
-            "results": []
-        }
-        
-        for i, result in enumerate(results, 1):
-            formatted_result = {
-                "rank": i,
-                "title": result['title'],
-                "filename": result['filename'],
-                "category": result['category'],
-                "subcategory": result['subcategory'],
-                "similarity_score": round(result['similarity_score'], 4),
-                "content_preview": result['content_preview'],
-                "doc_id": result['doc_id']
-            }
-            response["results"].append(formatted_result)
-        
-        if not results:
-            response["message"] = "未找到相关文档，建议：\n1. 尝试更换关键词\n2. 减少搜索条件\n3. 检查分类筛选"
+        response = _format_search_response(query, category, results)
         
         logger.info(f"知识搜索完成: {query} - 找到{len(results)}个结果")
         
@@ -961,6 +1277,67 @@ def search_knowledge(
         logger.error(f"知识搜索失败: {e}")
         return json.dumps({"error": f"搜索失败: {str(e)}"}, ensure_ascii=False)
 
+@mcp.tool()
+def search_knowledge_batch(
+    queries: List[Dict[str, Any]],
+    top_k: int = 5
+) -> str:
+    """
+    批量搜索运维知识库
+    
+    一次调用完成多个查询的向量检索，查询向量合并为一次FAISS批量搜索，
+    适用于协调器同时发起多个相关子查询的场景
+    
+    Args:
+        queries (List[Dict]): 查询列表，每项格式为{"query": "...", "category": "", "top_k": 5}，
+                              category和top_k可选
+        top_k (int): 未单独指定top_k的查询使用的默认返回数量（默认5）
+        
+    Returns:
+        str: 与queries顺序一致的搜索结果列表
+    """
+    try:
+        # 初始化服务
+        init_service()
+        
+        # 参数验证
+        if not queries:
+            return json.dumps({"error": "查询列表不能为空"}, ensure_ascii=False)
+        
+        if not _is_positive_int(top_k):
+            return json.dumps({"error": "top_k必须是正整数"}, ensure_ascii=False)
+        
+        for item in queries:
+            if not isinstance(item, dict) or not str(item.get("query", "")).strip():
+                return json.dumps({"error": "每个查询都必须包含非空的query"}, ensure_ascii=False)
+            category = item.get("category", "")
+            if category and category not in KNOWLEDGE_CATEGORIES:
+                return json.dumps({
+                    "error": f"无效的分类，支持的分类: {list(KNOWLEDGE_CATEGORIES.keys())}"
+                }, ensure_ascii=False)
+            if "top_k" in item and not _is_positive_int(item["top_k"]):
+                return json.dumps({
+                    "error": f"查询\"{item['query']}\"的top_k必须是正整数"
+                }, ensure_ascii=False)
+        
+        # 执行批量搜索
+        batch_results = vector_engine.search_batch(queries, top_k)
+        
+        response = {
+            "total_queries": len(queries),
+            "responses": [
+                _format_search_response(item["query"], item.get("category", ""), results)
+                for item, results in zip(queries, batch_results)
+            ]
+        }
+        
+        logger.info(f"批量知识搜索完成: {len(queries)}个查询")
+        return json.dumps(response, ensure_ascii=False, indent=2)
+        
+    except Exception as e:
+        logger.error(f"批量知识搜索失败: {e}")
+        return json.dumps({"error": f"批量搜索失败: {str(e)}"}, ensure_ascii=False)
+
 @mcp.tool()
 def manage_documents(
     action: str,
@@ -970,10 +1347,10 @@ def manage_documents(
     """
     文档管理操作
     
-    支持查看、删除和统计运维知识库中的文档
+    支持查看、删除和统计运维知识库中的文档，以及按向量规模重建索引
     
     Args:
-        action (str): 操作类型（list/delete/info/stats）
+        action (str): 操作类型（list/delete/info/stats/rebuild_index）
         doc_id (str): 文档ID（删除和查看详情时需要）
         category (str): 分类过滤（列表时可选）
         
@@ -1008,10 +1385,12 @@ def manage_documents(
             return _get_document_info(doc_id)
         elif action == "stats":
             return _get_knowledge_stats()
+        elif action == "rebuild_index":
+            return json.dumps(vector_engine.rebuild_index(), ensure_ascii=False, indent=2)
         else:
             return json.dumps({
                 "error": f"无效的操作类型: {action}",
-                "supported_actions": ["list", "delete", "info", "stats"]
+                "supported_actions": ["list", "delete", "info", "stats", "rebuild_index"]
             }, ensure_ascii=False)
             
     except Exception as e:
@@ -124,6 +124,11 @@ def rebuild_vector_index():
         with open(mapping_file, 'w', encoding='utf-8') as f:
             json.dump(chunk_mapping, f, ensure_ascii=False, indent=2)
         
+        # 删除旧索引对应的原始向量文件和索引元数据，避免分级重建时使用过期向量
+        for stale_file in (vectors_dir / "embeddings.f32", vectors_dir / "index_meta.json"):
+            if stale_file.exists():
+                stale_file.unlink()
+        
         logger.info(f"向量索引重建完成！")
         logger.info(f"- 索引文件: {index_file}")
         logger.info(f"- 映射文件: {mapping_file}")
@@ -1734,8 +1734,7 @@ def generate_efficiency_report(report_type: str, target_scope: str, time_period:
 ### 🚀 改进建议
 """
             suggestions = scores_data.get("改进建议", [])
-            for i, suggestion in enumerate(suggestions, 1):
-                report_content += f"{i}. {suggestion}\n"
+            report_content += "".join(f"{i}. {suggestion}\n" for i, suggestion in enumerate(suggestions, 1))
         
         elif report_type == "team":
             # 团队报告
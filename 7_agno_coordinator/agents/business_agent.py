@@ -12,19 +12,37 @@ Version: 2.0.0 - 重构版本，统一使用stdio协议
 
 import json
 import logging
+import re
 import time
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 from .base_agent import BaseAgent, AgentTask, AgentResult
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from standardized_mcp_client_v2 import StandardizedMCPClient
-from config import get_ai_config
+from config import get_ai_config, get_llm_client
 
 # AI配置 - 统一使用环境变量模式
 AI_CONFIG = get_ai_config()
 
+# 按秒缓存的格式化时间戳：同一秒内的多次调用复用同一字符串，避免反复localtime/strftime
+_TS_CACHE = [0, ""]
+
+def _now_str() -> str:
+    """获取当前时间字符串（YYYY-mm-dd HH:MM:SS）"""
+    t = int(time.time())
+    if t != _TS_CACHE[0]:
+        _TS_CACHE[1] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))
+        _TS_CACHE[0] = t
+    return _TS_CACHE[1]
+
+# LLM调用的系统消息
+_LLM_SYSTEM_MESSAGE = "你是智水信息技术有限公司的专业AI分析助手，专注于电力和水利行业的智慧管理解决方案。请提供专业、准确、实用的分析建议。"
+
+# LLM建议行首的编号（如"1."）和项目符号（"-"/"•"）
+_LEAD_RE = re.compile(r'^(?:[0-9]+\.\s*)?(?:[-•]\s*)?')
+
 # ================================
 # BusinessAgent基类 - 重构版本
 # ================================
@@ -80,6 +98,10 @@ class BusinessAgent(BaseAgent):
             self.logger.warning(f"MCP服务健康检查失败: {e}")
             return False
 
+    def _get_timestamp(self) -> str:
+        """获取当前时间戳"""
+        return _now_str()
+    
     def call_mcp_tool(self, tool_name: str, arguments: dict = None, **kwargs) -> dict:
         """
         调用MCP工具 - 使用标准化MCP客户端
@@ -109,7 +131,7 @@ class BusinessAgent(BaseAgent):
                 }
             
             # 调用标准化MCP工具
-            self.logger.debug(f"调用标准化MCP工具: {tool_name}, 参数: {arguments}")
+            self.logger.debug("调用标准化MCP工具: %s, 参数: %s", tool_name, arguments)
             result = self.mcp_client.call_tool(tool_name, arguments)
             
             # 检查结果
@@ -117,7 +139,7 @@ class BusinessAgent(BaseAgent):
                 self.logger.warning(f"标准化MCP工具调用返回错误: {result['error']}")
                 return result
             
-            self.logger.debug(f"标准化MCP工具调用成功: {tool_name}")
+            self.logger.debug("标准化MCP工具调用成功: %s", tool_name)
             return result if isinstance(result, dict) else {"result": result}
             
         except Exception as e:
@@ -129,6 +151,47 @@ class BusinessAgent(BaseAgent):
                 "arguments": arguments
             }
     
+    def mcp_tool_error(self, mcp_result: Dict[str, Any]) -> Optional[str]:
+        """
+        提取MCP工具调用的错误信息
+        
+        同时检查客户端层面的错误（顶层error字段）和工具层面的错误：
+        result.isError，或工具返回的文本为包含error字段的JSON、以"❌"开头的错误提示。
+        
+        Args:
+            mcp_result: call_mcp_tool的返回结果
+        
+        Returns:
+            Optional[str]: 错误信息，调用成功时返回None
+        """
+        if "error" in mcp_result:
+            return str(mcp_result["error"])
+        
+        result = mcp_result.get("result")
+        if not isinstance(result, dict):
+            return None
+        
+        texts = [
+            item.get("text", "")
+            for item in result.get("content", [])
+            if isinstance(item, dict) and item.get("type") == "text"
+        ]
+        if result.get("isError"):
+            return "\n".join(texts) or "MCP工具返回错误"
+        
+        for text in texts:
+            text = text.lstrip()
+            if text.startswith("❌"):
+                return text
+            if text.startswith("{") and '"error"' in text:
+                try:
+                    payload = json.loads(text)
+                except ValueError:
+                    continue
+                if isinstance(payload, dict) and "error" in payload:
+                    return str(payload["error"])
+        return None
+    
     def cleanup_mcp_client(self):
         """
         清理标准化MCP客户端资源
@@ -159,16 +222,10 @@ class BusinessAgent(BaseAgent):
             str: LLM响应结果
         """
         try:
-            import openai
-            
             self.logger.info(f"开始LLM调用，提示词长度: {len(prompt)}")
             
-            # 配置OpenAI客户端
-            client = openai.OpenAI(
-                api_key=AI_CONFIG.get("api_key", ""),
-                base_url=AI_CONFIG.get("api_base", ""),
-                timeout=kwargs.get("timeout", 30)
-            )
+            # 共享客户端连接池，按调用设置超时
+            client = get_llm_client().with_options(timeout=kwargs.get("timeout", 30))
             
             self.logger.info("OpenAI客户端配置完成，开始发送请求...")
             
@@ -176,7 +233,7 @@ class BusinessAgent(BaseAgent):
             response = client.chat.completions.create(
                 model=AI_CONFIG.get("model", ""),
                 messages=[
-                    {"role": "system", "content": "你是智水信息技术有限公司的专业AI分析助手，专注于电力和水利行业的智慧管理解决方案。请提供专业、准确、实用的分析建议。"},
+                    {"role": "system", "content": _LLM_SYSTEM_MESSAGE},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=kwargs.get("temperature", AI_CONFIG.get("temperature", 0.7)),
@@ -214,6 +271,81 @@ class BusinessAgent(BaseAgent):
             self.logger.error(error_msg)
             return f"LLM调用失败: {error_msg}"
 
+    def stream_llm_lines(self, prompt: str, **kwargs) -> Iterator[str]:
+        """流式调用LLM，逐行产出非空响应文本
+        
+        调用方提前结束迭代时关闭响应流，不再等待剩余内容生成。
+        调用失败时记录日志并结束迭代。
+        
+        Args:
+            prompt: 分析提示词
+            **kwargs: 额外参数（timeout/temperature/max_tokens）
+            
+        Yields:
+            str: 去除首尾空白的响应行
+        """
+        try:
+            client = get_llm_client().with_options(timeout=kwargs.get("timeout", 30))
+            stream = client.chat.completions.create(
+                model=AI_CONFIG.get("model", ""),
+                messages=[
+                    {"role": "system", "content": _LLM_SYSTEM_MESSAGE},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=kwargs.get("temperature", AI_CONFIG.get("temperature", 0.7)),
+                max_tokens=kwargs.get("max_tokens", 2000),
+                stream=True
+            )
+        except ImportError:
+            self.logger.error("缺少openai依赖包，请安装: pip install openai")
+            return
+        except Exception as e:
+            self.logger.error(f"LLM流式调用异常: {str(e)}")
+            return
+        
+        buffer = ""
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buffer += delta
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        yield line
+            
+            if buffer.strip():
+                yield buffer.strip()
+        except Exception as e:
+            self.logger.error(f"LLM流式响应读取异常: {str(e)}")
+        finally:
+            stream.close()
+    
+    def collect_llm_recommendations(self, prompt: str, limit: int = 5) -> List[str]:
+        """流式调用LLM并解析建议列表，收集到limit条后提前结束
+        
+        Args:
+            prompt: 建议生成提示词
+            limit: 最多收集的建议条数
+            
+        Returns:
+            List[str]: 去除编号和项目符号后的建议
+        """
+        recommendations = []
+        for line in self.stream_llm_lines(prompt):
+            if line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')) or len(line) > 10:
+                # 清理编号和符号
+                clean_line = _LEAD_RE.sub('', line, count=1)
+                if clean_line:
+                    recommendations.append(clean_line)
+                    if len(recommendations) >= limit:
+                        break
+        return recommendations
+
     def execute_task(self, task: AgentTask) -> AgentResult:
         """执行业务分析任务（基础实现）"""
         start_time = time.time()
@@ -313,7 +445,7 @@ class BusinessAgent(BaseAgent):
             processed_data.update({
                 "task_id": task.task_id,
                 "task_type": task.task_type,
-                "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')
+                "timestamp": _now_str()
             })
             
             # 数据验证
@@ -343,7 +475,7 @@ class BusinessAgent(BaseAgent):
                 "agent_id": self.agent_id,
                 "analysis_type": task.task_type,
                 "raw_data": raw_result,
-                "processed_at": time.strftime('%Y-%m-%d %H:%M:%S')
+                "processed_at": _now_str()
             }
             
             # 合并原始结果
@@ -399,7 +531,7 @@ class BusinessAgent(BaseAgent):
             
             return {
                 "summary_content": ai_response,
-                "generated_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+                "generated_at": _now_str(),
                 "agent_name": self.agent_name
             }
             
@@ -408,7 +540,7 @@ class BusinessAgent(BaseAgent):
             return {
                 "summary_content": "AI总结生成失败，请查看原始分析结果",
                 "error": str(e),
-                "generated_at": time.strftime('%Y-%m-%d %H:%M:%S')
+                "generated_at": _now_str()
             }
 
     def calculate_confidence_score(self, result: Dict[str, Any]) -> float:
@@ -462,19 +594,8 @@ class BusinessAgent(BaseAgent):
             每条建议要具体、可操作，针对智水信息的电力和水利行业特点。
             """
             
-            response = self.call_llm(prompt)
-            
-            # 解析建议列表
-            recommendations = []
-            for line in response.split('\n'):
-                line = line.strip()
-                if line and (line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')) or len(line) > 10):
-                    # 清理编号和符号
-                    import re
-                    clean_line = re.sub(r'^[0-9]+\.\s*', '', line)
-                    clean_line = re.sub(r'^[-•]\s*', '', clean_line)
-                    if clean_line:
-                        recommendations.append(clean_line)
+            # 流式解析建议列表，收集够条数即停止生成
+            recommendations = self.collect_llm_recommendations(prompt)
             
             return recommendations if recommendations else ["基于当前分析结果，建议制定业务发展策略"]
             
@@ -231,10 +231,11 @@ class CostAgent(BusinessAgent):
         # 兼容处理：从input_data字段或直接从data获取业务数据
         business_data = data.get("input_data", data)
         
-        # 添加调试日志
-        self.logger.debug(f"验证输入数据 - task.input_data keys: {list(data.keys()) if isinstance(data, dict) else 'not dict'}")
-        self.logger.debug(f"验证输入数据 - business_data keys: {list(business_data.keys()) if isinstance(business_data, dict) else 'not dict'}")
-        self.logger.debug(f"验证输入数据 - business_data: {business_data}")
+        # 添加调试日志（仅DEBUG级别时构造日志内容）
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"验证输入数据 - task.input_data keys: {list(data.keys()) if isinstance(data, dict) else 'not dict'}")
+            self.logger.debug(f"验证输入数据 - business_data keys: {list(business_data.keys()) if isinstance(business_data, dict) else 'not dict'}")
+            self.logger.debug(f"验证输入数据 - business_data: {business_data}")
         
         # 检查分析类型
         analysis_type = business_data.get("analysis_type")
@@ -279,8 +280,9 @@ class CostAgent(BusinessAgent):
             analysis_type = input_data.get("analysis_type", task.task_type)
             
             self.logger.info(f"开始执行成本预测分析: {analysis_type}")
-            self.logger.debug(f"输入数据结构: {list(data.keys())}")
-            self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"输入数据结构: {list(data.keys())}")
+                self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
             
             # 验证输入数据
             is_valid, errors = self.validate_input_data(task)
@@ -562,11 +564,6 @@ class CostAgent(BusinessAgent):
                 "考虑使用新技术提高施工效率"
             ]
     
-    def _get_timestamp(self) -> str:
-        """获取当前时间戳"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
     # ============================================================================
     # MCP服务调用方法
     # ============================================================================
@@ -370,8 +370,9 @@ class EfficiencyAgent(BusinessAgent):
         analysis_type = input_data.get("analysis_type")
         
         self.logger.info(f"开始效能分析，类型: {analysis_type}")
-        self.logger.debug(f"输入数据结构: {list(data.keys())}")
-        self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"输入数据结构: {list(data.keys())}")
+            self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
         
         try:
             # 输入数据验证
@@ -704,11 +705,6 @@ class EfficiencyAgent(BusinessAgent):
             }
         )
 
-    def _get_timestamp(self) -> str:
-        """获取当前时间戳"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
     # ============================================================================
     # 综合LLM分析方法
     # ============================================================================
@@ -10,12 +10,48 @@ Version: 2.0.0 (Stdio MCP)
 import json
 import logging
 import re
-from typing import Dict, List, Any, Optional
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Final
+import orjson
 from .business_agent import BusinessAgent, AgentTask, AgentResult
+from config import RESPONSE_CACHE_CONFIG
+
+# 财务咨询结果缓存：相同问题在多个会话中反复出现，命中时跳过MCP调用
+# key为(question, industry)的blake2b摘要，value为(写入时间, MCP结果的JSON快照)；
+# 以序列化快照保存，命中时反序列化出新对象，调用方修改返回结果不会影响缓存
+_CONSULTATION_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+# 多个Agent实例可能在不同线程中同时读写缓存，查找/淘汰需在锁内完成
+_CONSULTATION_CACHE_LOCK = threading.Lock()
+
+def _consultation_key(question: str, industry: str) -> bytes:
+    """生成财务咨询缓存键"""
+    return hashlib.blake2b(f"{industry}\x00{question}".encode("utf-8"), digest_size=8).digest()
+
+def _csv_value_count(text: str) -> int:
+    """统计逗号分隔数据中的非空字段数（与MCP服务端解析时跳过空字段的规则一致）"""
+    return sum(1 for x in text.split(",") if x.strip())
 
 class FinancialAgent(BusinessAgent):
     """财务分析专家Agent - 完全由LLM驱动"""
     
+    # 财务分析专业配置（只读，所有实例共享）
+    ANALYSIS_TYPES: Final = MappingProxyType({
+        "cash_flow_prediction": "现金流预测分析",      # 对应 predict_cash_flow 工具
+        "investment_analysis": "投资回报评估",         # 对应 calculate_IRR_metrics 工具
+        "budget_monitoring": "预算执行监控",           # 对应 monitor_budget_execution 工具
+        "financial_consultation": "财务咨询服务"       # 对应 financial_qa_assistant 工具
+    })
+    
+    # MCP工具参数模板：调用时copy后填充，避免每次从字面量重建字典
+    _CASH_FLOW_ARGS = {"historical_data": None, "periods": 6, "data_type": "csv"}
+    _INVESTMENT_ARGS = {"cash_flows": None, "initial_investment": None, "project_name": "投资项目"}
+    _BUDGET_ARGS = {"project_data": "", "project_name": "预算项目", "data_format": "csv"}
+    _CONSULTATION_ARGS = {"question": None, "industry": "general"}
+    
     def __init__(self):
         """初始化财务分析专家"""
         super().__init__(
@@ -24,14 +60,6 @@ class FinancialAgent(BusinessAgent):
             mcp_service="financial"
         )
         
-        # 财务分析专业配置
-        self.analysis_types = {
-            "cash_flow_prediction": "现金流预测分析",      # 对应 predict_cash_flow 工具
-            "investment_analysis": "投资回报评估",         # 对应 calculate_IRR_metrics 工具
-            "budget_monitoring": "预算执行监控",           # 对应 monitor_budget_execution 工具
-            "financial_consultation": "财务咨询服务"       # 对应 financial_qa_assistant 工具
-        }
-        
         self.logger.info("财务分析专家初始化完成")
 
     def get_system_prompt(self) -> str:
@@ -93,7 +121,7 @@ class FinancialAgent(BusinessAgent):
             errors.append("缺少分析类型(analysis_type)")
             return False, errors
             
-        if analysis_type not in self.analysis_types:
+        if analysis_type not in self.ANALYSIS_TYPES:
             errors.append(f"不支持的分析类型: {analysis_type}")
             return False, errors
         
@@ -104,6 +132,16 @@ class FinancialAgent(BusinessAgent):
                 "historical_data" not in business_data.get("cash_flow_data", {})) and \
                "historical_data" not in business_data:
                 errors.append("现金流预测需要历史数据(cash_flow_data.historical_data)")
+            else:
+                # CSV数据提前做数值个数检查，避免MCP服务端做昂贵的拒绝处理（直接字段和嵌套结构都检查）
+                cash_flow_data = business_data.get("cash_flow_data", {})
+                for source in (business_data, cash_flow_data):
+                    historical_data = source.get("historical_data")
+                    data_type = source.get("data_type", business_data.get("data_type", "csv"))
+                    if (isinstance(historical_data, str) and data_type == "csv"
+                            and _csv_value_count(historical_data) < 4):
+                        errors.append("现金流预测的CSV历史数据至少需要4个数据点")
+                        break
         
         elif analysis_type == "investment_analysis":
             # 检查investment_data结构或直接字段
@@ -118,6 +156,15 @@ class FinancialAgent(BusinessAgent):
             if ("project_data" not in budget_data and "project_revenue" not in business_data) or \
                ("project_data" not in budget_data and "costs_data" not in business_data):
                 errors.append("预算监控需要项目数据(budget_data.project_data)")
+            else:
+                # CSV格式恰好需要5个数值：项目收入,人力成本,设备投入,技术投入,运营费用（直接字段和嵌套结构都检查）
+                for source in (business_data, budget_data):
+                    project_data = source.get("project_data")
+                    data_format = source.get("data_format", business_data.get("data_format", "csv"))
+                    if (isinstance(project_data, str) and data_format == "csv"
+                            and _csv_value_count(project_data) != 5):
+                        errors.append("预算监控的CSV项目数据需要5个数值(项目收入,人力成本,设备投入,技术投入,运营费用)")
+                        break
         
         elif analysis_type == "financial_consultation":
             if "question" not in business_data:
@@ -132,8 +179,9 @@ class FinancialAgent(BusinessAgent):
         analysis_type = input_data.get("analysis_type")
         
         self.logger.info(f"开始财务分析，类型: {analysis_type}")
-        self.logger.debug(f"输入数据结构: {list(data.keys())}")
-        self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"输入数据结构: {list(data.keys())}")
+            self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
         
         try:
             # 调用MCP服务获取分析结果
@@ -153,7 +201,7 @@ class FinancialAgent(BusinessAgent):
             
             # 构建最终结果
             result = {
-                "analysis_type": self.analysis_types.get(analysis_type, analysis_type),
+                "analysis_type": self.ANALYSIS_TYPES.get(analysis_type, analysis_type),
                 "timestamp": self._get_timestamp(),
                 "input_parameters": input_data,
                 "mcp_result": mcp_result,
@@ -164,84 +212,93 @@ class FinancialAgent(BusinessAgent):
             return result
                 
         except Exception as e:
-            self.logger.error(f"财务分析执行失败: {e}")
+            # logger.exception一次性记录完整堆栈，结构化字段供日志处理器按需使用
+            self.logger.exception("财务分析执行失败", extra={"analysis_type": analysis_type, "phase": "perform"})
             return {"error": f"分析执行失败: {str(e)}"}
 
 
 
 
 
-    def _get_timestamp(self) -> str:
-        """获取当前时间戳"""
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
     # ============================================================================
     # MCP服务调用方法
     # ============================================================================
     
     def _call_mcp_for_cash_flow(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行现金流预测"""
-        historical_data = data["historical_data"]
-        periods = data.get("periods", 6)
-        data_type = data.get("data_type", "csv")  # 默认使用csv格式
+        args = self._CASH_FLOW_ARGS.copy()
+        args["historical_data"] = data["historical_data"]
+        if "periods" in data:
+            args["periods"] = data["periods"]
+        if "data_type" in data:
+            args["data_type"] = data["data_type"]  # 默认使用csv格式
         
         # 修复：使用arguments字典传递参数，添加data_type参数
-        return self.call_mcp_tool(
-            "predict_cash_flow",
-            arguments={
-                "historical_data": historical_data,
-                "periods": periods,
-                "data_type": data_type
-            }
-        )
+        return self.call_mcp_tool("predict_cash_flow", arguments=args)
     
     def _call_mcp_for_investment(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行投资回报计算"""
-        cash_flows = data["cash_flows"]
-        initial_investment = data["initial_investment"]
-        project_name = data.get("project_name", "投资项目")
+        args = self._INVESTMENT_ARGS.copy()
+        args["cash_flows"] = data["cash_flows"]  # 修正参数名称：应该是cash_flows而不是project_cash_flows
+        args["initial_investment"] = data["initial_investment"]
+        if "project_name" in data:
+            args["project_name"] = data["project_name"]
         
         # 修复：使用arguments字典传递参数，纠正参数名称
-        return self.call_mcp_tool(
-            "calculate_IRR_metrics",
-            arguments={
-                "cash_flows": cash_flows,  # 修正参数名称：应该是cash_flows而不是project_cash_flows
-                "initial_investment": initial_investment,
-                "project_name": project_name
-            }
-        )
+        return self.call_mcp_tool("calculate_IRR_metrics", arguments=args)
     
     def _call_mcp_for_budget(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行预算监控"""
         # 直接使用project_data字段，匹配start_optimized.py中的数据结构
-        project_data = data.get("project_data", "")
-        project_name = data.get("project_name", "预算项目")
-        data_format = data.get("data_format", "csv")  # 默认使用csv格式
+        args = self._BUDGET_ARGS.copy()  # data_format默认使用csv格式
+        for key in ("project_data", "project_name", "data_format"):
+            if key in data:
+                args[key] = data[key]
         
         # 修复：使用arguments字典传递参数，确保数据格式正确
-        return self.call_mcp_tool(
-            "monitor_budget_execution",
-            arguments={
-                "project_data": project_data,
-                "project_name": project_name,
-                "data_format": data_format
-            }
-        )
+        return self.call_mcp_tool("monitor_budget_execution", arguments=args)
     
     def _call_mcp_for_consultation(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行财务咨询"""
         question = data["question"]
         industry = data.get("industry", "general")
         
+        use_cache = RESPONSE_CACHE_CONFIG.get("enabled", False)
+        if use_cache:
+            cache_key = _consultation_key(question, industry)
+            cached_snapshot = None
+            with _CONSULTATION_CACHE_LOCK:
+                cached = _CONSULTATION_CACHE.get(cache_key)
+                if cached is not None:
+                    if time.time() - cached[0] < RESPONSE_CACHE_CONFIG.get("cache_ttl", 300):
+                        _CONSULTATION_CACHE.move_to_end(cache_key)
+                        cached_snapshot = cached[1]
+                    else:
+                        del _CONSULTATION_CACHE[cache_key]
+            if cached_snapshot is not None:
+                self.logger.info("财务咨询命中缓存")
+                return orjson.loads(cached_snapshot)
+        
+        args = self._CONSULTATION_ARGS.copy()
+        args["question"] = question
+        args["industry"] = industry
+        
         # 修复：使用arguments字典传递参数
-        return self.call_mcp_tool(
-            "financial_qa_assistant",
-            arguments={
-                "question": question,
-                "industry": industry
-            }
-        )
+        result = self.call_mcp_tool("financial_qa_assistant", arguments=args)
+        
+        # 仅缓存成功结果（包括工具层面的执行结果），失败时下次仍重新调用MCP服务
+        if use_cache and self.mcp_tool_error(result) is None:
+            try:
+                snapshot = orjson.dumps(result)
+            except TypeError as e:
+                self.logger.warning(f"财务咨询结果无法序列化，跳过缓存: {e}")
+            else:
+                with _CONSULTATION_CACHE_LOCK:
+                    _CONSULTATION_CACHE[cache_key] = (time.time(), snapshot)
+                    if len(_CONSULTATION_CACHE) > RESPONSE_CACHE_CONFIG.get("cache_size", 1000):
+                        _CONSULTATION_CACHE.popitem(last=False)
+        
+        return result
     
 
 
@@ -309,7 +366,7 @@ class FinancialAgent(BusinessAgent):
             ]
             
         except Exception as e:
-            self.logger.error(f"生成建议失败: {e}")
+            self.logger.exception("生成建议失败", extra={"phase": "recommendations"})
             return [
                 "建议进行详细的财务分析", 
                 "制定合理的投资策略", 
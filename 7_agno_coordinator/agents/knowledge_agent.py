@@ -16,47 +16,62 @@ import json
 import logging
 import os
 import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Final
+import orjson
 from .business_agent import BusinessAgent, AgentTask, AgentResult
+from config import RESPONSE_CACHE_CONFIG
+
+# 知识检索结果缓存：咨询和最佳实践分析会反复转发相同查询，命中时跳过MCP调用
+# key为(query, category, top_k)，value为(写入时间, MCP结果的JSON快照)；导入新文档后清空
+# 以序列化快照保存，命中时反序列化出新对象，调用方修改返回结果不会影响缓存
+_SEARCH_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+# 多个Agent实例可能在不同线程中同时读写缓存，查找/淘汰/清空需在锁内完成
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+# MCP服务端不存在所调用工具时的错误信息特征（JSON-RPC方法不存在或FastMCP未知工具）
+_UNKNOWN_TOOL_MARKERS = ("unknown tool", "tool not found", "method not found", "-32601")
+
+def _is_unknown_tool_error(error: str) -> bool:
+    """错误信息是否表示服务端不存在所调用的工具"""
+    error = error.lower()
+    return any(marker in error for marker in _UNKNOWN_TOOL_MARKERS)
+
+def _require_any(data: Dict[str, Any], fields: tuple, message: str, errors: List[str]) -> None:
+    """fields中至少一个字段存在且非空，否则记录错误信息"""
+    for field in fields:
+        try:
+            if data[field]:
+                return
+        except KeyError:
+            continue
+    errors.append(message)
 
-# ================================
-# 1. KnowledgeAgent类
-# ================================
+# 建议生成时送入LLM的检索结果摘要：每个查询保留前N条文档的标题和预览
+_LLM_SUMMARY_TOP_K = 3
+_LLM_SUMMARY_PREVIEW_CHARS = 200
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
 
-class KnowledgeAgent(BusinessAgent):
-    """知识管理专家Agent"""
-    
-    def __init__(self):
-        """初始化知识管理专家"""
-        super().__init__(
-            agent_id="knowledge_manager",
-            agent_name="知识管理专家",
-            mcp_service="knowledge"
-        )
-        
-        # 知识管理专业配置
-        self.analysis_types = {
-            "knowledge_search": "知识检索查询",
-            "document_import": "文档导入管理",
-            "knowledge_consultation": "专业知识咨询",
-            "best_practices_analysis": "最佳实践分析"
-        }
-        
-        # 知识分类体系
-        self.knowledge_categories = {
-            "电力系统运维": ["水电站", "火电站", "新能源站", "变电站", "配电系统", "发电机组"],
-            "水利系统运维": ["大坝监测", "水库管理", "灌区系统", "水文监测", "闸门控制", "泵站设备"],
-            "通信网络运维": ["通信设备", "网络系统", "数据传输", "无线通信", "光纤网络", "网络安全"],
-            "安防系统运维": ["视频监控", "门禁系统", "报警系统", "周界防护", "安全检测", "消防系统"],
-            "运维标准规范": ["操作流程", "安全规范", "维护标准", "应急预案", "质量管理", "技术标准"]
-        }
-        
-        self.logger.info("知识管理专家初始化完成")
+# 建议生成提示词的固定前后缀，与分析结果摘要拼接成完整提示词
+_REC_PROMPT_HEAD: Final[str] = "基于以下知识管理分析结果，请生成3-5条具体的知识管理建议：\n\n分析结果："
+_REC_PROMPT_TAIL: Final[str] = """
 
-    def get_system_prompt(self) -> str:
-        """获取知识管理专家的系统提示词"""
-        return """你是智水信息技术有限公司的资深知识管理专家，拥有10年以上电力水利行业信息化运维和知识管理经验。
+请提供：
+1. 知识检索优化建议
+2. 知识应用指导建议
+3. 知识库建设建议
+4. 知识共享推广建议
+5. 专业能力提升建议
+
+每条建议要具体、可操作，针对智水信息的知识管理需求。"""
+
+# 知识管理专家系统提示词（模块级常量，各任务共享同一字符串对象）
+_KNOWLEDGE_SYSTEM_PROMPT: Final[str] = """你是智水信息技术有限公司的资深知识管理专家，拥有10年以上电力水利行业信息化运维和知识管理经验。
 
 ## 🎯 专业定位与职责
 你是企业知识资产的守护者和智能导航员，专精于：
@@ -260,6 +275,70 @@ class KnowledgeAgent(BusinessAgent):
 
 你现在开始运用以上专业知识和服务能力，为智水信息的客户提供高质量的知识管理服务。始终保持检索的精准性、知识的权威性和服务的便民性，确保每一次知识服务都能为用户解决实际问题，提升工作效率。"""
 
+# ================================
+# 1. KnowledgeAgent类
+# ================================
+
+class KnowledgeAgent(BusinessAgent):
+    """知识管理专家Agent"""
+    
+    # 知识管理专业配置（只读，所有实例共享）
+    ANALYSIS_TYPES: Final = MappingProxyType({
+        "knowledge_search": "知识检索查询",
+        "document_import": "文档导入管理",
+        "knowledge_consultation": "专业知识咨询",
+        "best_practices_analysis": "最佳实践分析"
+    })
+    
+    # 知识分类体系
+    KNOWLEDGE_CATEGORIES: Final = MappingProxyType({
+        "电力系统运维": ("水电站", "火电站", "新能源站", "变电站", "配电系统", "发电机组"),
+        "水利系统运维": ("大坝监测", "水库管理", "灌区系统", "水文监测", "闸门控制", "泵站设备"),
+        "通信网络运维": ("通信设备", "网络系统", "数据传输", "无线通信", "光纤网络", "网络安全"),
+        "安防系统运维": ("视频监控", "门禁系统", "报警系统", "周界防护", "安全检测", "消防系统"),
+        "运维标准规范": ("操作流程", "安全规范", "维护标准", "应急预案", "质量管理", "技术标准")
+    })
+    
+    # 检索建议规则：按优先级排列，查询命中多个关键词时取最靠前的规则
+    _SEARCH_RECO_RULES = (
+        ("故障", ("建议查看相关设备的历史故障记录", "检查设备维护手册中的故障排除章节")),
+        ("监测", ("建议查看监测系统的技术规范", "参考相关行业标准和最佳实践")),
+        ("安全", ("建议查看安全管理制度和应急预案", "参考相关安全技术标准")),
+    )
+    _SEARCH_RECO_PATTERN = re.compile("|".join(re.escape(keyword) for keyword, _ in _SEARCH_RECO_RULES))
+    
+    # 各分析类型的必需输入：(可选字段, 缺失时的错误信息)
+    _REQUIRED_INPUTS = {
+        "knowledge_search": (("query", "queries"), "知识检索需要查询内容(query)"),
+        "document_import": (("document_path", "document_content"), "文档导入需要文档路径(document_path)或文档内容(document_content)"),
+        "knowledge_consultation": (("question",), "知识咨询需要问题内容(question)"),
+    }
+    
+    def __init__(self):
+        """初始化知识管理专家"""
+        super().__init__(
+            agent_id="knowledge_manager",
+            agent_name="知识管理专家",
+            mcp_service="knowledge"
+        )
+        
+        # 分析类型到处理方法的分派表
+        self._dispatch = {
+            "knowledge_search": self._perform_knowledge_search,
+            "document_import": self._perform_document_import,
+            "knowledge_consultation": self._perform_knowledge_consultation,
+            "best_practices_analysis": self._perform_best_practices_analysis
+        }
+        
+        # 服务端是否支持文本直接导入（服务端返回未知工具错误后置为False）
+        self._text_import_supported = True
+        
+        self.logger.info("知识管理专家初始化完成")
+
+    def get_system_prompt(self) -> str:
+        """获取知识管理专家的系统提示词"""
+        return _KNOWLEDGE_SYSTEM_PROMPT
+
     def get_required_fields(self) -> List[str]:
         """获取知识管理必需的字段"""
         return ["analysis_type"]  # 基础必需字段，具体字段根据分析类型动态确定
@@ -278,22 +357,21 @@ class KnowledgeAgent(BusinessAgent):
             errors.append("缺少分析类型(analysis_type)")
             return False, errors
             
-        if analysis_type not in self.analysis_types:
+        if analysis_type not in self._dispatch:
             errors.append(f"不支持的分析类型: {analysis_type}")
             return False, errors
         
-        # 根据分析类型检查特定字段
-        if analysis_type == "knowledge_search":
-            if "query" not in business_data or not business_data["query"]:
-                errors.append("知识检索需要查询内容(query)")
+        # 根据分析类型检查特定字段（至少提供其中一个非空字段）
+        required = self._REQUIRED_INPUTS.get(analysis_type)
+        if required:
+            _require_any(business_data, *required, errors)
         
-        elif analysis_type == "document_import":
-            if "document_path" not in business_data and "document_content" not in business_data:
-                errors.append("文档导入需要文档路径(document_path)或文档内容(document_content)")
-        
-        elif analysis_type == "knowledge_consultation":
-            if "question" not in business_data or not business_data["question"]:
-                errors.append("知识咨询需要问题内容(question)")
+        # 批量查询可以是单个查询字符串，或由非空查询字符串组成的列表
+        queries = business_data.get("queries") if analysis_type == "knowledge_search" else None
+        if queries and not isinstance(queries, str) and not (
+            isinstance(queries, (list, tuple)) and all(isinstance(q, str) and q.strip() for q in queries)
+        ):
+            errors.append("批量查询(queries)必须为查询字符串或非空查询字符串列表")
         
         return len(errors) == 0, errors
 
@@ -304,21 +382,16 @@ class KnowledgeAgent(BusinessAgent):
         analysis_type = input_data.get("analysis_type")
         
         self.logger.info(f"开始知识管理分析，类型: {analysis_type}")
-        self.logger.debug(f"输入数据结构: {list(data.keys())}")
-        self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"输入数据结构: {list(data.keys())}")
+            self.logger.debug(f"业务数据结构: {list(input_data.keys())}")
         
         try:
             # 调用对应的分析方法
-            if analysis_type == "knowledge_search":
-                result = self._perform_knowledge_search(input_data)
-            elif analysis_type == "document_import":
-                result = self._perform_document_import(input_data)
-            elif analysis_type == "knowledge_consultation":
-                result = self._perform_knowledge_consultation(input_data)
-            elif analysis_type == "best_practices_analysis":
-                result = self._perform_best_practices_analysis(input_data)
-            else:
+            handler = self._dispatch.get(analysis_type)
+            if handler is None:
                 raise ValueError(f"未实现的分析类型: {analysis_type}")
+            result = handler(input_data)
             
             if "error" in result:
                 return result
@@ -335,11 +408,6 @@ class KnowledgeAgent(BusinessAgent):
             self.logger.error(f"知识管理分析执行失败: {e}")
             return {"error": f"分析执行失败: {str(e)}"}
     
-    def _get_timestamp(self) -> str:
-        """获取当前时间戳"""
-        import time
-        return time.strftime('%Y-%m-%d %H:%M:%S')
-    
     def _call_mcp_for_search(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行知识检索"""
         query = data["query"]
@@ -356,7 +424,11 @@ class KnowledgeAgent(BusinessAgent):
         )
     
     def _call_mcp_for_import(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """调用MCP服务进行文档导入"""
+        """调用MCP服务进行文档导入
+        
+        仅有文本内容时优先调用import_text_to_knowledge直接导入，
+        服务端不支持该工具时才回退为临时文件+import_file_to_knowledge。
+        """
         document_path = data.get("document_path", "")
         document_content = data.get("document_content", "")
         document_title = data.get("document_title", "未命名文档")
@@ -365,37 +437,52 @@ class KnowledgeAgent(BusinessAgent):
         if document_path:
             return self.call_mcp_tool(
                 "import_file_to_knowledge",
-                arguments={
-                    "file_path": document_path,
-                    "title": document_title,
-                    "category": category
-                }
+                file_path=document_path,
+                title=document_title,
+                category=category
             )
-        else:
-            # 知识库MCP服务不支持直接导入文本内容
-            # 需要先将文本保存为临时文件再导入
-            if not self.mcp_client:
-                raise Exception("MCP客户端不可用")
-            
-            # 创建临时文件
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as f:
-                f.write(document_content)
-                temp_file_path = f.name
-            
+        
+        if not document_content:
+            return {"error": "必须提供文档路径或文档内容"}
+        
+        if self._text_import_supported:
+            mcp_result = self.call_mcp_tool(
+                "import_text_to_knowledge",
+                content=document_content,
+                title=document_title,
+                category=category
+            )
+            error = self.mcp_tool_error(mcp_result)
+            if error is None:
+                return mcp_result
+            if _is_unknown_tool_error(error):
+                # 服务端没有该工具，后续请求不再尝试
+                self.logger.warning("服务端不支持文本直接导入，回退为临时文件导入")
+                self._text_import_supported = False
+            else:
+                # 连接失败、超时等其他错误只对本次请求回退，下次仍优先直接导入
+                self.logger.warning(f"文本直接导入失败，本次回退为临时文件导入: {error}")
+        
+        try:
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as temp_file:
+                temp_file.write(document_content)
+                temp_file_path = temp_file.name
+        except OSError as e:
+            return {"error": f"创建临时文件失败: {str(e)}"}
+        
+        try:
+            return self.call_mcp_tool(
+                "import_file_to_knowledge",
+                file_path=temp_file_path,
+                title=document_title,
+                category=category
+            )
+        finally:
+            # 清理临时文件
             try:
-                result = self.call_mcp_tool(
-                    "import_file_to_knowledge",
-                    arguments={
-                        "file_path": temp_file_path,
-                        "title": document_title,
-                        "category": category
-                    }
-                )
-                return result
-            finally:
-                # 清理临时文件
                 os.unlink(temp_file_path)
+            except OSError:
+                pass
     
     def _call_mcp_for_consultation(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """调用MCP服务进行知识咨询"""
@@ -432,23 +519,21 @@ class KnowledgeAgent(BusinessAgent):
         recommendations = []
         
         try:
-            # 基于查询内容生成建议
-            if "故障" in query:
-                recommendations.append("建议查看相关设备的历史故障记录")
-                recommendations.append("检查设备维护手册中的故障排除章节")
-            elif "监测" in query:
-                recommendations.append("建议查看监测系统的技术规范")
-                recommendations.append("参考相关行业标准和最佳实践")
-            elif "安全" in query:
-                recommendations.append("建议查看安全管理制度和应急预案")
-                recommendations.append("参考相关安全技术标准")
+            # 基于查询内容生成建议：一次正则扫描找出命中的关键词，按规则优先级取建议
+            matched = set(self._SEARCH_RECO_PATTERN.findall(query))
+            for keyword, keyword_recos in self._SEARCH_RECO_RULES:
+                if keyword in matched:
+                    recommendations.extend(keyword_recos)
+                    break
             else:
                 recommendations.append("建议扩展搜索关键词")
                 recommendations.append("可以尝试搜索相关的技术文档")
             
-            # 基于MCP结果添加建议
-            if mcp_result and "documents" in mcp_result:
-                doc_count = len(mcp_result.get("documents", []))
+            # 基于MCP工具返回的检索结果添加建议
+            payload = self._parse_tool_payload(mcp_result) if mcp_result else None
+            documents = payload.get("results") if isinstance(payload, dict) else None
+            if documents is not None:
+                doc_count = len(documents)
                 if doc_count > 0:
                     recommendations.append(f"找到{doc_count}个相关文档，建议详细阅读")
                 else:
@@ -460,26 +545,132 @@ class KnowledgeAgent(BusinessAgent):
         
         return recommendations[:3]  # 最多返回3个建议
 
-    def _perform_knowledge_search(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """执行知识检索"""
-        query = data["query"]
-        category = data.get("category", "")
-        top_k = data.get("top_k", 10)
+    def _parse_tool_payload(self, mcp_result: Dict[str, Any]) -> Optional[Any]:
+        """从MCP工具调用响应中解析工具返回的JSON文本"""
+        try:
+            for item in mcp_result.get("result", {}).get("content", []):
+                if item.get("type") == "text":
+                    return json.loads(item.get("text", ""))
+        except (AttributeError, TypeError, ValueError) as e:
+            self.logger.warning(f"解析MCP工具返回内容失败: {e}")
+        return None
+    
+    def _batch_search(self, queries: List[Dict[str, Any]], top_k: int = 5) -> List[Dict[str, Any]]:
+        """批量知识检索
         
-        # 调用MCP服务进行知识检索
-        mcp_result = self.call_mcp_tool(
+        多个查询合并为一次search_knowledge_batch调用（服务端一次FAISS批量搜索），
+        批量工具不可用时回退为逐个调用search_knowledge。
+        
+        Args:
+            queries: 查询列表，每项包含query，可选category和top_k
+            top_k: 默认返回数量
+            
+        Returns:
+            List[Dict]: 与queries一一对应的检索结果，格式与单次调用search_knowledge的MCP响应一致
+        """
+        mcp_result = self.call_mcp_tool("search_knowledge_batch", queries=queries, top_k=top_k)
+        
+        if "error" not in mcp_result:
+            payload = self._parse_tool_payload(mcp_result)
+            if isinstance(payload, dict) and len(payload.get("responses", [])) == len(queries):
+                # 拆分为与单次检索相同的MCP响应结构，后续按单个检索统一组装
+                return [
+                    {"result": {"content": [{"type": "text", "text": orjson.dumps(response).decode()}]}}
+                    for response in payload["responses"]
+                ]
+        
+        self.logger.warning("批量检索不可用，回退为逐个检索")
+        return [
+            self._cached_mcp_search(item["query"], item.get("category", ""), item.get("top_k", top_k))
+            for item in queries
+        ]
+    
+    def _cached_mcp_search(self, query: str, category: str, top_k: int) -> Dict[str, Any]:
+        """调用search_knowledge，相同(query, category, top_k)在TTL内直接返回缓存结果"""
+        use_cache = RESPONSE_CACHE_CONFIG.get("enabled", False)
+        if use_cache:
+            cache_key = (query, category, top_k)
+            cached_snapshot = None
+            with _SEARCH_CACHE_LOCK:
+                cached = _SEARCH_CACHE.get(cache_key)
+                if cached is not None:
+                    if time.time() - cached[0] < RESPONSE_CACHE_CONFIG.get("cache_ttl", 300):
+                        _SEARCH_CACHE.move_to_end(cache_key)
+                        cached_snapshot = cached[1]
+                    else:
+                        del _SEARCH_CACHE[cache_key]
+            if cached_snapshot is not None:
+                self.logger.info("知识检索命中缓存")
+                return orjson.loads(cached_snapshot)
+        
+        result = self.call_mcp_tool(
             "search_knowledge",
             query=query,
             category=category,
             top_k=top_k
         )
         
+        # 仅缓存成功结果（包括工具层面的检索结果），失败时下次仍重新调用MCP服务
+        if use_cache and self.mcp_tool_error(result) is None:
+            try:
+                snapshot = orjson.dumps(result)
+            except TypeError as e:
+                self.logger.warning(f"知识检索结果无法序列化，跳过缓存: {e}")
+            else:
+                with _SEARCH_CACHE_LOCK:
+                    _SEARCH_CACHE[cache_key] = (time.time(), snapshot)
+                    if len(_SEARCH_CACHE) > RESPONSE_CACHE_CONFIG.get("cache_size", 1000):
+                        _SEARCH_CACHE.popitem(last=False)
+        
+        return result
+    
+    def _perform_knowledge_search(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """执行知识检索"""
+        category = data.get("category", "")
+        top_k = data.get("top_k", 10)
+        
+        # 多个子查询合并为一次批量检索，每个查询的结果按单个检索的格式组装
+        queries = data.get("queries")
+        if isinstance(queries, str):
+            queries = [queries]
+        if queries and not data.get("query"):
+            search_results = self._batch_search(
+                [{"query": q, "category": category, "top_k": top_k} for q in queries],
+                top_k
+            )
+            searches = [
+                self._frame_search_result(query, category, top_k, mcp_result)
+                for query, mcp_result in zip(queries, search_results)
+            ]
+            return {
+                "analysis_type": self.ANALYSIS_TYPES["knowledge_search"],
+                "search_params": {
+                    "queries": list(queries),
+                    "category": category,
+                    "top_k": top_k
+                },
+                "searches": searches,
+                "recommendations": list(dict.fromkeys(
+                    recommendation for search in searches for recommendation in search.get("recommendations", ())
+                ))[:3],
+                "timestamp": self._get_timestamp()
+            }
+        
+        return self._search_and_frame(data["query"], category, top_k)
+    
+    def _search_and_frame(self, query: str, category: str, top_k: int) -> Dict[str, Any]:
+        """执行单个知识检索并组装检索结果（知识检索、咨询和最佳实践分析共用）"""
+        # 调用MCP服务进行知识检索
+        return self._frame_search_result(query, category, top_k, self._cached_mcp_search(query, category, top_k))
+    
+    def _frame_search_result(self, query: str, category: str, top_k: int, mcp_result: Dict[str, Any]) -> Dict[str, Any]:
+        """组装单个查询的检索结果（单个检索与批量检索共用）"""
         if "error" in mcp_result:
             return mcp_result
         
         # 简化的分析结果 - 直接返回MCP结果和基本信息
-        enhanced_result = {
-            "analysis_type": "知识检索查询",
+        return {
+            "analysis_type": self.ANALYSIS_TYPES["knowledge_search"],
             "search_params": {
                 "query": query,
                 "category": category,
@@ -489,8 +680,6 @@ class KnowledgeAgent(BusinessAgent):
             "recommendations": self._generate_search_recommendations(mcp_result, query),
             "timestamp": self._get_timestamp()
         }
-        
-        return enhanced_result
 
     def _perform_document_import(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """执行文档导入"""
@@ -500,46 +689,14 @@ class KnowledgeAgent(BusinessAgent):
         category = data.get("category", "")
         
         # 调用MCP服务进行文档导入
-        if document_path:
-            # 直接使用文件路径
-            mcp_result = self.call_mcp_tool(
-                "import_file_to_knowledge",
-                file_path=document_path,
-                title=document_title,
-                category=category
-            )
-        elif document_content:
-            # 当只有内容时，创建临时文件
-            import tempfile
-            import os
-            
-            try:
-                # 创建临时文件
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8') as temp_file:
-                    temp_file.write(document_content)
-                    temp_file_path = temp_file.name
-                
-                # 使用临时文件路径调用MCP工具
-                mcp_result = self.call_mcp_tool(
-                    "import_file_to_knowledge",
-                    file_path=temp_file_path,
-                    title=document_title,
-                    category=category
-                )
-                
-                # 清理临时文件
-                try:
-                    os.unlink(temp_file_path)
-                except:
-                    pass
-                    
-            except Exception as e:
-                mcp_result = {"error": f"创建临时文件失败: {str(e)}"}
-        else:
-            mcp_result = {"error": "必须提供文档路径或文档内容"}
+        mcp_result = self._call_mcp_for_import(data)
+        if "error" not in mcp_result:
+            # 知识库内容已变化，缓存的检索结果失效
+            with _SEARCH_CACHE_LOCK:
+                _SEARCH_CACHE.clear()
         
         return {
-            "analysis_type": "文档导入管理",
+            "analysis_type": self.ANALYSIS_TYPES["document_import"],
             "import_params": {
                 "document_title": document_title,
                 "category": category,
@@ -556,14 +713,10 @@ class KnowledgeAgent(BusinessAgent):
         domain = data.get("domain", "")
         
         # 首先进行知识检索
-        search_result = self._perform_knowledge_search({
-            "query": question,
-            "category": domain,
-            "top_k": 5
-        })
+        search_result = self._search_and_frame(question, domain, 5)
         
         return {
-            "analysis_type": "专业知识咨询",
+            "analysis_type": self.ANALYSIS_TYPES["knowledge_consultation"],
             "consultation_params": {
                 "question": question,
                 "domain": domain
@@ -578,14 +731,10 @@ class KnowledgeAgent(BusinessAgent):
         domain = data.get("domain", "")
         
         # 搜索相关最佳实践
-        search_result = self._perform_knowledge_search({
-            "query": f"{topic} 最佳实践 经验分享",
-            "category": domain,
-            "top_k": 10
-        })
+        search_result = self._search_and_frame(f"{topic} 最佳实践 经验分享", domain, 10)
         
         return {
-            "analysis_type": "最佳实践分析",
+            "analysis_type": self.ANALYSIS_TYPES["best_practices_analysis"],
             "analysis_params": {
                 "topic": topic,
                 "domain": domain
@@ -600,74 +749,79 @@ class KnowledgeAgent(BusinessAgent):
 
     def calculate_confidence_score(self, result: Dict[str, Any]) -> float:
         """基于实际数据计算知识管理置信度"""
-        confidence_factors = []
+        # 各项得分直接累加，无有效数据时为0
+        confidence = 0.0
         
         # 检查MCP服务结果质量
-        if "mcp_result" in result:
-            mcp_result = result["mcp_result"]
-            if "error" not in mcp_result:
-                confidence_factors.append(0.4)  # MCP服务成功
-                
-                # 根据检索结果数量调整
-                if "results_count" in mcp_result:
-                    count = mcp_result.get("results_count", 0)
-                    if count > 0:
-                        confidence_factors.append(min(count * 0.05, 0.2))  # 最多0.2
-                        
-                # 根据检索质量调整
-                if "search_quality" in mcp_result:
-                    quality = mcp_result.get("search_quality", 0)
-                    confidence_factors.append(quality * 0.2)
+        mcp_result = result.get("mcp_result")
+        if mcp_result is None and result.get("searches"):
+            # 批量检索：任一子查询检索成功即视为MCP服务可用
+            mcp_result = next((search["mcp_result"] for search in result["searches"] if "mcp_result" in search), None)
+        if mcp_result is not None and "error" not in mcp_result:
+            confidence += 0.4  # MCP服务成功
+            
+            # 根据检索结果数量调整
+            count = mcp_result.get("results_count", 0)
+            if count > 0:
+                confidence += min(count * 0.05, 0.2)  # 最多0.2
+            
+            # 根据检索质量调整
+            confidence += mcp_result.get("search_quality", 0) * 0.2
         
         # 检查LLM分析质量
         if "knowledge_insights" in result and "error" not in result["knowledge_insights"]:
-            confidence_factors.append(0.2)  # 知识洞察生成成功
+            confidence += 0.2  # 知识洞察生成成功
             
         if "related_topics" in result and "error" not in result["related_topics"]:
-            confidence_factors.append(0.1)  # 主题推荐生成成功
+            confidence += 0.1  # 主题推荐生成成功
             
         if "llm_analysis" in result and "error" not in result["llm_analysis"]:
-            confidence_factors.append(0.1)  # 综合分析生成成功
+            confidence += 0.1  # 综合分析生成成功
         
-        # 计算最终置信度
-        if confidence_factors:
-            final_confidence = sum(confidence_factors)
-            return min(final_confidence, 1.0)
-        else:
-            # 如果没有任何有效数据，置信度为0
-            return 0.0
+        return min(confidence, 1.0)
 
+    def _summarize_for_llm(self, value: Any) -> Any:
+        """压缩分析结果用于LLM提示词
+        
+        MCP响应解析为工具返回内容，检索结果只保留前几条文档的标题、分类和内容预览，
+        避免把完整的文档文本送入LLM。
+        """
+        if isinstance(value, list):
+            return [self._summarize_for_llm(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        
+        if isinstance(value.get("result"), dict) and "content" in value["result"]:
+            payload = self._parse_tool_payload(value)
+            if payload is not None:
+                return self._summarize_for_llm(payload)
+        
+        if isinstance(value.get("results"), list):
+            return {
+                "query": value.get("query", ""),
+                "total_found": value.get("total_found", len(value["results"])),
+                "top_results": [
+                    {
+                        "title": item.get("title", ""),
+                        "category": item.get("category", ""),
+                        "content_preview": str(item.get("content_preview", ""))[:_LLM_SUMMARY_PREVIEW_CHARS]
+                    }
+                    for item in value["results"][:_LLM_SUMMARY_TOP_K]
+                    if isinstance(item, dict)
+                ]
+            }
+        
+        return {key: self._summarize_for_llm(item) for key, item in value.items()}
+    
     def generate_recommendations(self, result: Dict[str, Any]) -> List[str]:
         """基于LLM分析生成知识管理建议"""
         try:
             # 使用LLM生成专业的知识管理建议
-            prompt = f"""
-            基于以下知识管理分析结果，请生成3-5条具体的知识管理建议：
-            
-            分析结果：{json.dumps(result, ensure_ascii=False, indent=2)}
-            
-            请提供：
-            1. 知识检索优化建议
-            2. 知识应用指导建议
-            3. 知识库建设建议
-            4. 知识共享推广建议
-            5. 专业能力提升建议
-            
-            每条建议要具体、可操作，针对智水信息的知识管理需求。
-            """
-            
-            response = self.call_llm(prompt)
+            payload = orjson.dumps(self._summarize_for_llm(result), default=str, option=_ORJSON_OPTIONS).decode()
+            prompt = "".join((_REC_PROMPT_HEAD, payload, _REC_PROMPT_TAIL))
             
-            # 解析建议列表
-            recommendations = []
-            for line in response.split('\n'):
-                line = line.strip()
-                if line and (line.startswith(('1.', '2.', '3.', '4.', '5.', '-', '•')) or len(line) > 10):
-                    # 清理编号和符号
-                    clean_line = re.sub(r'^[0-9]+\.\s*', '', line)
-                    clean_line = re.sub(r'^[-•]\s*', '', clean_line)
-                    if clean_line:
-                        recommendations.append(clean_line)
+            # 流式解析建议列表，收集够条数即停止生成
+            recommendations = self.collect_llm_recommendations(prompt)
             
             return recommendations if recommendations else ["基于当前分析结果，建议优化知识管理策略"]
             
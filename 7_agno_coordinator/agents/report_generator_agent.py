@@ -13,21 +13,30 @@ Author: 商海星辰队
 Version: 1.0.0
 """
 
+import hashlib
+import io
 import json
 import logging
+import re
+import string
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from itertools import chain, cycle
+from operator import attrgetter
+from statistics import fmean
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Final, Tuple, TextIO
 from dataclasses import dataclass
-from openai import OpenAI
+import orjson
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import get_ai_config
+from config import get_ai_config, get_llm_client, RESPONSE_CACHE_CONFIG
 from .base_agent import BaseAgent, AgentTask, AgentResult
-from docx import Document
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.enum.style import WD_STYLE_TYPE
 
 # ================================
 # 1. 配置和初始化
@@ -36,23 +45,369 @@ from docx.enum.style import WD_STYLE_TYPE
 # AI模型配置（统一使用环境变量模式）
 AI_CONFIG = get_ai_config()
 
-# 初始化OpenAI客户端
-client = OpenAI(
-    api_key=AI_CONFIG.get("api_key", ""),
-    base_url=AI_CONFIG.get("api_base", "")
-)
-
 # 日志配置
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ReportGeneratorAgent")
 
+# 综合分析缓存：看板在word/html/dialog间切换时常用同一批Agent结果重复请求
+# key为提示词和模型的blake2b摘要，value为(写入时间, 净化后的LLM输出)
+_ANALYSIS_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+# 多种输出模式并行生成时多个线程同时读写缓存，查找/淘汰需在锁内完成
+_ANALYSIS_CACHE_LOCK = threading.Lock()
+
+def _analysis_cache_key(analysis_prompt: str) -> bytes:
+    """生成综合分析缓存键"""
+    return hashlib.blake2b(f"{AI_CONFIG['model']}\x00{analysis_prompt}".encode("utf-8"), digest_size=16).digest()
+
+# LLM回复中定位第一个完整JSON对象用（raw_decode从指定位置解析并返回结束位置）
+_JSON_DECODER = json.JSONDecoder()
+
+# Agent分析数据序列化选项：缩进格式与json.dumps(indent=2)一致，允许非字符串键
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+def _dumps_pretty(value: Any) -> str:
+    """把分析数据序列化为缩进JSON文本（中文原样输出），用于提示词和报告正文"""
+    return orjson.dumps(value, default=str, option=_ORJSON_OPTIONS).decode()
+
+def _dumps_compact(value: Any) -> str:
+    """把图表数据序列化为紧凑JSON文本（中文原样输出），直接作为JavaScript字面量代入图表脚本"""
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+# 批量取Agent置信度（attrgetter在C层取属性，聚合时不走Python循环）
+_GET_CONFIDENCE = attrgetter("confidence_score")
+
+# 图表配色方案（苹果风格蓝黑白），所有图表共用，只读
+_CHART_COLOR_SCHEME: Final = MappingProxyType({
+    'primary': ('#3b82f6', '#1d4ed8', '#2563eb', '#1e40af'),
+    'secondary': ('#1f2937', '#374151', '#4b5563', '#6b7280'),
+    'accent': ('#f8fafc', '#e2e8f0', '#cbd5e1', '#94a3b8')
+})
+
+# 图表脚本模板使用的扁平化配色字段（如primary_0、accent_2），导入时展开一次
+_CHART_COLORS: Final = MappingProxyType({
+    f"{group}_{index}": color for group, shades in _CHART_COLOR_SCHEME.items() for index, color in enumerate(shades)
+})
+
+# 饼图数据项未指定颜色时依次循环使用的配色
+_PIE_CHART_PALETTE: Final = (_CHART_COLORS['primary_0'], _CHART_COLORS['primary_1'], _CHART_COLORS['primary_2'], _CHART_COLORS['secondary_0'])
+
+# 报告生成专家系统提示词
+_REPORT_SYSTEM_PROMPT: Final[str] = """
+你是智水信息技术有限公司的资深决策支持专家，拥有15年以上电力水利行业数据分析和决策支持报告撰写经验。
+
+## 专业背景
+- 电力水利行业资深决策分析师
+- 精通财务分析、成本预测、效能评估、知识管理的决策支持
+- 擅长基于数据分析的决策建议制定和风险评估
+- 熟悉企业管理决策流程和战略规划实施
+
+## 核心职责
+1. **数据驱动决策分析**：基于多Agent分析结果，进行深度数据挖掘和决策洞察
+2. **决策支持报告生成**：生成面向管理层的决策支持文档，提供明确的行动指导
+3. **风险评估与应对**：识别业务风险点，制定具体的风险应对策略
+4. **可操作建议制定**：提供具体可执行的业务改进方案和实施路径
+5. **数据看板设计**：设计简洁有效的数据可视化看板
+
+## 分析原则
+- **决策导向**：所有分析都围绕具体决策需求展开
+- **数据支撑**：每个结论都有充分的数据证据支持
+- **可执行性**：提供明确的执行步骤和时间节点
+- **风险意识**：充分识别和评估潜在风险
+- **业务价值**：聚焦创造实际业务价值的建议
+
+## 三种输出模式要求
+
+### 1. Word决策支持报告（严格字数要求）
+- **核心定位**：面向管理层的决策支持文档，提供基于数据分析的决策建议
+- **严格按照调用的智能体数量确定报告字数**：
+  - 1个智能体：报告正文不少于1600字
+  - 2个智能体：报告正文不少于2400字
+  - 3个智能体：报告正文不少于3600字
+  - 4个智能体：报告正文不少于4800字
+  - 5个智能体：报告正文不少于6000字
+  - 6个智能体：报告正文不少于7200字
+- **内容要求**：
+  - 详细的执行总结（新增部分）
+  - 详细的数据分析结果解读
+  - 明确的决策建议和实施方案
+  - 全面的风险评估和应对策略
+  - 具体的行动计划和时间节点
+- **报告结构**：执行摘要、执行总结、数据分析、决策建议、风险评估、实施计划
+
+### 2. HTML数据看板（可视化为主）
+- **功能定位**：数据可视化看板，快速展示关键指标和趋势
+- **内容重点**：关键数据指标、趋势图表、核心洞察、简要建议
+- **设计原则**：简洁直观、重点突出、易于理解
+- **文字要求**：简明扼要的描述性文字，突出数据价值
+
+### 3. 对话框回复（决策要点）
+- **功能定位**：与用户的交互对话，传达核心决策要点
+- **内容要求**：决策支持报告的核心要点总结
+- **表达方式**：简洁明了、重点突出、便于理解
+- **包含要素**：关键发现、核心建议、主要风险、下一步行动
+
+## 输出要求
+- Word报告必须达到字数要求，确保决策支持的深度和专业性
+- HTML看板注重数据可视化效果和用户体验
+- 对话回复突出决策要点，便于快速理解
+- 所有输出都必须包含明确的决策建议和风险评估
+- 基于真实数据分析，不使用假数据或模板化内容
+
+请基于提供的多Agent分析结果，生成高质量的决策支持内容。
+"""
+
+# 综合分析请求的system消息，每次调用直接复用
+_REPORT_SYSTEM_MESSAGE: Final = {"role": "system", "content": _REPORT_SYSTEM_PROMPT}
+
+# Word报告按Agent数量的字数要求
+_WORD_LENGTH_REQUIREMENTS: Final = MappingProxyType({
+    1: "不少于1600字",
+    2: "不少于2400字",
+    3: "不少于3600字",
+    4: "不少于4800字",
+    5: "不少于6000字",
+    6: "不少于7200字"
+})
+
+# 各输出模式的固定输出要求（提示词前缀，不含任何随请求变化的内容）
+_WORD_INSTRUCTIONS: Final[str] = """请提供详细的综合分析报告，总字数见下方任务说明：
+
+1. **执行摘要**：详细总结所有分析结果的核心发现（至少300字）
+2. **执行总结**：基于所有智能体分析结果的深度总结，包括关键数据指标、业务影响评估、决策紧迫性分析（至少400字）
+3. **分类分析**：对每个Agent的分析结果进行深入解读和评价（每个Agent至少200字）
+4. **关键洞察**：识别最重要的8-12个业务洞察，每个洞察需要详细说明和数据支撑
+5. **综合建议**：基于所有分析结果提供12-18条可操作的改进建议，每条建议需要详细的实施方案、时间节点和预期效果
+6. **风险评估**：详细识别潜在风险点和具体应对策略，包括风险等级评估和应对时间表
+7. **下一步行动**：明确的后续行动计划，包含详细的时间节点、责任人和成功指标
+8. **整体置信度**：对综合分析结果的置信度评估(0-1)
+
+注意：
+- 必须对每个Agent的结果进行分类深度分析
+- 然后进行总体综合分析
+- 新增的执行总结部分要深入分析业务影响和决策价值
+- 确保内容详实，分析深入，字数达到要求
+- 必须严格按照JSON格式返回，使用以下字段名称：
+{
+    "executive_summary": "执行摘要内容",
+    "executive_conclusion": "执行总结内容", 
+    "detailed_analysis": "分类分析内容",
+    "key_insights": ["洞察1", "洞察2", ...],
+    "recommendations": ["建议1", "建议2", ...],
+    "risk_assessment": {"风险类型1": "风险描述1", "风险类型2": "风险描述2"},
+    "next_actions": ["行动1", "行动2", ...],
+    "overall_confidence": 0.85
+}
+- 确保JSON格式正确，不要包含任何其他文本
+"""
+
+_HTML_INSTRUCTIONS: Final[str] = """请提供HTML数据看板内容：
+
+1. **执行摘要**：简洁的核心发现总结
+2. **关键指标**：重要数据指标和可视化建议
+3. **简要洞察**：3-5个核心业务洞察
+4. **基础建议**：5-8条简明建议
+5. **整体置信度**：对综合分析结果的置信度评估(0-1)
+
+注意：
+- 重点关注数据可视化和关键指标
+- 文字描述简洁明了
+- 请以JSON格式返回，包含以上所有字段
+"""
+
+_CHAT_INSTRUCTIONS: Final[str] = """请提供对话回复内容：
+
+1. **核心发现**：最重要的分析结果
+2. **关键建议**：3-5条核心建议
+3. **风险提醒**：主要风险点
+4. **整体置信度**：对综合分析结果的置信度评估(0-1)
+
+注意：
+- 语言口语化，易于理解
+- 突出核心要点
+- 请以JSON格式返回，包含以上所有字段
+"""
+
+# LLM回复净化用正则，导入时编译一次，各模式的每次回复复用
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+
+# 思考过程标记和非自然语言内容
+# 每个正则都以固定文本开头，先用子串查找判断，文本中不含该前缀时跳过整次正则扫描
+_THINKING_PATTERNS = tuple((literal, re.compile(pattern, re.DOTALL | re.IGNORECASE)) for literal, pattern in (
+    ('[思考]', r'\[思考\].*?\[/思考\]'),  # 思考标记
+    ('[分析]', r'\[分析\].*?\[/分析\]'),  # 分析标记
+    ('[推理]', r'\[推理\].*?\[/推理\]'),  # 推理标记
+    ('[总结]', r'\[总结\].*?\[/总结\]'),  # 总结标记
+    ('让我', r'让我.*?[。！\n]'),   # "让我..."开头的思考
+    ('我需要', r'我需要.*?[。！\n]'),  # "我需要..."开头的思考
+    ('我将', r'我将.*?[。！\n]'),    # "我将..."开头的思考
+    ('我来', r'我来.*?[。！\n]'),    # "我来..."开头的思考
+    ('首先', r'首先.*?然后.*?[。！\n]'),  # 步骤性思考
+    ('根据', r'根据.*?我认为.*?[。！\n]'),  # 推理过程
+    ('基于', r'基于.*?我将.*?[。！\n]'),  # 基于分析的思考
+    ('接下来', r'接下来.*?[。！\n]'),  # 步骤性描述
+    ('现在', r'现在.*?开始.*?[。！\n]'),  # 开始性描述
+    ('通过', r'通过.*?分析.*?[。！\n]'),  # 分析过程描述
+    ('经过', r'经过.*?考虑.*?[。！\n]'),  # 考虑过程
+    ('为了', r'为了.*?我.*?[。！\n]'),   # 目的性思考
+    ('考虑到', r'考虑到.*?因此.*?[。！\n]'),  # 因果推理
+    ('综合', r'综合.*?来看.*?[。！\n]'),   # 综合分析
+    ('从', r'从.*?角度.*?[。！\n]'),    # 角度分析
+    ('结合', r'结合.*?情况.*?[。！\n]'),   # 结合分析
+    ('针对', r'针对.*?问题.*?[。！\n]'),   # 问题分析
+    ('关于', r'关于.*?方面.*?[。！\n]'),   # 方面分析
+))
+
+# 元语言表达
+_META_PATTERNS = tuple((literal, re.compile(pattern, re.IGNORECASE)) for literal, pattern in (
+    ('以下是', r'以下是.*?分析.*?[:：]'),  # "以下是...分析:"
+    ('下面', r'下面.*?分析.*?[:：]'),    # "下面...分析:"
+    ('这里', r'这里.*?分析.*?[:：]'),    # "这里...分析:"
+    ('我的', r'我的.*?分析.*?[:：]'),    # "我的...分析:"
+    ('分析结果', r'分析结果.*?如下.*?[:：]'), # "分析结果如下:"
+    ('具体', r'具体.*?如下.*?[:：]'),    # "具体...如下:"
+    ('详细', r'详细.*?如下.*?[:：]'),    # "详细...如下:"
+))
+
+# 按原顺序依次应用：先移除思考过程，再移除元语言表达
+_CLEANUP_PATTERNS = _THINKING_PATTERNS + _META_PATTERNS
+
+_DANGLING_COLON_RE = re.compile(r'[:：]\s*\n')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+_LEADING_BLANK_RE = re.compile(r'^\s*\n+')
+_TRAILING_BLANK_RE = re.compile(r'\n+\s*$')
+
+def _compile_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """将str.format模板预解析为(字面文本, 字段名)片段序列
+    
+    花括号转义和字段位置只在导入时解析一次，渲染时直接按片段拼接。
+    Formatter.parse会在每个{{、}}转义处切出一段，CSS中的大量转义会产生数百个片段，
+    这里把相邻的字面文本合并，片段数只与实际字段数相关。
+    """
+    segments = []
+    pending = []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        pending.append(literal)
+        if field_name is not None:
+            segments.append(("".join(pending), field_name))
+            pending = []
+    if pending:
+        segments.append(("".join(pending), None))
+    return tuple(segments)
+
+_STYLE_BLOCK_RE = re.compile(r'(<style>)(.*?)(</style>)', re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_AROUND_RE = re.compile(r'\s*([{};,>])\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _minify_style_blocks(template: str) -> str:
+    """压缩模板中<style>块的CSS：去掉注释，合并空白，删除括号、分号、逗号、子选择器两侧空白
+    
+    只改动CSS空白，不改动花括号转义，结果仍可交给_compile_template解析。
+    """
+    def _minify(match: "re.Match") -> str:
+        css = _CSS_COMMENT_RE.sub('', match.group(2))
+        css = _WHITESPACE_RE.sub(' ', css)
+        css = _CSS_SPACE_AROUND_RE.sub(r'\1', css)
+        return match.group(1) + css.strip() + match.group(3)
+    return _STYLE_BLOCK_RE.sub(_minify, template)
+
+_SCRIPT_BLOCK_RE = re.compile(r'(<script>)(.*?)(</script>)', re.DOTALL)
+
+def _minify_script(script: str) -> str:
+    """压缩JavaScript：去掉每行首尾空白、空行和整行//注释
+    
+    保留换行，不改写语句，分号自动插入的行为与原脚本一致；不处理行尾注释，字符串中的//不受影响。
+    """
+    lines = (line.strip() for line in script.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+def _minify_script_blocks(template: str) -> str:
+    """压缩模板中内联<script>块的JavaScript，引用外部脚本的<script src=...>不变"""
+    return _SCRIPT_BLOCK_RE.sub(lambda match: match.group(1) + _minify_script(match.group(2)) + match.group(3), template)
+
+def _write_template(segments: Tuple[Tuple[str, Optional[str]], ...], out: TextIO, **context: Any) -> None:
+    """按片段把预解析模板渲染写入out，结果与template.format(**context)一致"""
+    for literal, field_name in segments:
+        out.write(literal)
+        if field_name is not None:
+            out.write(format(context[field_name]))
+
+def _bind_template(segments: Tuple[Tuple[str, Optional[str]], ...], **context: Any) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """把context中已知的字段提前代入预解析模板，返回只含剩余字段的片段序列"""
+    bound = []
+    pending = []
+    for literal, field_name in segments:
+        pending.append(literal)
+        if field_name is None:
+            continue
+        if field_name in context:
+            pending.append(format(context[field_name]))
+        else:
+            bound.append(("".join(pending), field_name))
+            pending = []
+    if pending:
+        bound.append(("".join(pending), None))
+    return tuple(bound)
+
+def _render_template(segments: Tuple[Tuple[str, Optional[str]], ...], **context: Any) -> str:
+    """按片段渲染预解析模板并返回字符串，结果与template.format(**context)一致
+    
+    字面文本和字段值依次放入同一列表后一次拼接，不为每个字段生成“字面文本+字段值”的中间字符串。
+    """
+    parts = []
+    append = parts.append
+    for literal, field_name in segments:
+        append(literal)
+        if field_name is not None:
+            append(format(context[field_name]))
+    return "".join(parts)
+
+def _normalize_item(item: Any) -> str:
+    """把单条建议/洞察转换为字符串，字典优先取content，其次取text"""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        if 'content' in item:
+            return str(item['content'])
+        if 'text' in item:
+            return str(item['text'])
+    return str(item)
+
+def _normalize_items(raw_items: Any) -> List[str]:
+    """把Agent返回的建议/洞察字段转换为字符串列表"""
+    if isinstance(raw_items, list):
+        return [_normalize_item(item) for item in raw_items]
+    return [str(raw_items)] if raw_items else []
+
+def _add_styled_paragraph(doc: Any, style_id: str, text: str = "") -> Any:
+    """在Word文档末尾添加指定样式的段落
+    
+    python-docx按样式名或样式对象设置段落样式时，每次都会遍历整个样式表查找默认样式，
+    报告中数百个列表段落的大部分耗时都在这里；这里直接写入预先解析好的样式ID。
+    """
+    paragraph = doc.add_paragraph(text)
+    paragraph._p.style = style_id
+    return paragraph
+
+def _add_bold_run(paragraph: Any, text: str) -> Any:
+    """在段落中添加加粗文本，直接写入<w:b/>，不经过Font属性代理"""
+    run = paragraph.add_run(text)
+    run._r.get_or_add_rPr().get_or_add_b()
+    return run
+
 # ================================
 # 2. 数据结构定义
 # ================================
 
-@dataclass
+# 以下数据结构按报告/章节逐个创建，创建后不再修改：
+# 使用frozen数据类并显式声明__slots__，去掉实例__dict__（兼容Python 3.8+）
+
+@dataclass(frozen=True)
 class AgentAnalysisResult:
     """单个Agent分析结果"""
+    __slots__ = ("agent_name", "agent_type", "analysis_data", "confidence_score",
+                 "execution_time", "timestamp", "recommendations", "key_insights", "_analysis_json")
     agent_name: str
     agent_type: str
     analysis_data: Dict[str, Any]
@@ -61,10 +416,24 @@ class AgentAnalysisResult:
     timestamp: str
     recommendations: List[str]
     key_insights: List[str]
+    
+    @property
+    def analysis_json(self) -> str:
+        """analysis_data的缩进JSON文本
+        
+        三种输出模式的提示词和HTML章节都要输出同一份分析数据，首次访问时序列化并缓存在实例上。
+        """
+        try:
+            return self._analysis_json
+        except AttributeError:
+            text = _dumps_pretty(self.analysis_data)
+            object.__setattr__(self, "_analysis_json", text)
+            return text
 
-@dataclass
+@dataclass(frozen=True)
 class ReportSection:
     """报告章节结构"""
+    __slots__ = ("section_id", "title", "content", "charts", "priority", "data_sources")
     section_id: str
     title: str
     content: str
@@ -72,9 +441,11 @@ class ReportSection:
     priority: int
     data_sources: List[str]
 
-@dataclass
+@dataclass(frozen=True)
 class ComprehensiveReport:
     """综合分析报告"""
+    __slots__ = ("report_id", "title", "executive_summary", "sections", "overall_recommendations",
+                 "risk_assessment", "next_actions", "confidence_metrics", "generation_timestamp")
     report_id: str
     title: str
     executive_summary: str
@@ -99,14 +470,76 @@ class ReportGeneratorAgent(BaseAgent):
     - 创建交互式图表
     """
     
+    # Agent名称关键词 -> 图表类型（设计文档5.3节图表自动生成策略），顺序即匹配优先级
+    _CHART_DISPATCH = (
+        (('财务', 'finance'), 'financial_line'),        # 财务分析 -> 折线图（趋势分析）
+        (('成本', 'cost'), 'waterfall'),                # 成本预测 -> 瀑布图（成本构成分析）
+        (('效能', 'performance'), 'performance_radar'), # 效能评估 -> 雷达图（多维度评估）
+        (('运维', 'operation'), 'heatmap'),             # 运维知识 -> 热力图（知识分布）
+        (('决策', 'decision'), 'scatter'),              # 数据决策 -> 散点图（关联分析）
+        (('人员', 'staff'), 'staff_bar'),               # 人员效能 -> 柱状图（对比分析）
+    )
+    
+    # 各类图表的数据规格：(analysis_data中的数据键, 数据缺失提示名, 字段缺失提示名, 必需字段, 原样代入的文本字段)
+    # 必需字段导入时转为frozenset校验，缺失时按此顺序报告；文本字段位于模板引号内原样代入，其余字段序列化为JSON
+    _CHART_SPECS = MappingProxyType({
+        "financial_line": ('financial_data', '财务分析数据', '财务数据', ('periods', 'revenue', 'expenses', 'profit'), ()),
+        "waterfall": ('cost_data', '成本分析数据', '成本数据', ('categories', 'values', 'auxiliary_values'), ()),
+        "performance_radar": ('performance_data', '效能评估数据', '效能数据', ('indicators', 'current_values', 'target_values'), ()),
+        "heatmap": ('heatmap_data', '热力图数据', '热力图数据', ('x_categories', 'y_categories', 'data_points', 'min_value', 'max_value'), ()),
+        "scatter": ('scatter_data', '散点图数据', '散点图数据', ('data_points', 'x_axis_name', 'y_axis_name', 'series_name'),
+                    ('x_axis_name', 'y_axis_name', 'series_name')),
+        "staff_bar": ('bar_chart_data', '柱状图数据', '柱状图数据', ('categories', 'current_values', 'target_values', 'current_name', 'target_name'),
+                      ('current_name', 'target_name')),
+        "modern_pie": ('pie_chart_data', '饼图数据', '饼图数据', ('data_items', 'series_name'), ('series_name',)),
+    })
+    
+    # LLM未返回结构化结果时，按Agent类型补充的默认洞察、建议和风险，以及通用的下一步行动
+    _DEFAULT_INSIGHTS = MappingProxyType({
+        "成本分析": "成本分析显示当前项目成本控制需要优化，置信度：{confidence:.2f}",
+        "效率分析": "效率分析表明运营流程存在改进空间，置信度：{confidence:.2f}",
+        "业务分析": "业务分析揭示了关键业务指标的变化趋势，置信度：{confidence:.2f}",
+    })
+    _DEFAULT_RECOMMENDATIONS = MappingProxyType({
+        "成本分析": (
+            "建议建立更精细的成本核算体系，提高成本透明度",
+            "推荐实施项目成本实时监控机制",
+            "建议优化资源配置，降低不必要的成本支出"
+        ),
+        "效率分析": (
+            "建议优化业务流程，减少重复性工作",
+            "推荐引入自动化工具提升工作效率",
+            "建议建立标准化作业流程"
+        ),
+        "业务分析": (
+            "建议加强数据驱动的决策机制",
+            "推荐建立业务指标监控体系",
+            "建议优化客户服务流程"
+        ),
+    })
+    _DEFAULT_RISKS = MappingProxyType({
+        "成本分析": ("成本风险", "项目成本可能超预算，需要加强成本控制和监管"),
+        "效率分析": ("效率风险", "当前工作效率可能影响项目交付时间，需要优化流程"),
+        "业务分析": ("业务风险", "市场变化可能影响业务目标达成，需要灵活调整策略"),
+    })
+    _DEFAULT_NEXT_ACTIONS = (
+        "建立定期的数据分析和报告机制",
+        "制定具体的改进计划和时间节点",
+        "建立跨部门协作机制",
+        "定期评估和调整策略方向"
+    )
+    
     def __init__(self):
         super().__init__("report_generator", "报告生成专家")
         self.agent_type = "report_generator"
         self.version = "1.0.0"
         
-        # 报告模板配置
-        self.report_templates = self._load_report_templates()
-        self.chart_configs = self._load_chart_configurations()
+        # 报告模板配置（模块导入时加载一次，所有实例共享）
+        self.report_templates = _REPORT_TEMPLATES
+        self.chart_configs = _CHART_CONFIGS
+        
+        # Word报告保存目录：用户桌面的智水信息报告文件夹（首次生成Word报告时创建）
+        self._reports_dir = os.path.join(os.path.expanduser("~"), "Desktop", "智水信息AI分析报告")
         
         logger.info(f"初始化 {self.agent_name} 完成")
     
@@ -173,71 +606,10 @@ class ReportGeneratorAgent(BaseAgent):
     
     def get_system_prompt(self) -> str:
         """获取系统提示词"""
-        return """
-你是智水信息技术有限公司的资深决策支持专家，拥有15年以上电力水利行业数据分析和决策支持报告撰写经验。
-
-## 专业背景
-- 电力水利行业资深决策分析师
-- 精通财务分析、成本预测、效能评估、知识管理的决策支持
-- 擅长基于数据分析的决策建议制定和风险评估
-- 熟悉企业管理决策流程和战略规划实施
-
-## 核心职责
-1. **数据驱动决策分析**：基于多Agent分析结果，进行深度数据挖掘和决策洞察
-2. **决策支持报告生成**：生成面向管理层的决策支持文档，提供明确的行动指导
-3. **风险评估与应对**：识别业务风险点，制定具体的风险应对策略
-4. **可操作建议制定**：提供具体可执行的业务改进方案和实施路径
-5. **数据看板设计**：设计简洁有效的数据可视化看板
-
-## 分析原则
-- **决策导向**：所有分析都围绕具体决策需求展开
-- **数据支撑**：每个结论都有充分的数据证据支持
-- **可执行性**：提供明确的执行步骤和时间节点
-- **风险意识**：充分识别和评估潜在风险
-- **业务价值**：聚焦创造实际业务价值的建议
-
-## 三种输出模式要求
-
-### 1. Word决策支持报告（严格字数要求）
-- **核心定位**：面向管理层的决策支持文档，提供基于数据分析的决策建议
-- **严格按照调用的智能体数量确定报告字数**：
-  - 1个智能体：报告正文不少于1600字
-  - 2个智能体：报告正文不少于2400字
-  - 3个智能体：报告正文不少于3600字
-  - 4个智能体：报告正文不少于4800字
-  - 5个智能体：报告正文不少于6000字
-  - 6个智能体：报告正文不少于7200字
-- **内容要求**：
-  - 详细的执行总结（新增部分）
-  - 详细的数据分析结果解读
-  - 明确的决策建议和实施方案
-  - 全面的风险评估和应对策略
-  - 具体的行动计划和时间节点
-- **报告结构**：执行摘要、执行总结、数据分析、决策建议、风险评估、实施计划
-
-### 2. HTML数据看板（可视化为主）
-- **功能定位**：数据可视化看板，快速展示关键指标和趋势
-- **内容重点**：关键数据指标、趋势图表、核心洞察、简要建议
-- **设计原则**：简洁直观、重点突出、易于理解
-- **文字要求**：简明扼要的描述性文字，突出数据价值
-
-### 3. 对话框回复（决策要点）
-- **功能定位**：与用户的交互对话，传达核心决策要点
-- **内容要求**：决策支持报告的核心要点总结
-- **表达方式**：简洁明了、重点突出、便于理解
-- **包含要素**：关键发现、核心建议、主要风险、下一步行动
-
-## 输出要求
-- Word报告必须达到字数要求，确保决策支持的深度和专业性
-- HTML看板注重数据可视化效果和用户体验
-- 对话回复突出决策要点，便于快速理解
-- 所有输出都必须包含明确的决策建议和风险评估
-- 基于真实数据分析，不使用假数据或模板化内容
-
-请基于提供的多Agent分析结果，生成高质量的决策支持内容。
-"""
+        return _REPORT_SYSTEM_PROMPT
     
-    def _load_report_templates(self) -> Dict[str, str]:
+    @staticmethod
+    def _load_report_templates() -> Dict[str, str]:
         """加载报告模板"""
         return {
             "comprehensive": """
@@ -717,7 +1089,8 @@ class ReportGeneratorAgent(BaseAgent):
             """
         }
     
-    def _load_chart_configurations(self) -> Dict[str, Dict]:
+    @staticmethod
+    def _load_chart_configurations() -> Dict[str, Dict]:
         """加载图表配置"""
         return {
             "cashflow_chart": {
@@ -771,7 +1144,7 @@ class ReportGeneratorAgent(BaseAgent):
                     processing_time=0.0
                 )
             
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             
             # 解析Agent分析结果
             agent_results = self._parse_agent_results(task.input_data.get("agent_results", []))
@@ -804,14 +1177,16 @@ class ReportGeneratorAgent(BaseAgent):
                 }
             
             # 计算执行时间
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start_time
             
-            # 添加通用字段
+            # 添加通用字段（置信度和建议同时用于result_data和AgentResult，只取一次）
+            overall_confidence = comprehensive_analysis.get("overall_confidence", 0.0)
+            recommendations = comprehensive_analysis.get("recommendations", [])
             result_data.update({
                 "executive_summary": comprehensive_analysis.get("executive_summary", ""),
                 "key_insights": comprehensive_analysis.get("key_insights", []),
-                "recommendations": comprehensive_analysis.get("recommendations", []),
-                "confidence_score": comprehensive_analysis.get("overall_confidence", 0.0),
+                "recommendations": recommendations,
+                "confidence_score": overall_confidence,
                 "generation_timestamp": datetime.now().isoformat(),
                 "output_mode": output_mode
             })
@@ -823,8 +1198,8 @@ class ReportGeneratorAgent(BaseAgent):
                 agent_id=self.agent_id,
                 status="success",
                 result_data=result_data,
-                confidence_score=comprehensive_analysis.get("overall_confidence", 0.0),
-                recommendations=comprehensive_analysis.get("recommendations", []),
+                confidence_score=overall_confidence,
+                recommendations=recommendations,
                 processing_time=execution_time
             )
             
@@ -858,53 +1233,21 @@ class ReportGeneratorAgent(BaseAgent):
         
         return True
     
-    def _parse_agent_results(self, raw_results: List[Dict]) -> List[AgentAnalysisResult]:
-        """解析Agent分析结果"""
+    def _parse_agent_results(self, raw_results: List[Any]) -> List[AgentAnalysisResult]:
+        """解析Agent分析结果（字典或已解析的AgentAnalysisResult）"""
         parsed_results = []
+        # 缺少时间戳的结果统一使用解析时刻，只取一次当前时间
+        default_timestamp = datetime.now().isoformat()
         
         for result in raw_results:
+            # 已解析过的结果直接复用，避免重复归一化
+            if isinstance(result, AgentAnalysisResult):
+                parsed_results.append(result)
+                continue
             try:
                 # 确保recommendations和key_insights是字符串列表
-                raw_recommendations = result.get("recommendations", [])
-                raw_key_insights = result.get("key_insights", [])
-                
-                # 转换recommendations为字符串列表
-                recommendations = []
-                if isinstance(raw_recommendations, list):
-                    for item in raw_recommendations:
-                        if isinstance(item, str):
-                            recommendations.append(item)
-                        elif isinstance(item, dict):
-                            # 如果是字典，尝试提取有用信息
-                            if 'content' in item:
-                                recommendations.append(str(item['content']))
-                            elif 'text' in item:
-                                recommendations.append(str(item['text']))
-                            else:
-                                recommendations.append(str(item))
-                        else:
-                            recommendations.append(str(item))
-                else:
-                    recommendations = [str(raw_recommendations)] if raw_recommendations else []
-                
-                # 转换key_insights为字符串列表
-                key_insights = []
-                if isinstance(raw_key_insights, list):
-                    for item in raw_key_insights:
-                        if isinstance(item, str):
-                            key_insights.append(item)
-                        elif isinstance(item, dict):
-                            # 如果是字典，尝试提取有用信息
-                            if 'content' in item:
-                                key_insights.append(str(item['content']))
-                            elif 'text' in item:
-                                key_insights.append(str(item['text']))
-                            else:
-                                key_insights.append(str(item))
-                        else:
-                            key_insights.append(str(item))
-                else:
-                    key_insights = [str(raw_key_insights)] if raw_key_insights else []
+                recommendations = _normalize_items(result.get("recommendations", []))
+                key_insights = _normalize_items(result.get("key_insights", []))
                 
                 parsed_result = AgentAnalysisResult(
                     agent_name=result.get("agent_name", "Unknown"),
@@ -912,7 +1255,7 @@ class ReportGeneratorAgent(BaseAgent):
                     analysis_data=result.get("analysis_data", {}),
                     confidence_score=result.get("confidence_score", 0.0),
                     execution_time=result.get("execution_time", 0.0),
-                    timestamp=result.get("timestamp", datetime.now().isoformat()),
+                    timestamp=result.get("timestamp", default_timestamp),
                     recommendations=recommendations,
                     key_insights=key_insights
                 )
@@ -929,17 +1272,28 @@ class ReportGeneratorAgent(BaseAgent):
             # 准备LLM输入
             analysis_prompt = self._build_analysis_prompt(agent_results, output_mode)
             
-            # 创建OpenAI客户端（环境变量配置）
-            client = OpenAI(
-                api_key=AI_CONFIG.get("api_key", ""),
-                base_url=AI_CONFIG.get("api_base", "")
-            )
+            # 相同的提示词（即相同的Agent结果和输出模式）在TTL内直接复用LLM输出
+            use_cache = RESPONSE_CACHE_CONFIG.get("enabled", False)
+            if use_cache:
+                cache_key = _analysis_cache_key(analysis_prompt)
+                cached_content = None
+                with _ANALYSIS_CACHE_LOCK:
+                    cached = _ANALYSIS_CACHE.get(cache_key)
+                    if cached is not None:
+                        if time.time() - cached[0] < RESPONSE_CACHE_CONFIG.get("cache_ttl", 300):
+                            _ANALYSIS_CACHE.move_to_end(cache_key)
+                            cached_content = cached[1]
+                        else:
+                            del _ANALYSIS_CACHE[cache_key]
+                if cached_content is not None:
+                    self.logger.info("综合分析命中缓存")
+                    return self._extract_structured_analysis(cached_content, agent_results)
             
-            # 调用LLM进行综合分析
-            response = client.chat.completions.create(
+            # 调用LLM进行综合分析（共享客户端连接池）
+            response = get_llm_client().chat.completions.create(
                 model=AI_CONFIG["model"],
                 messages=[
-                    {"role": "system", "content": self.get_system_prompt()},
+                    _REPORT_SYSTEM_MESSAGE,
                     {"role": "user", "content": analysis_prompt}
                 ],
                 temperature=AI_CONFIG["temperature"],
@@ -964,6 +1318,12 @@ class ReportGeneratorAgent(BaseAgent):
             cleaned_content = self._clean_llm_response(analysis_content)
             analysis_data = self._extract_structured_analysis(cleaned_content, agent_results)
             
+            if use_cache:
+                with _ANALYSIS_CACHE_LOCK:
+                    _ANALYSIS_CACHE[cache_key] = (time.time(), cleaned_content)
+                    if len(_ANALYSIS_CACHE) > RESPONSE_CACHE_CONFIG.get("cache_size", 1000):
+                        _ANALYSIS_CACHE.popitem(last=False)
+            
             return analysis_data
             
         except Exception as e:
@@ -982,19 +1342,23 @@ class ReportGeneratorAgent(BaseAgent):
         try:
             results = {}
             
-            # 1. 生成Word深度分析报告
-            word_analysis = self._generate_comprehensive_analysis(agent_results, "word")
-            word_file_path = self._generate_word_report(word_analysis, agent_results)
-            results["word_analysis"] = word_analysis
-            results["word_file_path"] = word_file_path
-            
-            # 2. 生成HTML看板内容
-            html_analysis = self._generate_comprehensive_analysis(agent_results, "html")
-            results["html_analysis"] = html_analysis
-            
-            # 3. 生成对话回复内容
-            chat_analysis = self._generate_comprehensive_analysis(agent_results, "chat")
-            results["chat_analysis"] = chat_analysis
+            # 三种模式的LLM调用互不依赖，并发执行，总耗时约为最慢的一次调用
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                futures = {
+                    mode: executor.submit(self._generate_comprehensive_analysis, agent_results, mode)
+                    for mode in ("word", "html", "chat")
+                }
+                
+                # 1. 生成Word深度分析报告
+                word_analysis = futures["word"].result()
+                results["word_analysis"] = word_analysis
+                results["word_file_path"] = self._generate_word_report(word_analysis, agent_results)
+                
+                # 2. 生成HTML看板内容
+                results["html_analysis"] = futures["html"].result()
+                
+                # 3. 生成对话回复内容
+                results["chat_analysis"] = futures["chat"].result()
             
             # 返回所有结果
             return {
@@ -1013,6 +1377,9 @@ class ReportGeneratorAgent(BaseAgent):
     def _build_analysis_prompt(self, agent_results: List[AgentAnalysisResult], output_mode: str = "word") -> str:
         """构建分析提示词
         
+        固定的输出要求放在最前面，随Agent结果变化的内容放在后面，
+        同一模式的请求共享相同前缀，便于模型服务端复用前缀缓存。
+        
         Args:
             agent_results: 智能体分析结果列表
             output_mode: 输出模式 ('word', 'html', 'chat')
@@ -1021,97 +1388,28 @@ class ReportGeneratorAgent(BaseAgent):
         
         if output_mode == "word":
             # Word文档需要严格字数要求
-            word_requirements = {
-                1: "不少于1600字",
-                2: "不少于2400字", 
-                3: "不少于3600字",
-                4: "不少于4800字",
-                5: "不少于6000字",
-                6: "不少于7200字"
-            }
-            min_words = word_requirements.get(agent_count, "不少于7200字")
-            prompt = f"请基于以下{agent_count}个专业Agent的分析结果，生成Word深度分析报告（{min_words}）：\n\n"
+            min_words = _WORD_LENGTH_REQUIREMENTS.get(agent_count, "不少于7200字")
+            parts = [_WORD_INSTRUCTIONS, f"\n请基于以下{agent_count}个专业Agent的分析结果，生成Word深度分析报告（{min_words}）：\n\n"]
         elif output_mode == "html":
             # HTML看板注重可视化，文字简洁
-            prompt = f"请基于以下{agent_count}个专业Agent的分析结果，生成HTML数据看板（以可视化为主，文字简洁）：\n\n"
+            parts = [_HTML_INSTRUCTIONS, f"\n请基于以下{agent_count}个专业Agent的分析结果，生成HTML数据看板（以可视化为主，文字简洁）：\n\n"]
         else:  # chat模式
             # 对话回复注重核心要点
-            prompt = f"请基于以下{agent_count}个专业Agent的分析结果，生成对话回复（精简版总结）：\n\n"
+            parts = [_CHAT_INSTRUCTIONS, f"\n请基于以下{agent_count}个专业Agent的分析结果，生成对话回复（精简版总结）：\n\n"]
         
         for i, result in enumerate(agent_results, 1):
-            prompt += f"## Agent {i}: {result.agent_name}\n"
-            prompt += f"**分析类型**: {result.agent_type}\n"
-            prompt += f"**置信度**: {result.confidence_score:.2f}\n"
-            prompt += f"**关键洞察**: {', '.join(result.key_insights)}\n"
-            prompt += f"**建议**: {', '.join(result.recommendations)}\n"
-            prompt += f"**分析数据**: {json.dumps(result.analysis_data, ensure_ascii=False, indent=2)}\n\n"
-        
-        if output_mode == "word":
-            word_prompt = f"""
-请提供详细的综合分析报告，总字数{min_words}：
-
-1. **执行摘要**：详细总结所有分析结果的核心发现（至少300字）
-2. **执行总结**：基于所有智能体分析结果的深度总结，包括关键数据指标、业务影响评估、决策紧迫性分析（至少400字）
-3. **分类分析**：对每个Agent的分析结果进行深入解读和评价（每个Agent至少200字）
-4. **关键洞察**：识别最重要的8-12个业务洞察，每个洞察需要详细说明和数据支撑
-5. **综合建议**：基于所有分析结果提供12-18条可操作的改进建议，每条建议需要详细的实施方案、时间节点和预期效果
-6. **风险评估**：详细识别潜在风险点和具体应对策略，包括风险等级评估和应对时间表
-7. **下一步行动**：明确的后续行动计划，包含详细的时间节点、责任人和成功指标
-8. **整体置信度**：对综合分析结果的置信度评估(0-1)
-
-注意：
-- 必须对每个Agent的结果进行分类深度分析
-- 然后进行总体综合分析
-- 新增的执行总结部分要深入分析业务影响和决策价值
-- 确保内容详实，分析深入，字数达到要求
-- 必须严格按照JSON格式返回，使用以下字段名称：
-"""
-            json_template = """{
-    "executive_summary": "执行摘要内容",
-    "executive_conclusion": "执行总结内容", 
-    "detailed_analysis": "分类分析内容",
-    "key_insights": ["洞察1", "洞察2", ...],
-    "recommendations": ["建议1", "建议2", ...],
-    "risk_assessment": {"风险类型1": "风险描述1", "风险类型2": "风险描述2"},
-    "next_actions": ["行动1", "行动2", ...],
-    "overall_confidence": 0.85
-}"""
-            prompt += word_prompt + json_template + "\n- 确保JSON格式正确，不要包含任何其他文本\n"
-        elif output_mode == "html":
-            prompt += """
-请提供HTML数据看板内容：
-
-1. **执行摘要**：简洁的核心发现总结
-2. **关键指标**：重要数据指标和可视化建议
-3. **简要洞察**：3-5个核心业务洞察
-4. **基础建议**：5-8条简明建议
-5. **整体置信度**：对综合分析结果的置信度评估(0-1)
-
-注意：
-- 重点关注数据可视化和关键指标
-- 文字描述简洁明了
-- 请以JSON格式返回，包含以上所有字段
-"""
-        else:  # chat模式
-            prompt += """
-请提供对话回复内容：
-
-1. **核心发现**：最重要的分析结果
-2. **关键建议**：3-5条核心建议
-3. **风险提醒**：主要风险点
-4. **整体置信度**：对综合分析结果的置信度评估(0-1)
-
-注意：
-- 语言口语化，易于理解
-- 突出核心要点
-- 请以JSON格式返回，包含以上所有字段
-"""
-        
-        return prompt
-    
-    def _clean_llm_response(self, response_text: str) -> str:
-        """
-        净化LLM回复内容，移除思考过程和非自然语言内容
+            parts.append(f"## Agent {i}: {result.agent_name}\n")
+            parts.append(f"**分析类型**: {result.agent_type}\n")
+            parts.append(f"**置信度**: {result.confidence_score:.2f}\n")
+            parts.append(f"**关键洞察**: {', '.join(result.key_insights)}\n")
+            parts.append(f"**建议**: {', '.join(result.recommendations)}\n")
+            parts.append(f"**分析数据**: {result.analysis_json}\n\n")
+        
+        return "".join(parts)
+    
+    def _clean_llm_response(self, response_text: str) -> str:
+        """
+        净化LLM回复内容，移除思考过程和非自然语言内容
         
         Args:
             response_text: 原始LLM回复内容
@@ -1119,68 +1417,27 @@ class ReportGeneratorAgent(BaseAgent):
         Returns:
             净化后的内容
         """
-        import re
-        
         content = response_text.strip()
         
         # 移除JSON代码块，但保留JSON内容
-        json_pattern = r'```json\s*(.*?)\s*```'
-        json_matches = re.findall(json_pattern, content, re.DOTALL)
-        if json_matches:
+        json_match = _JSON_BLOCK_RE.search(content)
+        if json_match:
             # 如果找到JSON，直接返回JSON内容
-            return json_matches[0].strip()
+            return json_match.group(1).strip()
         
         # 移除其他代码块
-        content = re.sub(r'```.*?```', '', content, flags=re.DOTALL)
-        
-        # 移除思考过程标记和非自然语言内容
-        thinking_patterns = [
-            r'\[思考\].*?\[/思考\]',  # 思考标记
-            r'\[分析\].*?\[/分析\]',  # 分析标记
-            r'\[推理\].*?\[/推理\]',  # 推理标记
-            r'\[总结\].*?\[/总结\]',  # 总结标记
-            r'让我.*?[。！\n]',   # "让我..."开头的思考
-            r'我需要.*?[。！\n]',  # "我需要..."开头的思考
-            r'我将.*?[。！\n]',    # "我将..."开头的思考
-            r'我来.*?[。！\n]',    # "我来..."开头的思考
-            r'首先.*?然后.*?[。！\n]',  # 步骤性思考
-            r'根据.*?我认为.*?[。！\n]',  # 推理过程
-            r'基于.*?我将.*?[。！\n]',  # 基于分析的思考
-            r'接下来.*?[。！\n]',  # 步骤性描述
-            r'现在.*?开始.*?[。！\n]',  # 开始性描述
-            r'通过.*?分析.*?[。！\n]',  # 分析过程描述
-            r'经过.*?考虑.*?[。！\n]',  # 考虑过程
-            r'为了.*?我.*?[。！\n]',   # 目的性思考
-            r'考虑到.*?因此.*?[。！\n]',  # 因果推理
-            r'综合.*?来看.*?[。！\n]',   # 综合分析
-            r'从.*?角度.*?[。！\n]',    # 角度分析
-            r'结合.*?情况.*?[。！\n]',   # 结合分析
-            r'针对.*?问题.*?[。！\n]',   # 问题分析
-            r'关于.*?方面.*?[。！\n]',   # 方面分析
-        ]
-        
-        for pattern in thinking_patterns:
-            content = re.sub(pattern, '', content, flags=re.DOTALL | re.IGNORECASE)
-        
-        # 移除元语言表达
-        meta_patterns = [
-            r'以下是.*?分析.*?[:：]',  # "以下是...分析:"
-            r'下面.*?分析.*?[:：]',    # "下面...分析:"
-            r'这里.*?分析.*?[:：]',    # "这里...分析:"
-            r'我的.*?分析.*?[:：]',    # "我的...分析:"
-            r'分析结果.*?如下.*?[:：]', # "分析结果如下:"
-            r'具体.*?如下.*?[:：]',    # "具体...如下:"
-            r'详细.*?如下.*?[:：]',    # "详细...如下:"
-        ]
-        
-        for pattern in meta_patterns:
-            content = re.sub(pattern, '', content, flags=re.IGNORECASE)
+        content = _CODE_BLOCK_RE.sub('', content)
+        
+        # 移除思考过程标记和元语言表达（按原顺序逐个替换）
+        for literal, pattern in _CLEANUP_PATTERNS:
+            if literal in content:
+                content = pattern.sub('', content)
         
         # 移除多余的标点和空白
-        content = re.sub(r'[:：]\s*\n', '\n', content)  # 移除孤立的冒号
-        content = re.sub(r'\n\s*\n\s*\n+', '\n\n', content)  # 合并多个空行
-        content = re.sub(r'^\s*\n+', '', content)  # 移除开头的空行
-        content = re.sub(r'\n+\s*$', '', content)  # 移除结尾的空行
+        content = _DANGLING_COLON_RE.sub('\n', content)  # 移除孤立的冒号
+        content = _BLANK_LINES_RE.sub('\n\n', content)  # 合并多个空行
+        content = _LEADING_BLANK_RE.sub('', content)  # 移除开头的空行
+        content = _TRAILING_BLANK_RE.sub('', content)  # 移除结尾的空行
         
         return content.strip()
     
@@ -1196,13 +1453,20 @@ class ReportGeneratorAgent(BaseAgent):
             
             if json_start >= 0 and json_end > json_start:
                 json_text = cleaned_text[json_start:json_end]
+                parsed_json = None
                 try:
-                    parsed_json = json.loads(json_text)
+                    parsed_json = orjson.loads(json_text)
+                except orjson.JSONDecodeError as e:
+                    # 首尾花括号之间夹杂说明文字或多个JSON块时，只取第一个完整的JSON对象
+                    try:
+                        parsed_json, _ = _JSON_DECODER.raw_decode(cleaned_text, json_start)
+                    except json.JSONDecodeError:
+                        self.logger.warning(f"JSON解析失败: {str(e)}")
+                        self.logger.warning(f"尝试解析的JSON文本前100字符: {json_text[:100]}")
+                
+                if parsed_json is not None:
                     self.logger.info("成功解析JSON格式的分析结果")
                     return parsed_json
-                except json.JSONDecodeError as e:
-                    self.logger.warning(f"JSON解析失败: {str(e)}")
-                    self.logger.warning(f"尝试解析的JSON文本前100字符: {json_text[:100]}")
             
             # 如果不是JSON格式，进行文本解析
             self.logger.info("使用文本解析模式")
@@ -1227,68 +1491,38 @@ class ReportGeneratorAgent(BaseAgent):
         
         # 计算整体置信度
         if agent_results:
-            total_confidence = sum(result.confidence_score for result in agent_results)
-            structured_analysis["overall_confidence"] = total_confidence / len(agent_results)
+            structured_analysis["overall_confidence"] = fmean(map(_GET_CONFIDENCE, agent_results))
         
         # 聚合关键洞察和建议
-        all_insights = []
-        all_recommendations = []
-        
-        for result in agent_results:
-            all_insights.extend(result.key_insights)
-            all_recommendations.extend(result.recommendations)
+        # dict.fromkeys按首次出现顺序去重，报告内容在多次运行间保持稳定
+        all_insights = list(dict.fromkeys(chain.from_iterable(result.key_insights for result in agent_results)))
+        all_recommendations = list(dict.fromkeys(chain.from_iterable(result.recommendations for result in agent_results)))
         
         # 生成更丰富的关键洞察
         if all_insights:
-            structured_analysis["key_insights"] = list(set(all_insights))[:12]  # 增加洞察数量
+            structured_analysis["key_insights"] = all_insights[:12]  # 增加洞察数量
         else:
             # 如果没有洞察，基于Agent类型生成默认洞察
-            default_insights = []
-            for result in agent_results:
-                if result.agent_type == "成本分析":
-                    default_insights.append(f"成本分析显示当前项目成本控制需要优化，置信度：{result.confidence_score:.2f}")
-                elif result.agent_type == "效率分析":
-                    default_insights.append(f"效率分析表明运营流程存在改进空间，置信度：{result.confidence_score:.2f}")
-                elif result.agent_type == "业务分析":
-                    default_insights.append(f"业务分析揭示了关键业务指标的变化趋势，置信度：{result.confidence_score:.2f}")
+            default_insights = [
+                self._DEFAULT_INSIGHTS[result.agent_type].format(confidence=result.confidence_score)
+                for result in agent_results if result.agent_type in self._DEFAULT_INSIGHTS
+            ]
             structured_analysis["key_insights"] = default_insights
         
         # 生成更丰富的建议
         if all_recommendations:
-            structured_analysis["recommendations"] = list(set(all_recommendations))[:15]  # 增加建议数量
+            structured_analysis["recommendations"] = all_recommendations[:15]  # 增加建议数量
         else:
             # 如果没有建议，基于Agent类型生成默认建议
-            default_recommendations = []
-            for result in agent_results:
-                if result.agent_type == "成本分析":
-                    default_recommendations.extend([
-                        "建议建立更精细的成本核算体系，提高成本透明度",
-                        "推荐实施项目成本实时监控机制",
-                        "建议优化资源配置，降低不必要的成本支出"
-                    ])
-                elif result.agent_type == "效率分析":
-                    default_recommendations.extend([
-                        "建议优化业务流程，减少重复性工作",
-                        "推荐引入自动化工具提升工作效率",
-                        "建议建立标准化作业流程"
-                    ])
-                elif result.agent_type == "业务分析":
-                    default_recommendations.extend([
-                        "建议加强数据驱动的决策机制",
-                        "推荐建立业务指标监控体系",
-                        "建议优化客户服务流程"
-                    ])
+            default_recommendations = list(chain.from_iterable(
+                self._DEFAULT_RECOMMENDATIONS.get(result.agent_type, ()) for result in agent_results
+            ))
             structured_analysis["recommendations"] = default_recommendations[:15]
         
         # 生成风险评估
-        risk_assessment = {}
-        for result in agent_results:
-            if result.agent_type == "成本分析":
-                risk_assessment["成本风险"] = "项目成本可能超预算，需要加强成本控制和监管"
-            elif result.agent_type == "效率分析":
-                risk_assessment["效率风险"] = "当前工作效率可能影响项目交付时间，需要优化流程"
-            elif result.agent_type == "业务分析":
-                risk_assessment["业务风险"] = "市场变化可能影响业务目标达成，需要灵活调整策略"
+        risk_assessment = dict(
+            self._DEFAULT_RISKS[result.agent_type] for result in agent_results if result.agent_type in self._DEFAULT_RISKS
+        )
         
         if not risk_assessment:
             risk_assessment["综合风险"] = "基于当前分析结果，建议加强风险监控和预警机制"
@@ -1296,13 +1530,7 @@ class ReportGeneratorAgent(BaseAgent):
         structured_analysis["risk_assessment"] = risk_assessment
         
         # 生成下一步行动
-        next_actions = [
-            "建立定期的数据分析和报告机制",
-            "制定具体的改进计划和时间节点",
-            "建立跨部门协作机制",
-            "定期评估和调整策略方向"
-        ]
-        structured_analysis["next_actions"] = next_actions
+        structured_analysis["next_actions"] = list(self._DEFAULT_NEXT_ACTIONS)
         
         # 提取文本中的关键信息
         if "执行摘要" in analysis_text:
@@ -1315,19 +1543,27 @@ class ReportGeneratorAgent(BaseAgent):
     
     def _generate_html_report(self, comprehensive_analysis: Dict[str, Any], agent_results: List[AgentAnalysisResult]) -> str:
         """生成HTML报告"""
+        buffer = io.StringIO()
+        self._stream_html_report(comprehensive_analysis, agent_results, buffer)
+        return buffer.getvalue()
+    
+    def _stream_html_report(self, comprehensive_analysis: Dict[str, Any], agent_results: List[AgentAnalysisResult],
+                            out: TextIO) -> None:
+        """生成HTML报告并逐段写入out（文件或HTTP响应流），不构造完整的HTML字符串"""
         try:
-            # 获取主模板
-            main_template = self.report_templates["comprehensive"]
-            
             # 生成报告内容
             report_sections = self._generate_report_sections(agent_results)
             chart_scripts = self._generate_chart_scripts(agent_results)
+            # 生成时间和报告ID取自同一时刻
+            now = datetime.now()
             
-            # 格式化模板
-            html_content = main_template.format(
+            # 按预解析的主模板逐段写出
+            _write_template(
+                _COMPILED_TEMPLATES["comprehensive"],
+                out,
                 report_title="智水信息智能分析综合报告",
-                generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                report_id=f"RPT_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                generation_time=now.strftime("%Y-%m-%d %H:%M:%S"),
+                report_id=f"RPT_{now.strftime('%Y%m%d_%H%M%S')}",
                 executive_summary=comprehensive_analysis.get("executive_summary", ""),
                 report_sections=report_sections,
                 overall_recommendations=self._format_recommendations(comprehensive_analysis.get("recommendations", [])),
@@ -1336,8 +1572,6 @@ class ReportGeneratorAgent(BaseAgent):
                 chart_scripts=chart_scripts
             )
             
-            return html_content
-            
         except Exception as e:
             logger.error(f"HTML报告生成失败: {str(e)}")
             raise Exception(f"HTML报告生成失败: {str(e)}")
@@ -1345,14 +1579,26 @@ class ReportGeneratorAgent(BaseAgent):
     def _generate_word_report(self, comprehensive_analysis: Dict[str, Any], agent_results: List[AgentAnalysisResult]) -> str:
         """生成Word格式的决策支持报告"""
         try:
+            # python-docx只在生成Word报告时加载，html/对话模式不承担其导入开销
+            from docx import Document
+            from docx.enum.text import WD_ALIGN_PARAGRAPH
+            
+            # 报告时间、报告ID和文件名使用同一时刻
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
+            
             # 创建Word文档
             doc = Document()
+            # 标题和列表样式ID只按名称解析一次，之后直接写入段落
+            heading_style_ids = {level: doc.styles['Title' if level == 0 else f'Heading {level}'].style_id for level in range(4)}
+            bullet_style_id = doc.styles['List Bullet'].style_id
+            number_style_id = doc.styles['List Number'].style_id
             
             # 设置文档标题
-            title = doc.add_heading('四川智水信息技术有限公司', 0)
+            title = _add_styled_paragraph(doc, heading_style_ids[0], '四川智水信息技术有限公司')
             title.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
-            subtitle = doc.add_heading('管理决策支持报告', 1)
+            subtitle = _add_styled_paragraph(doc, heading_style_ids[1], '管理决策支持报告')
             subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
             # 添加报告基本信息表格
@@ -1360,10 +1606,10 @@ class ReportGeneratorAgent(BaseAgent):
             info_table.style = 'Table Grid'
             
             info_table.cell(0, 0).text = '报告生成时间'
-            info_table.cell(0, 1).text = datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')
+            info_table.cell(0, 1).text = now.strftime('%Y年%m月%d日 %H:%M:%S')
             
             info_table.cell(1, 0).text = '报告ID'
-            info_table.cell(1, 1).text = f'DSR_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+            info_table.cell(1, 1).text = f'DSR_{timestamp}'
             
             info_table.cell(2, 0).text = '分析维度数量'
             info_table.cell(2, 1).text = f'{len(agent_results)}个专业维度'
@@ -1378,160 +1624,164 @@ class ReportGeneratorAgent(BaseAgent):
             doc.add_paragraph()  # 空行
             
             # 1. 执行摘要（决策要点）
-            doc.add_heading('1. 执行摘要', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '1. 执行摘要')
             executive_summary = comprehensive_analysis.get('executive_summary', '暂无执行摘要')
             summary_para = doc.add_paragraph()
-            summary_para.add_run('【决策要点】').bold = True
+            _add_bold_run(summary_para, '【决策要点】')
             summary_para.add_run(executive_summary)
             
             # 2. 执行总结
-            doc.add_heading('2. 执行总结', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '2. 执行总结')
             execution_summary = comprehensive_analysis.get('执行总结', '暂无执行总结')
             execution_para = doc.add_paragraph()
-            execution_para.add_run('【业务影响与决策价值】').bold = True
+            _add_bold_run(execution_para, '【业务影响与决策价值】')
             execution_para.add_run(execution_summary)
             
             # 3. 数据分析结果
-            doc.add_heading('3. 数据分析结果', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '3. 数据分析结果')
             classified_analysis = comprehensive_analysis.get('classified_analysis', {})
             
             if classified_analysis:
-                for agent_type, analysis in classified_analysis.items():
-                    doc.add_heading(f'3.{list(classified_analysis.keys()).index(agent_type) + 1} {agent_type}数据洞察', level=2)
+                for index, (agent_type, analysis) in enumerate(classified_analysis.items(), 1):
+                    _add_styled_paragraph(doc, heading_style_ids[2], f'3.{index} {agent_type}数据洞察')
                     analysis_para = doc.add_paragraph()
-                    analysis_para.add_run('【数据洞察】').bold = True
+                    _add_bold_run(analysis_para, '【数据洞察】')
                     analysis_para.add_run(analysis)
             else:
                 # 如果没有分类分析，基于agent_results生成
                 for i, result in enumerate(agent_results, 1):
-                    doc.add_heading(f'3.{i} {result.agent_name}数据洞察', level=2)
+                    _add_styled_paragraph(doc, heading_style_ids[2], f'3.{i} {result.agent_name}数据洞察')
                     
                     # 添加基本信息
                     info_para = doc.add_paragraph()
-                    info_para.add_run(f"分析类型: {result.agent_type}\n").bold = True
+                    _add_bold_run(info_para, f"分析类型: {result.agent_type}\n")
                     info_para.add_run(f"数据置信度: {result.confidence_score:.2f}\n")
                     info_para.add_run(f"分析完成时间: {result.execution_time:.2f}秒\n")
                     
                     # 添加关键发现
                     if result.key_insights:
-                        findings_heading = doc.add_heading('关键发现', 3)
+                        findings_heading = _add_styled_paragraph(doc, heading_style_ids[3], '关键发现')
                         for insight in result.key_insights:
-                            insight_para = doc.add_paragraph()
-                            insight_para.style = 'List Bullet'
+                            insight_para = _add_styled_paragraph(doc, bullet_style_id)
                             insight_para.add_run(insight)
                     
                     # 添加决策建议
                     if result.recommendations:
-                        rec_heading = doc.add_heading('决策建议', 3)
+                        rec_heading = _add_styled_paragraph(doc, heading_style_ids[3], '决策建议')
                         for recommendation in result.recommendations:
-                            rec_para = doc.add_paragraph()
-                            rec_para.style = 'List Bullet'
-                            rec_para.add_run('【建议】').bold = True
+                            rec_para = _add_styled_paragraph(doc, bullet_style_id)
+                            _add_bold_run(rec_para, '【建议】')
                             rec_para.add_run(recommendation)
                     
                     # 添加数据分析摘要
                     if result.analysis_data:
-                        doc.add_heading('数据分析摘要', 3)
+                        _add_styled_paragraph(doc, heading_style_ids[3], '数据分析摘要')
                         data_summary = self._format_analysis_data_for_word(result.analysis_data)
                         data_para = doc.add_paragraph()
-                        data_para.add_run('【数据解读】').bold = True
+                        _add_bold_run(data_para, '【数据解读】')
                         data_para.add_run(data_summary)
                     
                     doc.add_paragraph()  # 分节空行
             
             # 4. 综合决策建议
-            doc.add_heading('4. 综合决策建议', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '4. 综合决策建议')
             recommendations = comprehensive_analysis.get('recommendations', [])
             if recommendations:
                 for i, recommendation in enumerate(recommendations, 1):
-                    rec_para = doc.add_paragraph()
-                    rec_para.style = 'List Number'
-                    rec_para.add_run(f'【决策建议{i}】').bold = True
+                    rec_para = _add_styled_paragraph(doc, number_style_id)
+                    _add_bold_run(rec_para, f'【决策建议{i}】')
                     rec_para.add_run(recommendation)
             else:
                 doc.add_paragraph("暂无综合决策建议")
             
             # 5. 关键洞察
-            doc.add_heading('5. 关键洞察', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '5. 关键洞察')
             key_insights = comprehensive_analysis.get('key_insights', [])
             if key_insights:
                 for i, insight in enumerate(key_insights, 1):
-                    insight_para = doc.add_paragraph()
-                    insight_para.style = 'List Number'
-                    insight_para.add_run(f'【洞察{i}】').bold = True
+                    insight_para = _add_styled_paragraph(doc, number_style_id)
+                    _add_bold_run(insight_para, f'【洞察{i}】')
                     insight_para.add_run(insight)
             else:
                 doc.add_paragraph("暂无关键洞察")
             
             # 6. 风险评估与应对策略
-            doc.add_heading('6. 风险评估与应对策略', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '6. 风险评估与应对策略')
             risk_assessment = comprehensive_analysis.get('risk_assessment', {})
             if risk_assessment:
                 if isinstance(risk_assessment, dict):
                     for i, (risk_type, risk_detail) in enumerate(risk_assessment.items(), 1):
-                        risk_heading = doc.add_heading(f'6.{i} {risk_type}', level=2)
+                        risk_heading = _add_styled_paragraph(doc, heading_style_ids[2], f'6.{i} {risk_type}')
                         risk_para = doc.add_paragraph()
-                        risk_para.add_run(f'【风险{i}】').bold = True
+                        _add_bold_run(risk_para, f'【风险{i}】')
                         risk_para.add_run(str(risk_detail))
                 else:
                     risk_para = doc.add_paragraph()
-                    risk_para.add_run('【风险评估】').bold = True
+                    _add_bold_run(risk_para, '【风险评估】')
                     risk_para.add_run(str(risk_assessment))
             else:
                 doc.add_paragraph("暂无风险评估")
             
             # 7. 实施计划建议
-            doc.add_heading('7. 实施计划建议', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '7. 实施计划建议')
             next_actions = comprehensive_analysis.get('next_actions', [])
             if next_actions:
                 for i, action in enumerate(next_actions, 1):
-                    action_para = doc.add_paragraph()
-                    action_para.style = 'List Number'
-                    action_para.add_run(f'【行动{i}】').bold = True
+                    action_para = _add_styled_paragraph(doc, number_style_id)
+                    _add_bold_run(action_para, f'【行动{i}】')
                     action_para.add_run(action)
             else:
                 impl_para = doc.add_paragraph()
-                impl_para.add_run('【实施建议】').bold = True
+                _add_bold_run(impl_para, '【实施建议】')
                 impl_para.add_run('建议管理层根据以上分析结果，制定具体的实施计划和时间节点，确保各项决策建议能够有效落地执行。')
             
             # 8. 数据可信度评估
-            doc.add_heading('8. 数据可信度评估', level=1)
+            _add_styled_paragraph(doc, heading_style_ids[1], '8. 数据可信度评估')
             overall_confidence = comprehensive_analysis.get('overall_confidence', 0.0)
             confidence_para = doc.add_paragraph()
-            confidence_para.add_run('【整体可信度】').bold = True
+            _add_bold_run(confidence_para, '【整体可信度】')
             confidence_para.add_run(f"本次决策分析的整体数据可信度为 {overall_confidence:.1%}，建议管理层在制定决策时参考此可信度水平。")
             
             # 添加各智能体分析可信度
             detail_para = doc.add_paragraph()
-            detail_para.add_run('【分析模块可信度】').bold = True
+            _add_bold_run(detail_para, '【分析模块可信度】')
             detail_para.add_run("各专业分析模块的数据可信度如下：")
             for result in agent_results:
-                agent_para = doc.add_paragraph(f"• {result.agent_name}: {result.confidence_score:.1%}", style='List Bullet')
+                agent_para = _add_styled_paragraph(doc, bullet_style_id, f"• {result.agent_name}: {result.confidence_score:.1%}")
             
             # 8. 附录：决策支持说明
-            doc.add_heading('8. 附录：决策支持说明', level=1)
-            doc.add_heading('8.1 系统技术说明', level=2)
+            _add_styled_paragraph(doc, heading_style_ids[1], '8. 附录：决策支持说明')
+            _add_styled_paragraph(doc, heading_style_ids[2], '8.1 系统技术说明')
             tech_info = doc.add_paragraph()
-            tech_info.add_run('【分析系统】').bold = True
+            _add_bold_run(tech_info, '【分析系统】')
             tech_info.add_run("四川智水信息AI智慧管理决策支持系统\n")
-            tech_info.add_run('【系统版本】').bold = True
+            _add_bold_run(tech_info, '【系统版本】')
             tech_info.add_run("v1.0.0 - 企业级智能决策分析平台\n")
-            tech_info.add_run('【技术支持】').bold = True
+            _add_bold_run(tech_info, '【技术支持】')
             tech_info.add_run("商海星辰队\n")
-            tech_info.add_run('【服务热线】').bold = True
+            _add_bold_run(tech_info, '【服务热线】')
             tech_info.add_run("如需技术支持或决策咨询，请联系商海星辰队")
             
             # 保存文档到用户桌面的智水信息报告文件夹
-            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-            reports_dir = os.path.join(desktop_path, "智水信息AI分析报告")
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
+            reports_dir = self._reports_dir
+            os.makedirs(reports_dir, exist_ok=True)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             word_filename = f"智水信息管理决策支持报告_{timestamp}.docx"
             word_file_path = os.path.join(reports_dir, word_filename)
             
-            doc.save(word_file_path)
+            # docx是ZIP包，python-docx会写入大量小的分片：先在内存中生成完整文件，
+            # 一次写入临时文件后原子替换，文件监听方不会读到写了一半的报告；
+            # 临时文件名唯一，同一秒生成的多份报告互不覆盖，写入或替换失败时删除临时文件
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            temp_file = tempfile.NamedTemporaryFile(dir=reports_dir, suffix=".tmp", delete=False)
+            try:
+                with temp_file:
+                    temp_file.write(buffer.getbuffer())
+                os.replace(temp_file.name, word_file_path)
+            except BaseException:
+                os.unlink(temp_file.name)
+                raise
             
             logger.info(f"决策支持报告已生成: {word_file_path}")
             return word_file_path
@@ -1543,13 +1793,10 @@ class ReportGeneratorAgent(BaseAgent):
     def _format_analysis_data_for_word(self, analysis_data: Dict[str, Any]) -> str:
         """格式化分析数据用于Word文档"""
         try:
-            formatted_text = ""
-            
-            for key, value in analysis_data.items():
-                if isinstance(value, (dict, list)):
-                    formatted_text += f"• {key}: {json.dumps(value, ensure_ascii=False, indent=2)}\n"
-                else:
-                    formatted_text += f"• {key}: {value}\n"
+            formatted_text = "".join(
+                f"• {key}: {_dumps_pretty(value)}\n" if isinstance(value, (dict, list)) else f"• {key}: {value}\n"
+                for key, value in analysis_data.items()
+            )
             
             return formatted_text if formatted_text else "无详细数据"
             
@@ -1559,7 +1806,7 @@ class ReportGeneratorAgent(BaseAgent):
     
     def _generate_report_sections(self, agent_results: List[AgentAnalysisResult]) -> str:
         """生成报告章节"""
-        sections_html = ""
+        sections = []
         
         for result in agent_results:
             section_html = f"""
@@ -1575,212 +1822,76 @@ class ReportGeneratorAgent(BaseAgent):
                 
                 <h3>关键洞察</h3>
                 <ul>
-                    {''.join([f'<li>{insight}</li>' for insight in result.key_insights])}
+                    {''.join(f'<li>{insight}</li>' for insight in result.key_insights)}
                 </ul>
                 
                 <h3>专业建议</h3>
                 <ul>
-                    {''.join([f'<li>{rec}</li>' for rec in result.recommendations])}
+                    {''.join(f'<li>{rec}</li>' for rec in result.recommendations)}
                 </ul>
                 
                 <h3>详细数据</h3>
                 <pre style="background: #f8f9fa; padding: 15px; border-radius: 4px; overflow-x: auto;">
-{json.dumps(result.analysis_data, ensure_ascii=False, indent=2)}
+{result.analysis_json}
                 </pre>
             </div>
             """
-            sections_html += section_html
+            sections.append(section_html)
         
-        return sections_html
+        return "".join(sections)
     
     def _generate_chart_scripts(self, agent_results: List[AgentAnalysisResult]) -> str:
         """生成图表脚本 - 符合设计文档要求的专业图表"""
         scripts = []
         chart_id = 0
         
-        # 苹果风格蓝黑白配色方案
-        color_scheme = {
-            'primary': ['#3b82f6', '#1d4ed8', '#2563eb', '#1e40af'],
-            'secondary': ['#1f2937', '#374151', '#4b5563', '#6b7280'],
-            'accent': ['#f8fafc', '#e2e8f0', '#cbd5e1', '#94a3b8']
-        }
-        
         # 为每个Agent结果生成对应的专业图表
         for result in agent_results:
             agent_name = result.agent_name.lower()
             
-            # 根据设计文档5.3节图表自动生成策略生成对应图表
-            if '财务' in agent_name or 'finance' in agent_name:
-                # 财务分析 -> 折线图（趋势分析）
-                script = self._create_financial_line_chart(f'chart_{chart_id}', result, color_scheme)
-            elif '成本' in agent_name or 'cost' in agent_name:
-                # 成本预测 -> 瀑布图（成本构成分析）
-                script = self._create_waterfall_chart(f'chart_{chart_id}', result, color_scheme)
-            elif '效能' in agent_name or 'performance' in agent_name:
-                # 效能评估 -> 雷达图（多维度评估）
-                script = self._create_performance_radar_chart(f'chart_{chart_id}', result, color_scheme)
-            elif '运维' in agent_name or 'operation' in agent_name:
-                # 运维知识 -> 热力图（知识分布）
-                script = self._create_heatmap_chart(f'chart_{chart_id}', result, color_scheme)
-            elif '决策' in agent_name or 'decision' in agent_name:
-                # 数据决策 -> 散点图（关联分析）
-                script = self._create_scatter_chart(f'chart_{chart_id}', result, color_scheme)
-            elif '人员' in agent_name or 'staff' in agent_name:
-                # 人员效能 -> 柱状图（对比分析）
-                script = self._create_staff_bar_chart(f'chart_{chart_id}', result, color_scheme)
+            # 根据设计文档5.3节图表自动生成策略生成对应图表，按表中顺序取第一个匹配的关键词
+            for keywords, chart_kind in self._CHART_DISPATCH:
+                if any(keyword in agent_name for keyword in keywords):
+                    break
             else:
                 # 默认使用现代饼图
-                script = self._create_modern_pie_chart(f'chart_{chart_id}', result, color_scheme)
+                chart_kind = "modern_pie"
+            script = self._create_chart(chart_kind, f'chart_{chart_id}', result)
             
-            scripts.append(script)
-            chart_id += 1
+            # 缺少图表数据的Agent不占用图表序号和容器
+            if script:
+                scripts.append(script)
+                chart_id += 1
         
         # 添加图表容器到HTML中
-        chart_containers = self._generate_chart_containers(len(agent_results))
+        chart_containers = self._generate_chart_containers(chart_id)
         
-        # 组合所有脚本 - 苹果风格增强版
-        full_script = f"""
-        // 智水信息专业图表初始化 - 苹果风格设计
-        document.addEventListener('DOMContentLoaded', function() {{
-            console.log('🍎 智水信息报告图表系统初始化...');
-            
-            // 延迟加载确保DOM完全渲染
-            setTimeout(function() {{
-                try {{
-                    // 添加图表容器
-                    {chart_containers}
-                    
-                    // 等待容器创建完成后初始化图表
-                    setTimeout(function() {{
-                        // 初始化所有图表
-                        {chr(10).join(scripts)}
-                        
-                        // 添加响应式处理
-                        window.addEventListener('resize', function() {{
-                            {chr(10).join([f'if (typeof chart_{i}_chart !== "undefined") chart_{i}_chart.resize();' for i in range(len(agent_results))])}
-                        }});
-                        
-                        // 添加苹果风格动画效果
-                        const chartContainers = document.querySelectorAll('.chart-container');
-                        chartContainers.forEach((container, index) => {{
-                            container.style.opacity = '0';
-                            container.style.transform = 'translateY(30px)';
-                            setTimeout(() => {{
-                                container.style.transition = 'all 0.6s cubic-bezier(0.4, 0, 0.2, 1)';
-                                container.style.opacity = '1';
-                                container.style.transform = 'translateY(0)';
-                            }}, index * 200);
-                        }});
-                        
-                        // 添加图表交互增强
-                        chartContainers.forEach(container => {{
-                            container.addEventListener('mouseenter', function() {{
-                                this.style.transform = 'translateY(-5px)';
-                                this.style.boxShadow = '0 20px 40px rgba(0, 0, 0, 0.15)';
-                            }});
-                            
-                            container.addEventListener('mouseleave', function() {{
-                                this.style.transform = 'translateY(0)';
-                                this.style.boxShadow = '0 4px 20px rgba(0, 0, 0, 0.1)';
-                            }});
-                        }});
-                        
-                        console.log('✅ 智水信息报告图表初始化完成');
-                        
-                    }}, 300);
-                    
-                }} catch (error) {{
-                    console.error('❌ 图表初始化错误:', error);
-                }}
-            }}, 100);
-        }});
-        """
+        # 图表初始化和窗口缩放脚本先拼好再代入模板
+        scripts_body = "\n".join(scripts)
+        resize_body = "\n".join(f'if (typeof chart_{i}_chart !== "undefined") chart_{i}_chart.resize();' for i in range(chart_id))
         
-        return full_script
+        # 组合所有脚本 - 苹果风格增强版
+        return _render_template(
+            _CHART_BOOTSTRAP_TEMPLATE,
+            chart_containers=chart_containers,
+            scripts_body=scripts_body,
+            resize_body=resize_body
+        )
     
     def _generate_chart_containers(self, chart_count: int) -> str:
         """生成苹果风格图表容器HTML"""
-        containers = []
-        for i in range(chart_count):
-            container = f"""
-            // 创建苹果风格图表容器 {i}
-            const chartContainer_{i} = document.createElement('div');
-            chartContainer_{i}.id = 'chart_{i}';
-            chartContainer_{i}.className = 'chart-container';
-            
-            // 苹果风格样式设置
-            chartContainer_{i}.style.cssText = `
-                height: 500px;
-                margin: 30px 0;
-                background: rgba(255, 255, 255, 0.95);
-                border-radius: 16px;
-                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
-                padding: 24px;
-                backdrop-filter: blur(20px);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-                position: relative;
-                overflow: hidden;
-            `;
-            
-            // 添加苹果风格装饰元素
-            const decorElement = document.createElement('div');
-            decorElement.style.cssText = `
-                position: absolute;
-                top: -50%;
-                right: -50%;
-                width: 100%;
-                height: 100%;
-                background: linear-gradient(45deg, rgba(0, 122, 255, 0.05), rgba(52, 199, 89, 0.05));
-                border-radius: 50%;
-                pointer-events: none;
-            `;
-            chartContainer_{i}.appendChild(decorElement);
-            
-            // 智能插入位置
-            const sections = document.querySelectorAll('.section');
-            if (sections[{i}]) {{
-                sections[{i}].appendChild(chartContainer_{i});
-            }} else {{
-                // 如果没有对应section，创建一个新的
-                const newSection = document.createElement('div');
-                newSection.className = 'section';
-                newSection.style.cssText = `
-                    margin: 40px 0;
-                    padding: 0;
-                `;
-                newSection.appendChild(chartContainer_{i});
-                
-                const contentArea = document.querySelector('.content') || document.body;
-                contentArea.appendChild(newSection);
-            }}
-            """
-            containers.append(container)
-        return '\n'.join(containers)
+        containers = [_render_template(_CHART_CONTAINER_TEMPLATE, i=i) for i in range(chart_count)]
+        return '\n'.join([_CHART_CONTAINERS_PROLOGUE, *containers, _CHART_CONTAINERS_EPILOGUE])
     
-    def _create_financial_line_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建财务分析折线图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实财务数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'financial_data' not in analysis_data:
-            raise Exception(f"财务分析数据缺失，无法生成图表。Agent: {result.agent_name}")
+    @staticmethod
+    def _load_chart_script_templates() -> Dict[str, str]:
+        """加载图表脚本模板
         
-        financial_data = analysis_data['financial_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['periods', 'revenue', 'expenses', 'profit']
-        for field in required_fields:
-            if field not in financial_data:
-                raise Exception(f"财务数据字段 '{field}' 缺失，无法生成图表")
-        
-        periods = financial_data['periods']
-        revenue = financial_data['revenue']
-        expenses = financial_data['expenses']
-        profit = financial_data['profit']
-        
-        return f"""
+        模板字段包括图表ID、图表数据和_CHART_COLORS中的扁平化配色（如primary_0）。
+        """
+        return {
+            # 财务分析折线图
+            "financial_line": """
         // 财务趋势分析折线图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -1788,7 +1899,7 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '财务趋势分析',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -1796,13 +1907,13 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 trigger: 'axis',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             legend: {{
                 data: ['收入', '支出', '净利润'],
                 top: '10%',
-                textStyle: {{ color: '{colors['secondary'][1]}' }}
+                textStyle: {{ color: '{secondary_1}' }}
             }},
             grid: {{
                 left: '3%',
@@ -1814,14 +1925,14 @@ class ReportGeneratorAgent(BaseAgent):
                 type: 'category',
                 boundaryGap: false,
                 data: {periods},
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }}
             }},
             yAxis: {{
                 type: 'value',
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }},
-                splitLine: {{ lineStyle: {{ color: '{colors['accent'][1]}' }} }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }},
+                splitLine: {{ lineStyle: {{ color: '{accent_1}' }} }}
             }},
             series: [
                 {{
@@ -1829,55 +1940,34 @@ class ReportGeneratorAgent(BaseAgent):
                     type: 'line',
                     smooth: true,
                     data: {revenue},
-                    lineStyle: {{ color: '{colors['primary'][0]}', width: 3 }},
-                    itemStyle: {{ color: '{colors['primary'][0]}' }},
-                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{colors['primary'][0]}40' }}, {{ offset: 1, color: '{colors['primary'][0]}10' }}]) }}
+                    lineStyle: {{ color: '{primary_0}', width: 3 }},
+                    itemStyle: {{ color: '{primary_0}' }},
+                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{primary_0}40' }}, {{ offset: 1, color: '{primary_0}10' }}]) }}
                 }},
                 {{
                     name: '支出',
                     type: 'line',
                     smooth: true,
                     data: {expenses},
-                    lineStyle: {{ color: '{colors['secondary'][0]}', width: 3 }},
-                    itemStyle: {{ color: '{colors['secondary'][0]}' }},
-                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{colors['secondary'][0]}40' }}, {{ offset: 1, color: '{colors['secondary'][0]}10' }}]) }}
+                    lineStyle: {{ color: '{secondary_0}', width: 3 }},
+                    itemStyle: {{ color: '{secondary_0}' }},
+                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{secondary_0}40' }}, {{ offset: 1, color: '{secondary_0}10' }}]) }}
                 }},
                 {{
                     name: '净利润',
                     type: 'line',
                     smooth: true,
                     data: {profit},
-                    lineStyle: {{ color: '{colors['primary'][2]}', width: 3 }},
-                    itemStyle: {{ color: '{colors['primary'][2]}' }},
-                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{colors['primary'][2]}40' }}, {{ offset: 1, color: '{colors['primary'][2]}10' }}]) }}
+                    lineStyle: {{ color: '{primary_2}', width: 3 }},
+                    itemStyle: {{ color: '{primary_2}' }},
+                    areaStyle: {{ color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [{{ offset: 0, color: '{primary_2}40' }}, {{ offset: 1, color: '{primary_2}10' }}]) }}
                 }}
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_waterfall_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建成本预测瀑布图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实成本数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'cost_data' not in analysis_data:
-            raise Exception(f"成本分析数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        cost_data = analysis_data['cost_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['categories', 'values', 'auxiliary_values']
-        for field in required_fields:
-            if field not in cost_data:
-                raise Exception(f"成本数据字段 '{field}' 缺失，无法生成图表")
-        
-        categories = cost_data['categories']
-        values = cost_data['values']
-        auxiliary_values = cost_data['auxiliary_values']
-        
-        return f"""
+        """,
+            # 成本预测瀑布图
+            "waterfall": """
         // 成本预测瀑布图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -1885,7 +1975,7 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '成本预测瀑布图',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -1893,8 +1983,8 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 trigger: 'axis',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             grid: {{
                 left: '3%',
@@ -1905,14 +1995,14 @@ class ReportGeneratorAgent(BaseAgent):
             xAxis: {{
                 type: 'category',
                 data: {categories},
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}', rotate: 45 }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}', rotate: 45 }}
             }},
             yAxis: {{
                 type: 'value',
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }},
-                splitLine: {{ lineStyle: {{ color: '{colors['accent'][1]}' }} }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }},
+                splitLine: {{ lineStyle: {{ color: '{accent_1}' }} }}
             }},
             series: [
                 {{
@@ -1928,7 +2018,7 @@ class ReportGeneratorAgent(BaseAgent):
                     stack: 'total',
                     itemStyle: {{
                         color: function(params) {{
-                            const colors = ['{colors['primary'][0]}', '{colors['primary'][1]}', '{colors['primary'][2]}', '{colors['primary'][3]}', '{colors['secondary'][0]}', '{colors['primary'][0]}'];
+                            const colors = ['{primary_0}', '{primary_1}', '{primary_2}', '{primary_3}', '{secondary_0}', '{primary_0}'];
                             return colors[params.dataIndex % colors.length];
                         }}
                     }},
@@ -1937,30 +2027,9 @@ class ReportGeneratorAgent(BaseAgent):
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_performance_radar_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建效能评估雷达图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实效能数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'performance_data' not in analysis_data:
-            raise Exception(f"效能评估数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        performance_data = analysis_data['performance_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['indicators', 'current_values', 'target_values']
-        for field in required_fields:
-            if field not in performance_data:
-                raise Exception(f"效能数据字段 '{field}' 缺失，无法生成图表")
-        
-        indicators = performance_data['indicators']
-        current_values = performance_data['current_values']
-        target_values = performance_data['target_values']
-        
-        return f"""
+        """,
+            # 效能评估雷达图
+            "performance_radar": """
         // 效能评估雷达图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -1968,30 +2037,30 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '效能评估雷达图',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
             }},
             tooltip: {{
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             radar: {{
                 indicator: {indicators},
                 shape: 'polygon',
                 radius: '60%',
                 axisName: {{
-                    color: '{colors['secondary'][1]}',
+                    color: '{secondary_1}',
                     fontSize: 12
                 }},
                 splitLine: {{
-                    lineStyle: {{ color: '{colors['accent'][2]}' }}
+                    lineStyle: {{ color: '{accent_2}' }}
                 }},
                 splitArea: {{
                     areaStyle: {{
-                        color: ['{colors['accent'][0]}20', '{colors['accent'][1]}20']
+                        color: ['{accent_0}20', '{accent_1}20']
                     }}
                 }}
             }},
@@ -2003,48 +2072,25 @@ class ReportGeneratorAgent(BaseAgent):
                         {{
                             value: {current_values},
                             name: '当前效能',
-                            itemStyle: {{ color: '{colors['primary'][0]}' }},
-                            areaStyle: {{ color: '{colors['primary'][0]}40' }},
-                            lineStyle: {{ color: '{colors['primary'][0]}', width: 2 }}
+                            itemStyle: {{ color: '{primary_0}' }},
+                            areaStyle: {{ color: '{primary_0}40' }},
+                            lineStyle: {{ color: '{primary_0}', width: 2 }}
                         }},
                         {{
                             value: {target_values},
                             name: '目标效能',
-                            itemStyle: {{ color: '{colors['primary'][2]}' }},
-                            areaStyle: {{ color: '{colors['primary'][2]}20' }},
-                            lineStyle: {{ color: '{colors['primary'][2]}', width: 2, type: 'dashed' }}
+                            itemStyle: {{ color: '{primary_2}' }},
+                            areaStyle: {{ color: '{primary_2}20' }},
+                            lineStyle: {{ color: '{primary_2}', width: 2, type: 'dashed' }}
                         }}
                     ]
                 }}
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_heatmap_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建运维知识分布热力图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实热力图数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'heatmap_data' not in analysis_data:
-            raise Exception(f"热力图数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        heatmap_data = analysis_data['heatmap_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['x_categories', 'y_categories', 'data_points', 'min_value', 'max_value']
-        for field in required_fields:
-            if field not in heatmap_data:
-                raise Exception(f"热力图数据字段 '{field}' 缺失，无法生成图表")
-        
-        x_categories = heatmap_data['x_categories']
-        y_categories = heatmap_data['y_categories']
-        data_points = heatmap_data['data_points']
-        min_value = heatmap_data['min_value']
-        max_value = heatmap_data['max_value']
-        
-        return f"""
+        """,
+            # 运维知识分布热力图
+            "heatmap": """
         // 运维知识分布热力图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -2052,7 +2098,7 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '运维知识分布热力图',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -2060,8 +2106,8 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 position: 'top',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             grid: {{
                 height: '50%',
@@ -2071,13 +2117,13 @@ class ReportGeneratorAgent(BaseAgent):
                 type: 'category',
                 data: {x_categories},
                 splitArea: {{ show: true }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }}
+                axisLabel: {{ color: '{secondary_2}' }}
             }},
             yAxis: {{
                 type: 'category',
                 data: {y_categories},
                 splitArea: {{ show: true }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }}
+                axisLabel: {{ color: '{secondary_2}' }}
             }},
             visualMap: {{
                 min: {min_value},
@@ -2087,9 +2133,9 @@ class ReportGeneratorAgent(BaseAgent):
                 left: 'center',
                 bottom: '5%',
                 inRange: {{
-                    color: ['{colors['accent'][0]}', '{colors['primary'][3]}', '{colors['primary'][0]}']
+                    color: ['{accent_0}', '{primary_3}', '{primary_0}']
                 }},
-                textStyle: {{ color: '{colors['secondary'][2]}' }}
+                textStyle: {{ color: '{secondary_2}' }}
             }},
             series: [
                 {{
@@ -2098,7 +2144,7 @@ class ReportGeneratorAgent(BaseAgent):
                     data: {data_points},
                     label: {{
                         show: true,
-                        color: '{colors['secondary'][0]}'
+                        color: '{secondary_0}'
                     }},
                     emphasis: {{
                         itemStyle: {{
@@ -2110,31 +2156,9 @@ class ReportGeneratorAgent(BaseAgent):
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_scatter_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建数据关联分析散点图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实散点图数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'scatter_data' not in analysis_data:
-            raise Exception(f"散点图数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        scatter_data = analysis_data['scatter_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['data_points', 'x_axis_name', 'y_axis_name', 'series_name']
-        for field in required_fields:
-            if field not in scatter_data:
-                raise Exception(f"散点图数据字段 '{field}' 缺失，无法生成图表")
-        
-        data_points = scatter_data['data_points']
-        x_axis_name = scatter_data['x_axis_name']
-        y_axis_name = scatter_data['y_axis_name']
-        series_name = scatter_data['series_name']
-        
-        return f"""
+        """,
+            # 数据关联分析散点图
+            "scatter": """
         // 数据关联分析散点图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -2142,7 +2166,7 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '数据关联分析',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -2150,8 +2174,8 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 trigger: 'item',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             grid: {{
                 left: '3%',
@@ -2162,16 +2186,16 @@ class ReportGeneratorAgent(BaseAgent):
             xAxis: {{
                 type: 'value',
                 name: '{x_axis_name}',
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }},
-                splitLine: {{ lineStyle: {{ color: '{colors['accent'][1]}' }} }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }},
+                splitLine: {{ lineStyle: {{ color: '{accent_1}' }} }}
             }},
             yAxis: {{
                 type: 'value',
                 name: '{y_axis_name}',
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }},
-                splitLine: {{ lineStyle: {{ color: '{colors['accent'][1]}' }} }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }},
+                splitLine: {{ lineStyle: {{ color: '{accent_1}' }} }}
             }},
             series: [
                 {{
@@ -2180,13 +2204,13 @@ class ReportGeneratorAgent(BaseAgent):
                     data: {data_points},
                     symbolSize: function(data) {{ return Math.sqrt(data[2] || 100) / 2; }},
                     itemStyle: {{
-                        color: '{colors['primary'][0]}',
+                        color: '{primary_0}',
                         opacity: 0.8
                     }},
                     emphasis: {{
                         itemStyle: {{
-                            color: '{colors['primary'][2]}',
-                            borderColor: '{colors['secondary'][0]}',
+                            color: '{primary_2}',
+                            borderColor: '{secondary_0}',
                             borderWidth: 2
                         }}
                     }}
@@ -2194,32 +2218,9 @@ class ReportGeneratorAgent(BaseAgent):
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_staff_bar_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建人员效能对比柱状图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实柱状图数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'bar_chart_data' not in analysis_data:
-            raise Exception(f"柱状图数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        bar_data = analysis_data['bar_chart_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['categories', 'current_values', 'target_values', 'current_name', 'target_name']
-        for field in required_fields:
-            if field not in bar_data:
-                raise Exception(f"柱状图数据字段 '{field}' 缺失，无法生成图表")
-        
-        categories = bar_data['categories']
-        current_values = bar_data['current_values']
-        target_values = bar_data['target_values']
-        current_name = bar_data['current_name']
-        target_name = bar_data['target_name']
-        
-        return f"""
+        """,
+            # 人员效能对比柱状图
+            "staff_bar": """
         // 人员效能对比柱状图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
@@ -2227,7 +2228,7 @@ class ReportGeneratorAgent(BaseAgent):
                 text: '人员效能对比',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -2235,13 +2236,13 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 trigger: 'axis',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             legend: {{
                 data: ['{current_name}', '{target_name}'],
                 top: '10%',
-                textStyle: {{ color: '{colors['secondary'][1]}' }}
+                textStyle: {{ color: '{secondary_1}' }}
             }},
             grid: {{
                 left: '3%',
@@ -2252,14 +2253,14 @@ class ReportGeneratorAgent(BaseAgent):
             xAxis: {{
                 type: 'category',
                 data: {categories},
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}', rotate: 45 }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}', rotate: 45 }}
             }},
             yAxis: {{
                 type: 'value',
-                axisLine: {{ lineStyle: {{ color: '{colors['accent'][2]}' }} }},
-                axisLabel: {{ color: '{colors['secondary'][2]}' }},
-                splitLine: {{ lineStyle: {{ color: '{colors['accent'][1]}' }} }}
+                axisLine: {{ lineStyle: {{ color: '{accent_2}' }} }},
+                axisLabel: {{ color: '{secondary_2}' }},
+                splitLine: {{ lineStyle: {{ color: '{accent_1}' }} }}
             }},
             series: [
                 {{
@@ -2268,8 +2269,8 @@ class ReportGeneratorAgent(BaseAgent):
                     data: {current_values},
                     itemStyle: {{
                         color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [
-                            {{ offset: 0, color: '{colors['primary'][0]}' }},
-                            {{ offset: 1, color: '{colors['primary'][1]}' }}
+                            {{ offset: 0, color: '{primary_0}' }},
+                            {{ offset: 1, color: '{primary_1}' }}
                         ])
                     }}
                 }},
@@ -2279,10 +2280,10 @@ class ReportGeneratorAgent(BaseAgent):
                     data: {target_values},
                     itemStyle: {{
                         color: new echarts.graphic.LinearGradient(0, 0, 0, 1, [
-                            {{ offset: 0, color: '{colors['primary'][2]}40' }},
-                            {{ offset: 1, color: '{colors['primary'][3]}40' }}
+                            {{ offset: 0, color: '{primary_2}40' }},
+                            {{ offset: 1, color: '{primary_3}40' }}
                         ]),
-                        borderColor: '{colors['primary'][2]}',
+                        borderColor: '{primary_2}',
                         borderWidth: 2,
                         borderType: 'dashed'
                     }}
@@ -2290,43 +2291,17 @@ class ReportGeneratorAgent(BaseAgent):
             ]
         }};
         {chart_id}_chart.setOption({chart_id}_option);
-        """
-    
-    def _create_modern_pie_chart(self, chart_id: str, result: AgentAnalysisResult, colors: Dict) -> str:
-        """创建现代饼图 - 基于真实数据"""
-        # 从AgentAnalysisResult中提取真实饼图数据
-        analysis_data = result.analysis_data
-        
-        # 如果没有真实数据，返回错误
-        if not analysis_data or 'pie_chart_data' not in analysis_data:
-            raise Exception(f"饼图数据缺失，无法生成图表。Agent: {result.agent_name}")
-        
-        pie_data = analysis_data['pie_chart_data']
-        
-        # 验证必要的数据字段
-        required_fields = ['data_items', 'series_name']
-        for field in required_fields:
-            if field not in pie_data:
-                raise Exception(f"饼图数据字段 '{field}' 缺失，无法生成图表")
-        
-        data_items = pie_data['data_items']
-        series_name = pie_data['series_name']
-        
-        # 为数据项添加颜色
-        color_palette = [colors['primary'][0], colors['primary'][1], colors['primary'][2], colors['secondary'][0]]
-        for i, item in enumerate(data_items):
-            if 'itemStyle' not in item:
-                item['itemStyle'] = {'color': color_palette[i % len(color_palette)]}
-        
-        return f"""
+        """,
+            # 现代饼图
+            "modern_pie": """
         // 现代饼图 - 基于真实数据
         const {chart_id}_chart = echarts.init(document.getElementById('{chart_id}'));
         const {chart_id}_option = {{
             title: {{
-                text: '{result.agent_name}分析结果',
+                text: '{agent_name}分析结果',
                 left: 'center',
                 textStyle: {{
-                    color: '{colors['secondary'][0]}',
+                    color: '{secondary_0}',
                     fontSize: 18,
                     fontWeight: 'bold'
                 }}
@@ -2334,13 +2309,13 @@ class ReportGeneratorAgent(BaseAgent):
             tooltip: {{
                 trigger: 'item',
                 backgroundColor: 'rgba(255, 255, 255, 0.95)',
-                borderColor: '{colors['primary'][0]}',
-                textStyle: {{ color: '{colors['secondary'][0]}' }}
+                borderColor: '{primary_0}',
+                textStyle: {{ color: '{secondary_0}' }}
             }},
             legend: {{
                 orient: 'vertical',
                 left: 'left',
-                textStyle: {{ color: '{colors['secondary'][1]}' }}
+                textStyle: {{ color: '{secondary_1}' }}
             }},
             series: [
                 {{
@@ -2363,7 +2338,7 @@ class ReportGeneratorAgent(BaseAgent):
                             show: true,
                             fontSize: '16',
                             fontWeight: 'bold',
-                            color: '{colors['secondary'][0]}'
+                            color: '{secondary_0}'
                         }}
                     }},
                     labelLine: {{
@@ -2375,30 +2350,56 @@ class ReportGeneratorAgent(BaseAgent):
         }};
         {chart_id}_chart.setOption({chart_id}_option);
         """
+        }
+    
+    def _create_chart(self, chart_kind: str, chart_id: str, result: AgentAnalysisResult) -> str:
+        """按图表规格校验真实数据并渲染图表脚本（苹果风格蓝黑白配色已在导入时代入模板）
+        
+        Agent未提供该类图表数据时返回空字符串，不生成图表；图表数据字段不完整时抛出异常。
+        """
+        data_key, data_label, field_label, required_fields, text_fields = self._CHART_SPECS[chart_kind]
+        
+        # 如果没有真实数据，跳过该图表（不使用模拟数据）
+        analysis_data = result.analysis_data
+        if not analysis_data or data_key not in analysis_data:
+            logger.warning(f"{data_label}缺失，跳过图表生成。Agent: {result.agent_name}")
+            return ""
+        
+        chart_data = analysis_data[data_key]
+        
+        # 验证必要的数据字段，缺失时按规格顺序一次列出全部缺失字段
+        missing_fields = _CHART_REQUIRED_FIELDS[chart_kind].difference(chart_data)
+        if missing_fields:
+            missing_text = ", ".join(f"'{field}'" for field in required_fields if field in missing_fields)
+            raise Exception(f"{field_label}字段 {missing_text} 缺失，无法生成图表")
+        
+        if chart_kind == "modern_pie":
+            # 为数据项按配色循环添加颜色，已指定颜色的数据项保持不变
+            for item, color in zip(chart_data['data_items'], cycle(_PIE_CHART_PALETTE)):
+                if 'itemStyle' not in item:
+                    item['itemStyle'] = {'color': color}
+        
+        fields = {
+            field: chart_data[field] if field in text_fields else _dumps_compact(chart_data[field])
+            for field in required_fields
+        }
+        return _render_template(_CHART_SCRIPT_TEMPLATES[chart_kind], chart_id=chart_id, agent_name=result.agent_name, **fields)
     
     def _format_recommendations(self, recommendations: List[str]) -> str:
         """格式化建议列表"""
         if not recommendations:
             return "<p>暂无具体建议</p>"
         
-        formatted = "<ul>"
-        for rec in recommendations:
-            formatted += f"<li>{rec}</li>"
-        formatted += "</ul>"
-        
-        return formatted
+        return "<ul>" + "".join(f"<li>{rec}</li>" for rec in recommendations) + "</ul>"
     
     def _format_risk_assessment(self, risk_data: Dict[str, Any]) -> str:
         """格式化风险评估"""
         if not risk_data:
             return "<p>未识别到重大风险</p>"
         
-        formatted = "<ul>"
-        for risk, description in risk_data.items():
-            formatted += f"<li><strong>{risk}</strong>: {description}</li>"
-        formatted += "</ul>"
-        
-        return formatted
+        return "<ul>" + "".join(
+            f"<li><strong>{risk}</strong>: {description}</li>" for risk, description in risk_data.items()
+        ) + "</ul>"
     
     def _format_confidence_metrics(self, overall_confidence: float) -> str:
         """格式化置信度指标"""
@@ -2415,13 +2416,162 @@ class ReportGeneratorAgent(BaseAgent):
         <p>置信度说明：基于各专业Agent分析结果的加权平均值，反映综合分析的可靠程度。</p>
         """
 
+# 报告模板和图表配置只在导入时加载一次（图表配置只读共享）；HTML模板同时压缩CSS和内联脚本并预解析为片段，
+# 图表脚本模板压缩、预解析后直接代入固定配色，渲染时只剩图表ID和数据字段
+_REPORT_TEMPLATES = ReportGeneratorAgent._load_report_templates()
+_CHART_CONFIGS = MappingProxyType({
+    name: MappingProxyType(chart) for name, chart in ReportGeneratorAgent._load_chart_configurations().items()
+})
+_COMPILED_TEMPLATES = {
+    name: _compile_template(_minify_script_blocks(_minify_style_blocks(template))) for name, template in _REPORT_TEMPLATES.items()
+}
+# 图表系统启动脚本模板：页面加载后插入图表容器、初始化全部图表并注册缩放和动画效果
+_CHART_BOOTSTRAP_TEMPLATE = _compile_template(_minify_script("""
+        // 智水信息专业图表初始化 - 苹果风格设计
+        document.addEventListener('DOMContentLoaded', function() {{
+            console.log('🍎 智水信息报告图表系统初始化...');
+            
+            // 延迟加载确保DOM完全渲染
+            setTimeout(function() {{
+                try {{
+                    // 添加图表容器
+                    {chart_containers}
+                    
+                    // 容器插入后在下一帧渲染前统一初始化所有图表，图表布局与浏览器渲染合并为一次
+                    requestAnimationFrame(function() {{
+                        // 初始化所有图表
+                        {scripts_body}
+                        
+                        // 添加响应式处理
+                        window.addEventListener('resize', function() {{
+                            {resize_body}
+                        }});
+                        
+                        // 添加苹果风格动画效果
+                        const chartContainers = document.querySelectorAll('.chart-container');
+                        chartContainers.forEach((container, index) => {{
+                            container.style.opacity = '0';
+                            container.style.transform = 'translateY(30px)';
+                            setTimeout(() => {{
+                                container.style.transition = 'all 0.6s cubic-bezier(0.4, 0, 0.2, 1)';
+                                container.style.opacity = '1';
+                                container.style.transform = 'translateY(0)';
+                            }}, index * 200);
+                        }});
+                        
+                        // 添加图表交互增强
+                        chartContainers.forEach(container => {{
+                            container.addEventListener('mouseenter', function() {{
+                                this.style.transform = 'translateY(-5px)';
+                                this.style.boxShadow = '0 20px 40px rgba(0, 0, 0, 0.15)';
+                            }});
+                            
+                            container.addEventListener('mouseleave', function() {{
+                                this.style.transform = 'translateY(0)';
+                                this.style.boxShadow = '0 4px 20px rgba(0, 0, 0, 0.1)';
+                            }});
+                        }});
+                        
+                        console.log('✅ 智水信息报告图表初始化完成');
+                        
+                    }});
+                    
+                }} catch (error) {{
+                    console.error('❌ 图表初始化错误:', error);
+                }}
+            }}, 100);
+        }});
+        """))
+
+# 图表容器创建脚本模板，按图表序号{i}逐个渲染；新建的section先放入文档片段，全部创建后一次性插入页面
+_CHART_CONTAINERS_PROLOGUE = _minify_script("""
+            // 已有section只查询一次，新建section先收集到文档片段中
+            const sections = document.querySelectorAll('.section');
+            const chartFragment = document.createDocumentFragment();
+            """)
+_CHART_CONTAINERS_EPILOGUE = _minify_script("""
+            // 新建的section一次性插入页面
+            (document.querySelector('.content') || document.body).appendChild(chartFragment);
+            """)
+_CHART_CONTAINER_TEMPLATE = _compile_template(_minify_script("""
+            // 创建苹果风格图表容器 {i}
+            const chartContainer_{i} = document.createElement('div');
+            chartContainer_{i}.id = 'chart_{i}';
+            chartContainer_{i}.className = 'chart-container';
+            
+            // 苹果风格样式设置
+            chartContainer_{i}.style.cssText = `
+                height: 500px;
+                margin: 30px 0;
+                background: rgba(255, 255, 255, 0.95);
+                border-radius: 16px;
+                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.1);
+                padding: 24px;
+                backdrop-filter: blur(20px);
+                border: 1px solid rgba(255, 255, 255, 0.2);
+                transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+                position: relative;
+                overflow: hidden;
+            `;
+            
+            // 添加苹果风格装饰元素
+            const decorElement_{i} = document.createElement('div');
+            decorElement_{i}.style.cssText = `
+                position: absolute;
+                top: -50%;
+                right: -50%;
+                width: 100%;
+                height: 100%;
+                background: linear-gradient(45deg, rgba(0, 122, 255, 0.05), rgba(52, 199, 89, 0.05));
+                border-radius: 50%;
+                pointer-events: none;
+            `;
+            chartContainer_{i}.appendChild(decorElement_{i});
+            
+            // 智能插入位置
+            if (sections[{i}]) {{
+                sections[{i}].appendChild(chartContainer_{i});
+            }} else {{
+                // 如果没有对应section，创建一个新的
+                const newSection = document.createElement('div');
+                newSection.className = 'section';
+                newSection.style.cssText = `
+                    margin: 40px 0;
+                    padding: 0;
+                `;
+                newSection.appendChild(chartContainer_{i});
+                chartFragment.appendChild(newSection);
+            }}
+            """))
+_CHART_REQUIRED_FIELDS = MappingProxyType({
+    name: frozenset(spec[3]) for name, spec in ReportGeneratorAgent._CHART_SPECS.items()
+})
+_CHART_SCRIPT_TEMPLATES = MappingProxyType({
+    name: _bind_template(_compile_template(_minify_script(template)), **_CHART_COLORS)
+    for name, template in ReportGeneratorAgent._load_chart_script_templates().items()
+})
+
 # ================================
 # 4. 工厂函数
 # ================================
 
+_REPORT_GENERATOR_AGENT: Optional[ReportGeneratorAgent] = None
+_REPORT_GENERATOR_AGENT_LOCK = threading.Lock()
+
 def create_report_generator_agent() -> ReportGeneratorAgent:
-    """创建报告生成专家Agent实例"""
-    return ReportGeneratorAgent()
+    """获取进程共享的报告生成专家Agent实例
+    
+    实例只持有只读的模板、图表配置和报告目录，可在并发工作流之间共享；
+    首次调用时创建，创建过程加锁，保证进程内只有一个实例。调用方不应修改实例属性。
+    """
+    global _REPORT_GENERATOR_AGENT
+    if _REPORT_GENERATOR_AGENT is not None:
+        return _REPORT_GENERATOR_AGENT
+    
+    with _REPORT_GENERATOR_AGENT_LOCK:
+        if _REPORT_GENERATOR_AGENT is None:
+            _REPORT_GENERATOR_AGENT = ReportGeneratorAgent()
+    return _REPORT_GENERATOR_AGENT
 
 # ================================
 # 5. 模块导出
@@ -15,21 +15,27 @@ Version: 1.0.0
 """
 
 import os
-from typing import Dict, Any, List
-from dataclasses import dataclass
+import threading
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Tuple
+from dataclasses import dataclass, field, fields
 
 # ================================
 # 1. AI模型配置
 # ================================
 
-# 统一AI配置 - 所有模块使用（环境变量优先）
-AI_CONFIG = {
-    "api_key": os.getenv("OPENAI_API_KEY", ""),
+# 统一AI配置 - 所有模块使用（环境变量优先）；只读，需要修改时使用get_ai_config()返回的副本
+# API密钥不在导入时固化，通过get_ai_api_key()在使用时读取
+AI_CONFIG = MappingProxyType({
     "api_base": os.getenv("OPENAI_API_BASE", "http://38.246.251.165:3002/v1"),
     "model": os.getenv("OPENAI_MODEL", "gemini-2.5-flash-preview-05-20"),
     "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
     "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "65000")),
-}
+})
+
+def get_ai_api_key() -> str:
+    """读取AI服务API密钥（每次调用时读取环境变量OPENAI_API_KEY）"""
+    return os.getenv("OPENAI_API_KEY", "")
 
 # ================================
 # 2. 系统运行配置
@@ -57,16 +63,60 @@ class SystemConfig:
     # 安全配置
     enable_input_validation: bool = True
     max_input_length: int = 10000
-    allowed_file_types: List[str] = None
-    
-    def __post_init__(self):
-        if self.allowed_file_types is None:
-            self.allowed_file_types = ['.txt', '.csv', '.xlsx', '.json', '.pdf']
+    allowed_file_types: Tuple[str, ...] = ('.txt', '.csv', '.xlsx', '.json', '.pdf')
 
 # ================================
 # 3. Agent配置
 # ================================
 
+# 专业Agent特定配置默认值
+# 财务分析Agent配置
+_FINANCIAL_AGENT_DEFAULTS = MappingProxyType({
+    "analysis_depth": "comprehensive",  # basic, standard, comprehensive
+    "include_forecasting": True,
+    "risk_assessment_level": "detailed",
+    "benchmark_comparison": True,
+    "industry_context": "电力水利行业"
+})
+
+# 成本分析Agent配置
+_COST_AGENT_DEFAULTS = MappingProxyType({
+    "cost_breakdown_level": "detailed",
+    "profitability_analysis": True,
+    "cost_optimization_suggestions": True,
+    "budget_variance_analysis": True,
+    "project_cost_tracking": True
+})
+
+# 知识管理Agent配置
+_KNOWLEDGE_AGENT_DEFAULTS = MappingProxyType({
+    "knowledge_depth": "expert",
+    "solution_complexity": "comprehensive",
+    "best_practices_inclusion": True,
+    "case_study_examples": True,
+    "technical_documentation": True
+})
+
+# 效能分析Agent配置
+_EFFICIENCY_AGENT_DEFAULTS = MappingProxyType({
+    "efficiency_metrics": "comprehensive",
+    "performance_benchmarking": True,
+    "optimization_recommendations": True,
+    "resource_utilization_analysis": True,
+    "productivity_insights": True
+})
+
+# 报告生成Agent配置
+_REPORT_AGENT_DEFAULTS = MappingProxyType({
+    "report_format": "html",
+    "include_charts": True,
+    "include_tables": True,
+    "include_executive_summary": True,
+    "include_recommendations": True,
+    "visual_theme": "professional",
+    "chart_library": "plotly"
+})
+
 @dataclass
 class AgentConfig:
     """Agent通用配置"""
@@ -81,65 +131,12 @@ class AgentConfig:
     include_reasoning: bool = True
     include_confidence: bool = True
     
-    # 专业Agent特定配置
-    financial_agent_config: Dict[str, Any] = None
-    cost_agent_config: Dict[str, Any] = None
-    knowledge_agent_config: Dict[str, Any] = None
-    efficiency_agent_config: Dict[str, Any] = None
-    report_agent_config: Dict[str, Any] = None
-    
-    def __post_init__(self):
-        # 财务分析Agent配置
-        if self.financial_agent_config is None:
-            self.financial_agent_config = {
-                "analysis_depth": "comprehensive",  # basic, standard, comprehensive
-                "include_forecasting": True,
-                "risk_assessment_level": "detailed",
-                "benchmark_comparison": True,
-                "industry_context": "电力水利行业"
-            }
-        
-        # 成本分析Agent配置
-        if self.cost_agent_config is None:
-            self.cost_agent_config = {
-                "cost_breakdown_level": "detailed",
-                "profitability_analysis": True,
-                "cost_optimization_suggestions": True,
-                "budget_variance_analysis": True,
-                "project_cost_tracking": True
-            }
-        
-        # 知识管理Agent配置
-        if self.knowledge_agent_config is None:
-            self.knowledge_agent_config = {
-                "knowledge_depth": "expert",
-                "solution_complexity": "comprehensive",
-                "best_practices_inclusion": True,
-                "case_study_examples": True,
-                "technical_documentation": True
-            }
-        
-        # 效能分析Agent配置
-        if self.efficiency_agent_config is None:
-            self.efficiency_agent_config = {
-                "efficiency_metrics": "comprehensive",
-                "performance_benchmarking": True,
-                "optimization_recommendations": True,
-                "resource_utilization_analysis": True,
-                "productivity_insights": True
-            }
-        
-        # 报告生成Agent配置
-        if self.report_agent_config is None:
-            self.report_agent_config = {
-                "report_format": "html",
-                "include_charts": True,
-                "include_tables": True,
-                "include_executive_summary": True,
-                "include_recommendations": True,
-                "visual_theme": "professional",
-                "chart_library": "plotly"
-            }
+    # 专业Agent特定配置（默认值为模块级只读配置，所有实例共享；需要修改时整体替换）
+    financial_agent_config: Mapping[str, Any] = field(default_factory=lambda: _FINANCIAL_AGENT_DEFAULTS)
+    cost_agent_config: Mapping[str, Any] = field(default_factory=lambda: _COST_AGENT_DEFAULTS)
+    knowledge_agent_config: Mapping[str, Any] = field(default_factory=lambda: _KNOWLEDGE_AGENT_DEFAULTS)
+    efficiency_agent_config: Mapping[str, Any] = field(default_factory=lambda: _EFFICIENCY_AGENT_DEFAULTS)
+    report_agent_config: Mapping[str, Any] = field(default_factory=lambda: _REPORT_AGENT_DEFAULTS)
 
 # ================================
 # 4. 日志配置
@@ -202,6 +199,15 @@ class WorkflowConfig:
 # 6. 监控配置
 # ================================
 
+# 告警阈值默认值（只读，所有实例共享）
+_ALERT_THRESHOLD_DEFAULTS = MappingProxyType({
+    "max_execution_time": 600.0,  # 秒
+    "min_success_rate": 0.8,
+    "max_error_rate": 0.2,
+    "max_memory_usage": 0.8,  # 80%
+    "max_cpu_usage": 0.9  # 90%
+})
+
 @dataclass
 class MonitoringConfig:
     """监控配置"""
@@ -216,26 +222,51 @@ class MonitoringConfig:
     
     # 告警配置
     enable_alerts: bool = True
-    alert_thresholds: Dict[str, float] = None
+    alert_thresholds: Mapping[str, float] = field(default_factory=lambda: _ALERT_THRESHOLD_DEFAULTS)
     
     # 指标收集
     collect_detailed_metrics: bool = True
     metrics_retention_hours: int = 24
-    
-    def __post_init__(self):
-        if self.alert_thresholds is None:
-            self.alert_thresholds = {
-                "max_execution_time": 600.0,  # 秒
-                "min_success_rate": 0.8,
-                "max_error_rate": 0.2,
-                "max_memory_usage": 0.8,  # 80%
-                "max_cpu_usage": 0.9  # 90%
-            }
 
 # ================================
 # 7. 业务配置
 # ================================
 
+# 业务配置默认值（只读，所有实例共享）
+_BUSINESS_FOCUS_DEFAULTS = (
+    "智慧电厂解决方案",
+    "智能电站管理",
+    "智慧水利系统",
+    "大坝监测技术",
+    "项目成本管控",
+    "运维知识管理"
+)
+
+_KEY_BUSINESS_AREA_DEFAULTS = (
+    "项目管理",
+    "财务分析",
+    "成本控制",
+    "运维效率",
+    "知识管理",
+    "人员效能"
+)
+
+_PRIORITY_METRIC_DEFAULTS = (
+    "项目盈利率",
+    "成本控制率",
+    "客户满意度",
+    "运维效率",
+    "人员利用率",
+    "知识复用率"
+)
+
+_REPORT_BRANDING_DEFAULTS = MappingProxyType({
+    "company_logo": "",
+    "primary_color": "#1f77b4",
+    "secondary_color": "#ff7f0e",
+    "font_family": "Microsoft YaHei, Arial, sans-serif"
+})
+
 @dataclass
 class BusinessConfig:
     """业务相关配置"""
@@ -243,59 +274,28 @@ class BusinessConfig:
     # 公司信息
     company_name: str = "四川智水信息技术有限公司"
     industry: str = "电力水利行业解决方案"
-    business_focus: List[str] = None
+    business_focus: Tuple[str, ...] = _BUSINESS_FOCUS_DEFAULTS
     
     # 分析重点
-    key_business_areas: List[str] = None
-    priority_metrics: List[str] = None
+    key_business_areas: Tuple[str, ...] = _KEY_BUSINESS_AREA_DEFAULTS
+    priority_metrics: Tuple[str, ...] = _PRIORITY_METRIC_DEFAULTS
     
     # 报告配置
     default_report_language: str = "中文"
-    report_branding: Dict[str, str] = None
-    
-    def __post_init__(self):
-        if self.business_focus is None:
-            self.business_focus = [
-                "智慧电厂解决方案",
-                "智能电站管理", 
-                "智慧水利系统",
-                "大坝监测技术",
-                "项目成本管控",
-                "运维知识管理"
-            ]
-        
-        if self.key_business_areas is None:
-            self.key_business_areas = [
-                "项目管理",
-                "财务分析", 
-                "成本控制",
-                "运维效率",
-                "知识管理",
-                "人员效能"
-            ]
-        
-        if self.priority_metrics is None:
-            self.priority_metrics = [
-                "项目盈利率",
-                "成本控制率",
-                "客户满意度",
-                "运维效率",
-                "人员利用率",
-                "知识复用率"
-            ]
-        
-        if self.report_branding is None:
-            self.report_branding = {
-                "company_logo": "",
-                "primary_color": "#1f77b4",
-                "secondary_color": "#ff7f0e",
-                "font_family": "Microsoft YaHei, Arial, sans-serif"
-            }
+    report_branding: Mapping[str, str] = field(default_factory=lambda: _REPORT_BRANDING_DEFAULTS)
 
 # ================================
 # 8. 配置管理器
 # ================================
 
+def _export_value(value: Any) -> Any:
+    """将只读映射、元组等配置值转换为可JSON序列化的普通dict/list"""
+    if isinstance(value, Mapping):
+        return {key: _export_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_export_value(item) for item in value]
+    return value
+
 class ConfigManager:
     """配置管理器
     
@@ -311,83 +311,100 @@ class ConfigManager:
         self.monitoring_config = MonitoringConfig()
         self.business_config = BusinessConfig()
         
+        # Agent配置、工作流配置、业务上下文等组合视图的缓存，首次访问时构建，update_config时清空
+        self._view_cache: Dict[Any, Mapping[str, Any]] = {}
+        
         # 确保日志目录存在
         self._ensure_log_directories()
     
     def _ensure_log_directories(self):
         """确保日志目录存在"""
-        log_dirs = [
-            os.path.dirname(self.logging_config.log_file_path),
-            os.path.dirname(self.logging_config.performance_log_file),
-            os.path.dirname(self.logging_config.audit_log_file)
-        ]
+        # 各日志文件通常位于同一目录，去重后每个目录只创建一次；exist_ok已覆盖目录存在的情况，无需额外检查
+        log_dirs = {
+            os.path.dirname(log_file)
+            for log_file in (
+                self.logging_config.log_file_path,
+                self.logging_config.performance_log_file,
+                self.logging_config.audit_log_file
+            )
+        }
         
         for log_dir in log_dirs:
-            if log_dir and not os.path.exists(log_dir):
+            if log_dir:
                 os.makedirs(log_dir, exist_ok=True)
     
     def get_ai_config(self) -> Dict[str, Any]:
         """获取AI配置"""
-        return AI_CONFIG.copy()
-    
-    def get_agent_config(self, agent_type: str = None) -> Dict[str, Any]:
-        """获取Agent配置"""
-        base_config = {
-            "timeout": self.agent_config.default_timeout,
-            "max_retry_attempts": self.agent_config.max_retry_attempts,
-            "confidence_threshold": self.agent_config.confidence_threshold,
-            "max_output_length": self.agent_config.max_output_length,
-            "include_reasoning": self.agent_config.include_reasoning,
-            "include_confidence": self.agent_config.include_confidence
-        }
-        
-        # 添加特定Agent配置
-        if agent_type:
-            specific_config_key = f"{agent_type}_agent_config"
-            if hasattr(self.agent_config, specific_config_key):
-                specific_config = getattr(self.agent_config, specific_config_key)
-                base_config.update(specific_config)
-        
-        return base_config
-    
-    def get_workflow_config(self) -> Dict[str, Any]:
-        """获取工作流配置"""
-        return {
-            "default_workflow_type": self.workflow_config.default_workflow_type,
-            "stage_timeouts": {
-                "planning": self.workflow_config.planning_stage_timeout,
-                "analysis": self.workflow_config.analysis_stage_timeout,
-                "report": self.workflow_config.report_stage_timeout
-            },
-            "retry_config": {
-                "max_retries": self.workflow_config.max_stage_retries,
-                "retry_delay": self.workflow_config.retry_delay
-            },
-            "parallel_config": {
-                "enable_parallel": self.workflow_config.enable_parallel_execution,
-                "max_parallel_agents": self.workflow_config.max_parallel_agents
-            },
-            "storage_config": {
-                "save_intermediate": self.workflow_config.save_intermediate_results,
-                "retention_days": self.workflow_config.results_retention_days
+        return {"api_key": get_ai_api_key(), **AI_CONFIG}
+    
+    def get_agent_config(self, agent_type: str = None) -> Mapping[str, Any]:
+        """获取Agent配置（只读视图，通用配置与特定Agent配置合并后按Agent类型缓存）"""
+        cache_key = ("agent", agent_type or None)
+        agent_config = self._view_cache.get(cache_key)
+        if agent_config is None:
+            merged_config = {
+                "timeout": self.agent_config.default_timeout,
+                "max_retry_attempts": self.agent_config.max_retry_attempts,
+                "confidence_threshold": self.agent_config.confidence_threshold,
+                "max_output_length": self.agent_config.max_output_length,
+                "include_reasoning": self.agent_config.include_reasoning,
+                "include_confidence": self.agent_config.include_confidence
             }
-        }
-    
-    def get_business_context(self) -> Dict[str, Any]:
-        """获取业务上下文"""
-        return {
-            "company_info": {
-                "name": self.business_config.company_name,
-                "industry": self.business_config.industry,
-                "business_focus": self.business_config.business_focus
-            },
-            "analysis_context": {
-                "key_areas": self.business_config.key_business_areas,
-                "priority_metrics": self.business_config.priority_metrics,
-                "report_language": self.business_config.default_report_language
-            },
-            "branding": self.business_config.report_branding
-        }
+            
+            # 添加特定Agent配置
+            if agent_type:
+                merged_config.update(getattr(self.agent_config, f"{agent_type}_agent_config", None) or {})
+            
+            agent_config = MappingProxyType(merged_config)
+            self._view_cache[cache_key] = agent_config
+        return agent_config
+    
+    def get_workflow_config(self) -> Mapping[str, Any]:
+        """获取工作流配置（只读视图，配置更新前各次调用返回同一对象）"""
+        workflow_config = self._view_cache.get("workflow")
+        if workflow_config is None:
+            workflow_config = MappingProxyType({
+                "default_workflow_type": self.workflow_config.default_workflow_type,
+                "stage_timeouts": MappingProxyType({
+                    "planning": self.workflow_config.planning_stage_timeout,
+                    "analysis": self.workflow_config.analysis_stage_timeout,
+                    "report": self.workflow_config.report_stage_timeout
+                }),
+                "retry_config": MappingProxyType({
+                    "max_retries": self.workflow_config.max_stage_retries,
+                    "retry_delay": self.workflow_config.retry_delay
+                }),
+                "parallel_config": MappingProxyType({
+                    "enable_parallel": self.workflow_config.enable_parallel_execution,
+                    "max_parallel_agents": self.workflow_config.max_parallel_agents
+                }),
+                "storage_config": MappingProxyType({
+                    "save_intermediate": self.workflow_config.save_intermediate_results,
+                    "retention_days": self.workflow_config.results_retention_days
+                })
+            })
+            self._view_cache["workflow"] = workflow_config
+        return workflow_config
+    
+    def get_business_context(self) -> Mapping[str, Any]:
+        """获取业务上下文（只读视图，配置更新前各次调用返回同一对象）"""
+        business_context = self._view_cache.get("business")
+        if business_context is None:
+            business_context = MappingProxyType({
+                "company_info": MappingProxyType({
+                    "name": self.business_config.company_name,
+                    "industry": self.business_config.industry,
+                    "business_focus": self.business_config.business_focus
+                }),
+                "analysis_context": MappingProxyType({
+                    "key_areas": self.business_config.key_business_areas,
+                    "priority_metrics": self.business_config.priority_metrics,
+                    "report_language": self.business_config.default_report_language
+                }),
+                "branding": self.business_config.report_branding
+            })
+            self._view_cache["business"] = business_context
+        return business_context
     
     def update_config(self, config_type: str, updates: Dict[str, Any]):
         """更新配置"""
@@ -405,18 +422,31 @@ class ConfigManager:
             for key, value in updates.items():
                 if hasattr(config_obj, key):
                     setattr(config_obj, key, value)
+            
+            # 配置已变化，组合视图下次访问时重新构建
+            self._view_cache.clear()
     
     def export_config(self) -> Dict[str, Any]:
-        """导出所有配置"""
-        return {
-            "ai_config": self.get_ai_config(),
-            "system_config": self.system_config.__dict__,
-            "agent_config": self.agent_config.__dict__,
-            "logging_config": self.logging_config.__dict__,
-            "workflow_config": self.workflow_config.__dict__,
-            "monitoring_config": self.monitoring_config.__dict__,
-            "business_config": self.business_config.__dict__
-        }
+        """导出所有配置（各配置段为首次导出时生成的可JSON序列化快照，update_config后重新生成，调用方不应修改）"""
+        sections = self._view_cache.get("export")
+        if sections is None:
+            sections = {
+                section_name: {
+                    config_field.name: _export_value(getattr(config_obj, config_field.name))
+                    for config_field in fields(config_obj)
+                }
+                for section_name, config_obj in (
+                    ("system_config", self.system_config),
+                    ("agent_config", self.agent_config),
+                    ("logging_config", self.logging_config),
+                    ("workflow_config", self.workflow_config),
+                    ("monitoring_config", self.monitoring_config),
+                    ("business_config", self.business_config)
+                )
+            }
+            self._view_cache["export"] = sections
+        
+        return {"ai_config": self.get_ai_config(), **sections}
 
 # ================================
 # 9. 全局配置实例
@@ -430,24 +460,54 @@ def get_ai_config() -> Dict[str, Any]:
     """获取AI配置"""
     return config_manager.get_ai_config()
 
-def get_agent_config(agent_type: str = None) -> Dict[str, Any]:
+def get_agent_config(agent_type: str = None) -> Mapping[str, Any]:
     """获取Agent配置"""
     return config_manager.get_agent_config(agent_type)
 
-def get_workflow_config() -> Dict[str, Any]:
+def get_workflow_config() -> Mapping[str, Any]:
     """获取工作流配置"""
     return config_manager.get_workflow_config()
 
-def get_business_context() -> Dict[str, Any]:
+def get_business_context() -> Mapping[str, Any]:
     """获取业务上下文"""
     return config_manager.get_business_context()
 
+_LLM_CLIENT = None
+_LLM_CLIENT_LOCK = threading.Lock()
+
+def get_llm_client():
+    """获取进程共享的OpenAI客户端
+    
+    首次调用时创建，所有Agent复用同一个HTTP连接池，连接数取CONCURRENCY_CONFIG["connection_pool_size"]。
+    需要不同超时时使用 get_llm_client().with_options(timeout=...)，仍共享连接池。
+    报告生成会在多个线程中同时发起首次调用，创建过程加锁，保证进程内只有一个客户端。
+    """
+    global _LLM_CLIENT
+    if _LLM_CLIENT is not None:
+        return _LLM_CLIENT
+    
+    with _LLM_CLIENT_LOCK:
+        if _LLM_CLIENT is None:
+            import httpx
+            from openai import OpenAI
+            
+            pool_size = CONCURRENCY_CONFIG["connection_pool_size"]
+            _LLM_CLIENT = OpenAI(
+                api_key=get_ai_api_key(),
+                base_url=AI_CONFIG.get("api_base", ""),
+                http_client=httpx.Client(
+                    limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+                )
+            )
+    return _LLM_CLIENT
+
 # ================================
 # 10. 模块导出
 # ================================
 
 __all__ = [
     'AI_CONFIG',
+    'get_ai_api_key',
     'SystemConfig',
     'AgentConfig', 
     'LoggingConfig',
@@ -459,7 +519,8 @@ __all__ = [
     'get_ai_config',
     'get_agent_config',
     'get_workflow_config',
-    'get_business_context'
+    'get_business_context',
+    'get_llm_client'
 ]
 
 # 性能优化配置
@@ -7,7 +7,6 @@
 import asyncio
 import logging
 import json
-import requests
 from datetime import datetime
 from pathlib import Path
 
@@ -33,6 +32,7 @@ class SystemVerification:
     def verify_frontend(self):
         """验证前端Streamlit服务"""
         try:
+            import requests  # 仅在实际探测时加载，避免拖慢脚本启动
             response = requests.get("http://localhost:8501", timeout=5)
             if response.status_code == 200:
                 self.results["components"]["frontend"] = {
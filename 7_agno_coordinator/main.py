@@ -23,10 +23,6 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
 import json
-import uvicorn
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
 from typing import List, Optional as OptionalType
 
 # 添加项目路径
@@ -46,39 +42,58 @@ from models.conversation_history import (
 # FastAPI 数据模型
 # ================================
 
-class CollaborateRequest(BaseModel):
-    """协作请求数据模型"""
-    task: str
-    agents: OptionalType[List[str]] = None
-    context: OptionalType[Dict[str, Any]] = None
-    timestamp: OptionalType[str] = None
-    workflow_type: OptionalType[str] = "comprehensive_analysis"
+# fastapi/pydantic/uvicorn 仅在API模式下需要，按需加载以缩短命令行启动时间；
+# 加载后写入模块全局，供路由注册时的类型注解和默认值解析使用
+FastAPI = HTTPException = UploadFile = File = Form = CORSMiddleware = None
+CollaborateRequest = CollaborateResponse = None
+SaveConversationRequest = ConversationHistoryResponse = None
 
-class CollaborateResponse(BaseModel):
-    """协作响应模型"""
-    success: bool
-    workflow_id: OptionalType[str] = None
-    execution_time: float = 0.0
-    status: str
-    stages_completed: int = 0
-    final_report: OptionalType[str] = None
-    stage_results: Dict[str, Any] = {}
-    error: OptionalType[Dict[str, Any]] = None
+def _load_api_components():
+    """按需加载FastAPI组件并定义API数据模型"""
+    global FastAPI, HTTPException, UploadFile, File, Form, CORSMiddleware
+    global CollaborateRequest, CollaborateResponse
+    global SaveConversationRequest, ConversationHistoryResponse
+    
+    if CollaborateRequest is not None:
+        return
+    
+    from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+    from fastapi.middleware.cors import CORSMiddleware
+    from pydantic import BaseModel
+    
+    class CollaborateRequest(BaseModel):
+        """协作请求数据模型"""
+        task: str
+        agents: OptionalType[List[str]] = None
+        context: OptionalType[Dict[str, Any]] = None
+        timestamp: OptionalType[str] = None
+        workflow_type: OptionalType[str] = "comprehensive_analysis"
 
-class SaveConversationRequest(BaseModel):
-    """保存对话请求模型"""
-    session_id: str
-    user_message: str
-    ai_response: Dict[str, Any]
-    file_info: OptionalType[Dict[str, Any]] = None
+    class CollaborateResponse(BaseModel):
+        """协作响应模型"""
+        success: bool
+        workflow_id: OptionalType[str] = None
+        execution_time: float = 0.0
+        status: str
+        stages_completed: int = 0
+        final_report: OptionalType[str] = None
+        stage_results: Dict[str, Any] = {}
+        error: OptionalType[Dict[str, Any]] = None
 
-class ConversationHistoryResponse(BaseModel):
-    """对话历史响应模型"""
-    success: bool
-    session_id: str
-    history: List[Dict[str, Any]] = []
-    total_count: int = 0
-    error: OptionalType[Dict[str, Any]] = None
+    class SaveConversationRequest(BaseModel):
+        """保存对话请求模型"""
+        session_id: str
+        user_message: str
+        ai_response: Dict[str, Any]
+        file_info: OptionalType[Dict[str, Any]] = None
+
+    class ConversationHistoryResponse(BaseModel):
+        """对话历史响应模型"""
+        success: bool
+        session_id: str
+        history: List[Dict[str, Any]] = []
+        total_count: int = 0
+        error: OptionalType[Dict[str, Any]] = None
 
 # ================================
 # 1. 日志配置
@@ -143,11 +158,13 @@ class SystemManager:
         
         self.logger.info("系统管理器初始化完成")
     
-    def create_fastapi_app(self) -> FastAPI:
+    def create_fastapi_app(self) -> "FastAPI":
         """创建FastAPI应用实例"""
         if self.app is not None:
             return self.app
         
+        _load_api_components()
+        
         # 创建FastAPI应用
         self.app = FastAPI(
             title="智水信息Multi-Agent协作系统",
@@ -172,7 +189,7 @@ class SystemManager:
         self.logger.info("FastAPI应用创建完成")
         return self.app
     
-    def _create_error_response(self, error_code: str, error_message: str, status_code: int) -> CollaborateResponse:
+    def _create_error_response(self, error_code: str, error_message: str, status_code: int) -> "CollaborateResponse":
         """创建标准化错误响应"""
         return CollaborateResponse(
             success=False,
@@ -190,7 +207,7 @@ class SystemManager:
             }
         )
     
-    def _create_success_response(self, result: dict) -> CollaborateResponse:
+    def _create_success_response(self, result: dict) -> "CollaborateResponse":
         """创建标准化成功响应"""
         return CollaborateResponse(
             success=result.get("success", True),
@@ -1075,6 +1092,8 @@ async def run_api_mode(system_manager: SystemManager, port: int = 8006):
     print(f"\n🌐 启动API服务模式 - 端口: {port}")
     
     try:
+        import uvicorn
+        
         # 创建FastAPI应用
         app = system_manager.create_fastapi_app()
         
@@ -19,22 +19,15 @@ import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
-from openai import OpenAI
 
 # ================================
 # 1. 配置和初始化
 # ================================
 
 # AI模型配置
-from config import get_ai_config
+from config import get_ai_config, get_llm_client
 AI_CONFIG = get_ai_config()
 
-# 初始化OpenAI客户端
-client = OpenAI(
-    api_key=AI_CONFIG.get("api_key", ""),
-    base_url=AI_CONFIG.get("api_base", "")
-)
-
 # 日志配置
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("PlannerAgent")
@@ -376,13 +369,7 @@ class PlannerAgent:
             - comprehensive: 需要多维度综合分析
             """
             
-            # 创建OpenAI客户端
-            client = OpenAI(
-                api_key=AI_CONFIG["api_key"],
-                base_url=AI_CONFIG["api_base"]
-            )
-            
-            response = client.chat.completions.create(
+            response = get_llm_client().chat.completions.create(
                 model=AI_CONFIG["model"],
                 messages=[
                     {"role": "system", "content": self.system_prompt},
@@ -454,13 +441,7 @@ class PlannerAgent:
             }}
             """
             
-            # 创建OpenAI客户端
-            client = OpenAI(
-                api_key=AI_CONFIG["api_key"],
-                base_url=AI_CONFIG["api_base"]
-            )
-            
-            response = client.chat.completions.create(
+            response = get_llm_client().chat.completions.create(
                 model=AI_CONFIG["model"],
                 messages=[
                     {"role": "system", "content": "你是智水信息的任务编排专家，专门分析用户的业务分析需求。"},